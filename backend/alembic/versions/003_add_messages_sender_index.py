@@ -0,0 +1,25 @@
+"""Add composite sender index to messages
+
+Revision ID: 003_add_messages_sender_index
+Revises: 002_add_channel_fields
+Create Date: 2026-10-15
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '003_add_messages_sender_index'
+down_revision = '002_add_channel_fields'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Supports top-senders aggregation per user/group
+    op.create_index('ix_messages_user_group_sender', 'messages', ['user_id', 'group_id', 'sender_phone'])
+
+
+def downgrade():
+    op.drop_index('ix_messages_user_group_sender', table_name='messages')
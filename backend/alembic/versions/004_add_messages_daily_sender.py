@@ -0,0 +1,40 @@
+"""Add messages_daily_sender rollup table
+
+Revision ID: 004_add_messages_daily_sender
+Revises: 003_add_messages_sender_index
+Create Date: 2026-10-15
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '004_add_messages_daily_sender'
+down_revision = '003_add_messages_sender_index'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'messages_daily_sender',
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('group_id', sa.Integer(), sa.ForeignKey('monitored_groups.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('sender_phone', sa.String(50), primary_key=True),
+        sa.Column('day', sa.Date(), primary_key=True),
+        sa.Column('sender_name', sa.String(255), nullable=False),
+        sa.Column('message_count', sa.Integer(), nullable=False, server_default='0'),
+    )
+
+    # Backfill from existing messages
+    op.execute("""
+        INSERT INTO messages_daily_sender (user_id, group_id, sender_phone, day, sender_name, message_count)
+        SELECT user_id, group_id, COALESCE(sender_phone, ''), DATE(timestamp), MAX(sender_name), COUNT(*)
+        FROM messages
+        GROUP BY user_id, group_id, COALESCE(sender_phone, ''), DATE(timestamp)
+    """)
+
+
+def downgrade():
+    op.drop_table('messages_daily_sender')
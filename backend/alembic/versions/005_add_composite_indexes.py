@@ -0,0 +1,42 @@
+"""Add composite indexes to messages and events, drop dominated single-column ones
+
+Revision ID: 005_add_composite_indexes
+Revises: 004_add_messages_daily_sender
+Create Date: 2026-10-15
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '005_add_composite_indexes'
+down_revision = '004_add_messages_daily_sender'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Serves WHERE user_id AND group_id ORDER BY timestamp DESC LIMIT n without a sort
+    op.create_index('idx_msg_user_group_ts', 'messages', ['user_id', 'group_id', sa.text('timestamp DESC')])
+    op.create_index('idx_events_user_group_ts', 'events', ['user_id', 'group_id', 'event_date'])
+    op.create_index('idx_events_user_type_date', 'events', ['user_id', 'event_type', 'event_date'])
+
+    # Covered by the composites above (group_id keeps its own index for cascading deletes)
+    op.execute("DROP INDEX IF EXISTS ix_messages_user_id")
+    op.execute("DROP INDEX IF EXISTS ix_messages_timestamp")
+    op.execute("DROP INDEX IF EXISTS ix_events_user_id")
+    op.execute("DROP INDEX IF EXISTS ix_events_event_date")
+    op.execute("DROP INDEX IF EXISTS idx_events_user_group")
+
+
+def downgrade():
+    op.create_index('idx_events_user_group', 'events', ['user_id', 'group_id'])
+    op.create_index('ix_events_event_date', 'events', ['event_date'])
+    op.create_index('ix_events_user_id', 'events', ['user_id'])
+    op.create_index('ix_messages_timestamp', 'messages', ['timestamp'])
+    op.create_index('ix_messages_user_id', 'messages', ['user_id'])
+
+    op.drop_index('idx_events_user_type_date', table_name='events')
+    op.drop_index('idx_events_user_group_ts', table_name='events')
+    op.drop_index('idx_msg_user_group_ts', table_name='messages')
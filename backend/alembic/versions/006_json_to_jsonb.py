@@ -0,0 +1,44 @@
+"""Convert JSON columns to JSONB and GIN-index agents.enabled_group_ids
+
+Revision ID: 006_json_to_jsonb
+Revises: 005_add_composite_indexes
+Create Date: 2026-10-15
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '006_json_to_jsonb'
+down_revision = '005_add_composite_indexes'
+branch_labels = None
+depends_on = None
+
+
+JSON_COLUMNS = {
+    'scheduled_messages': ['poll_options', 'group_ids', 'group_names', 'channel_ids', 'channel_names', 'mention_ids'],
+    'monitored_groups': ['welcome_pending_joiners', 'welcome_extra_mentions'],
+    'agents': ['enabled_group_ids'],
+}
+
+
+def upgrade():
+    for table, columns in JSON_COLUMNS.items():
+        for column in columns:
+            op.execute(f"ALTER TABLE {table} ALTER COLUMN {column} TYPE JSONB USING {column}::jsonb")
+
+    # CONCURRENTLY cannot run inside the migration transaction
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_agent_enabled_gids "
+            "ON agents USING gin (enabled_group_ids jsonb_path_ops)"
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_agent_enabled_gids")
+
+    for table, columns in JSON_COLUMNS.items():
+        for column in columns:
+            op.execute(f"ALTER TABLE {table} ALTER COLUMN {column} TYPE JSON USING {column}::json")
@@ -0,0 +1,55 @@
+"""Move agents.enabled_group_ids into the agent_enabled_groups table
+
+Revision ID: 007_add_agent_enabled_groups
+Revises: 006_json_to_jsonb
+Create Date: 2026-10-15
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB
+
+
+# revision identifiers, used by Alembic.
+revision = '007_add_agent_enabled_groups'
+down_revision = '006_json_to_jsonb'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'agent_enabled_groups',
+        sa.Column('agent_id', sa.Integer(), sa.ForeignKey('agents.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('group_id', sa.Integer(), sa.ForeignKey('monitored_groups.id', ondelete='CASCADE'), primary_key=True),
+    )
+    op.create_index('ix_agent_enabled_groups_group_id', 'agent_enabled_groups', ['group_id'])
+
+    # Copy existing JSON arrays, skipping ids of groups that no longer exist
+    op.execute("""
+        INSERT INTO agent_enabled_groups (agent_id, group_id)
+        SELECT DISTINCT a.id, g.id
+        FROM agents a
+        CROSS JOIN LATERAL jsonb_array_elements_text(COALESCE(a.enabled_group_ids, '[]'::jsonb)) AS elem(group_id)
+        JOIN monitored_groups g ON g.id = elem.group_id::int
+    """)
+
+    op.execute("DROP INDEX IF EXISTS idx_agent_enabled_gids")
+    op.drop_column('agents', 'enabled_group_ids')
+
+
+def downgrade():
+    op.add_column('agents', sa.Column('enabled_group_ids', JSONB(), nullable=True))
+    op.execute("""
+        UPDATE agents a
+        SET enabled_group_ids = COALESCE(
+            (SELECT jsonb_agg(e.group_id) FROM agent_enabled_groups e WHERE e.agent_id = a.id),
+            '[]'::jsonb
+        )
+    """)
+    op.execute(
+        "CREATE INDEX idx_agent_enabled_gids ON agents USING gin (enabled_group_ids jsonb_path_ops)"
+    )
+
+    op.drop_index('ix_agent_enabled_groups_group_id', table_name='agent_enabled_groups')
+    op.drop_table('agent_enabled_groups')
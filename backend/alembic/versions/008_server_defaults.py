@@ -0,0 +1,43 @@
+"""Use server-side defaults for welcome_pending_joiners and scheduled_messages timestamps
+
+Revision ID: 008_server_defaults
+Revises: 007_add_agent_enabled_groups
+Create Date: 2026-10-15
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '008_server_defaults'
+down_revision = '007_add_agent_enabled_groups'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute("UPDATE monitored_groups SET welcome_pending_joiners = '[]'::jsonb WHERE welcome_pending_joiners IS NULL")
+    op.alter_column('monitored_groups', 'welcome_pending_joiners', server_default=sa.text("'[]'::jsonb"))
+
+    # Existing naive values were written with datetime.utcnow()
+    for column in ('created_at', 'updated_at'):
+        op.execute(f"UPDATE scheduled_messages SET {column} = now() AT TIME ZONE 'UTC' WHERE {column} IS NULL")
+        op.alter_column(
+            'scheduled_messages', column,
+            type_=sa.DateTime(timezone=True),
+            postgresql_using=f"{column} AT TIME ZONE 'UTC'",
+            server_default=sa.func.now(),
+        )
+
+
+def downgrade():
+    for column in ('created_at', 'updated_at'):
+        op.alter_column(
+            'scheduled_messages', column,
+            type_=sa.DateTime(),
+            postgresql_using=f"{column} AT TIME ZONE 'UTC'",
+            server_default=None,
+        )
+
+    op.alter_column('monitored_groups', 'welcome_pending_joiners', server_default=None)
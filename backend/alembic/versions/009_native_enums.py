@@ -0,0 +1,40 @@
+"""Store low-cardinality status/type columns as native Postgres enums
+
+Revision ID: 009_native_enums
+Revises: 008_server_defaults
+Create Date: 2026-10-15
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '009_native_enums'
+down_revision = '008_server_defaults'
+branch_labels = None
+depends_on = None
+
+
+# (table, column, enum type, values, previous varchar length)
+ENUM_COLUMNS = [
+    ('scheduled_messages', 'task_type', 'task_type',
+     ('broadcast', 'poll', 'open_group', 'close_group', 'channel_broadcast', 'channel_poll'), 20),
+    ('scheduled_messages', 'mention_type', 'mention_type', ('none', 'all', 'selected'), 20),
+    ('scheduled_messages', 'status', 'scheduled_status',
+     ('pending', 'sending', 'sent', 'partially_sent', 'failed', 'cancelled'), 20),
+    ('events', 'event_type', 'event_type', ('JOIN', 'LEAVE', 'CERTIFICATE'), 50),
+]
+
+
+def upgrade():
+    for table, column, type_name, values, _ in ENUM_COLUMNS:
+        labels = ", ".join(f"'{v}'" for v in values)
+        op.execute(f"CREATE TYPE {type_name} AS ENUM ({labels})")
+        op.execute(f"ALTER TABLE {table} ALTER COLUMN {column} DROP DEFAULT")
+        op.execute(f"ALTER TABLE {table} ALTER COLUMN {column} TYPE {type_name} USING {column}::{type_name}")
+
+
+def downgrade():
+    for table, column, type_name, _, length in reversed(ENUM_COLUMNS):
+        op.execute(f"ALTER TABLE {table} ALTER COLUMN {column} TYPE VARCHAR({length}) USING {column}::text")
+        op.execute(f"DROP TYPE {type_name}")
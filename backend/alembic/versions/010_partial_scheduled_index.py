@@ -0,0 +1,34 @@
+"""Replace the scheduled_messages status/time index with a partial index on live rows
+
+Revision ID: 010_partial_scheduled_index
+Revises: 009_native_enums
+Create Date: 2026-10-15
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '010_partial_scheduled_index'
+down_revision = '009_native_enums'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # CONCURRENTLY cannot run inside the migration transaction
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_scheduled_pending "
+            "ON scheduled_messages (scheduled_at) WHERE status IN ('pending', 'sending')"
+        )
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_scheduled_status_time")
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_scheduled_status_time "
+            "ON scheduled_messages (status, scheduled_at)"
+        )
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_scheduled_pending")
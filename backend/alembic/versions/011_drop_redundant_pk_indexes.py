@@ -0,0 +1,29 @@
+"""Drop single-column indexes that duplicate primary keys
+
+Revision ID: 011_drop_redundant_pk_indexes
+Revises: 010_partial_scheduled_index
+Create Date: 2026-10-15
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '011_drop_redundant_pk_indexes'
+down_revision = '010_partial_scheduled_index'
+branch_labels = None
+depends_on = None
+
+
+# Created by `primary_key=True, index=True`; the primary key index already covers them
+TABLES = ['users', 'whatsapp_sessions', 'monitored_groups', 'events', 'scheduled_messages', 'agents']
+
+
+def upgrade():
+    for table in TABLES:
+        op.execute(f"DROP INDEX IF EXISTS ix_{table}_id")
+
+
+def downgrade():
+    for table in TABLES:
+        op.create_index(f'ix_{table}_id', table, ['id'])
@@ -0,0 +1,31 @@
+"""Add resumable per-group send state to scheduled_messages
+
+Revision ID: 012_add_scheduled_step_state
+Revises: 011_drop_redundant_pk_indexes
+Create Date: 2026-10-15
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '012_add_scheduled_step_state'
+down_revision = '011_drop_redundant_pk_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('scheduled_messages', sa.Column('next_group_index', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('scheduled_messages', sa.Column('next_send_at', sa.DateTime(), nullable=True))
+    op.create_index(
+        'idx_scheduled_next_send', 'scheduled_messages', ['next_send_at'],
+        postgresql_where=sa.text("status = 'sending'")
+    )
+
+
+def downgrade():
+    op.drop_index('idx_scheduled_next_send', table_name='scheduled_messages')
+    op.drop_column('scheduled_messages', 'next_send_at')
+    op.drop_column('scheduled_messages', 'next_group_index')
@@ -0,0 +1,34 @@
+"""Narrow the scheduler's due-time index to pending rows only
+
+Revision ID: 013_pending_due_index
+Revises: 012_add_scheduled_step_state
+Create Date: 2026-10-15
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '013_pending_due_index'
+down_revision = '012_add_scheduled_step_state'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # In-flight (sending) rows are served by idx_scheduled_next_send
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_sched_pending_due "
+            "ON scheduled_messages (scheduled_at) WHERE status = 'pending'"
+        )
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_scheduled_pending")
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_scheduled_pending "
+            "ON scheduled_messages (scheduled_at) WHERE status IN ('pending', 'sending')"
+        )
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_sched_pending_due")
@@ -0,0 +1,28 @@
+"""Index recurring scheduled tasks by parent schedule
+
+Revision ID: 014_recurring_parent_index
+Revises: 013_pending_due_index
+Create Date: 2026-10-15
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '014_recurring_parent_index'
+down_revision = '013_pending_due_index'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_sched_recurring "
+            "ON scheduled_messages (parent_schedule_id) WHERE parent_schedule_id IS NOT NULL"
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_sched_recurring")
@@ -0,0 +1,38 @@
+"""Notify the scheduler when a scheduled task becomes pending
+
+Revision ID: 015_scheduled_notify_trigger
+Revises: 014_recurring_parent_index
+Create Date: 2026-10-15
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '015_scheduled_notify_trigger'
+down_revision = '014_recurring_parent_index'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Empty payload so a multi-row insert collapses into one notification per transaction
+    op.execute("""
+        CREATE OR REPLACE FUNCTION notify_scheduled_message() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('scheduled_message_inserted', '');
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER scheduled_messages_notify
+        AFTER INSERT OR UPDATE OF scheduled_at, status ON scheduled_messages
+        FOR EACH ROW WHEN (NEW.status = 'pending')
+        EXECUTE FUNCTION notify_scheduled_message()
+    """)
+
+
+def downgrade():
+    op.execute("DROP TRIGGER IF EXISTS scheduled_messages_notify ON scheduled_messages")
+    op.execute("DROP FUNCTION IF EXISTS notify_scheduled_message()")
@@ -0,0 +1,40 @@
+"""Move per-group send errors into scheduled_message_errors
+
+Revision ID: 016_add_scheduled_message_errors
+Revises: 015_scheduled_notify_trigger
+Create Date: 2026-10-15
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '016_add_scheduled_message_errors'
+down_revision = '015_scheduled_notify_trigger'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'scheduled_message_errors',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('task_id', sa.Integer(), sa.ForeignKey('scheduled_messages.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('group_id', sa.Integer(), nullable=True),
+        sa.Column('error', sa.Text(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index('ix_scheduled_message_errors_task_id', 'scheduled_message_errors', ['task_id'])
+
+    # Keep existing concatenated error strings as one row each
+    op.execute("""
+        INSERT INTO scheduled_message_errors (task_id, error)
+        SELECT id, error_message FROM scheduled_messages
+        WHERE error_message IS NOT NULL AND error_message <> ''
+    """)
+
+
+def downgrade():
+    op.drop_index('ix_scheduled_message_errors_task_id', table_name='scheduled_message_errors')
+    op.drop_table('scheduled_message_errors')
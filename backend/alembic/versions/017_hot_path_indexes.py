@@ -0,0 +1,33 @@
+"""Index the Redis event hot-path lookups
+
+Revision ID: 017_hot_path_indexes
+Revises: 016_add_scheduled_message_errors
+Create Date: 2026-10-15
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '017_hot_path_indexes'
+down_revision = '016_add_scheduled_message_errors'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_mg_user_wagroup_active "
+            "ON monitored_groups (user_id, whatsapp_group_id) WHERE is_active"
+        )
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_events_certificate_dedup "
+            "ON events (group_id, member_phone, event_date) WHERE event_type = 'CERTIFICATE'"
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_events_certificate_dedup")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_mg_user_wagroup_active")
@@ -7,7 +7,7 @@ from app.database import get_db
 from app.models.user import User
 from app.models.monitored_group import MonitoredGroup
 from app.models.message import Message
-from app.models.event import Event
+from app.models.event import Event, EVENT_TYPES
 from app.models.whatsapp_session import WhatsAppSession
 from app.models.scheduled_message import ScheduledMessage
 from app.schemas.user import UserResponse
@@ -324,6 +324,8 @@ def get_user_events(
     query = db.query(Event).filter(Event.user_id == user_id)
 
     if event_type:
+        if event_type not in EVENT_TYPES:
+            raise HTTPException(status_code=400, detail="Invalid event_type")
         query = query.filter(Event.event_type == event_type)
     if date_from:
         query = query.filter(Event.event_date >= datetime.fromisoformat(date_from).date())
@@ -554,8 +556,9 @@ def get_user_top_senders(
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
+    # Group by phone only - names can change between messages
     query = db.query(
-        Message.sender_name,
+        func.max(Message.sender_name).label("sender_name"),
         Message.sender_phone,
         func.count(Message.id).label("message_count")
     ).filter(
@@ -565,7 +568,7 @@ def get_user_top_senders(
     if group_id:
         query = query.filter(Message.group_id == group_id)
 
-    results = query.group_by(Message.sender_name, Message.sender_phone)\
+    results = query.group_by(Message.sender_phone)\
         .order_by(desc("message_count"))\
         .limit(limit)\
         .all()
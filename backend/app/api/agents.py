@@ -1,12 +1,13 @@
 from typing import List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 from pydantic import BaseModel
 
 from app.database import get_db
 from app.models.user import User
 from app.models.agent import Agent
+from app.models.agent_enabled_group import AgentEnabledGroup
 from app.models.monitored_group import MonitoredGroup
 from app.api.deps import get_current_user
 
@@ -41,7 +42,8 @@ def get_agents(
     db: Session = Depends(get_db)
 ):
     """Get all agents for the current user"""
-    agents = db.query(Agent).filter(Agent.user_id == current_user.id).all()
+    agents = db.query(Agent).options(selectinload(Agent.enabled_groups))\
+        .filter(Agent.user_id == current_user.id).all()
 
     return {
         "agents": [
@@ -54,7 +56,7 @@ def get_agents(
                 "output_token_limit": agent.output_token_limit,
                 "system_prompt": agent.system_prompt,
                 "is_active": agent.is_active,
-                "enabled_group_ids": agent.enabled_group_ids or [],
+                "enabled_group_ids": agent.enabled_group_ids,
                 "created_at": agent.created_at.isoformat() if agent.created_at else None,
                 "updated_at": agent.updated_at.isoformat() if agent.updated_at else None
             }
@@ -87,7 +89,7 @@ def get_agent(
         "output_token_limit": agent.output_token_limit,
         "system_prompt": agent.system_prompt,
         "is_active": agent.is_active,
-        "enabled_group_ids": agent.enabled_group_ids or [],
+        "enabled_group_ids": agent.enabled_group_ids,
         "created_at": agent.created_at.isoformat() if agent.created_at else None,
         "updated_at": agent.updated_at.isoformat() if agent.updated_at else None
     }
@@ -108,8 +110,7 @@ def create_agent(
         input_token_limit=request.input_token_limit,
         output_token_limit=request.output_token_limit,
         system_prompt=request.system_prompt,
-        is_active=False,
-        enabled_group_ids=[]
+        is_active=False
     )
 
     db.add(agent)
@@ -266,7 +267,7 @@ def update_agent_groups(
 
     valid_group_ids = [g.id for g in valid_groups]
 
-    agent.enabled_group_ids = valid_group_ids
+    agent.enabled_groups = [AgentEnabledGroup(group_id=group_id) for group_id in valid_group_ids]
     db.commit()
 
     return {
@@ -298,7 +299,7 @@ def get_agent_groups(
         MonitoredGroup.is_active == True
     ).all()
 
-    enabled_ids = agent.enabled_group_ids or []
+    enabled_ids = set(agent.enabled_group_ids)
 
     return {
         "groups": [
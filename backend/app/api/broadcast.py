@@ -1,5 +1,8 @@
 import asyncio
+import logging
 import os
+import shutil
+import tempfile
 from datetime import datetime
 from typing import List, Optional
 
@@ -11,14 +14,34 @@ from pydantic import BaseModel
 from app.database import get_db
 from app.models.user import User
 from app.models.scheduled_message import ScheduledMessage
+from app.models.scheduled_message_error import ScheduledMessageError
 from app.models.monitored_group import MonitoredGroup
 from app.api.deps import get_current_user
 from app.services.whatsapp_bridge import whatsapp_bridge
 from app.services.websocket_manager import websocket_manager
+from app.services.message_scheduler import message_scheduler, mention_args, error_summary, utcnow
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 
+def _save_temp_upload(media: UploadFile) -> str:
+    """Copy an upload into a temp file and return its path (blocking, run in a thread)"""
+    file_extension = os.path.splitext(media.filename)[1] if media.filename else ""
+    with tempfile.NamedTemporaryFile(delete=False, suffix=file_extension) as temp_file:
+        shutil.copyfileobj(media.file, temp_file)
+        return temp_file.name
+
+
+async def _remove_temp_file(path: str):
+    """Delete a temp file off the event loop, ignoring it if already gone"""
+    try:
+        await asyncio.to_thread(os.remove, path)
+    except FileNotFoundError:
+        pass
+
+
 class SendBroadcastRequest(BaseModel):
     content: str
     group_ids: List[int]  # List of MonitoredGroup IDs
@@ -80,24 +103,25 @@ async def send_immediate_broadcast(
         errors = []
         has_media = bool(scheduled_msg.media_path)  # Media is on WhatsApp service's volume
 
-        # Mark as sending
-        scheduled_msg.status = 'sending'
-        db.commit()
+        mention_all, mention_ids = mention_args(scheduled_msg.mention_type, scheduled_msg.mention_ids)
 
-        for i, group_id in enumerate(group_ids):
-            # 30-second delay between groups (except first)
-            if i > 0:
-                await asyncio.sleep(30)
+        # Fetch all target groups in one query (only the columns a send needs)
+        groups_by_id = {row.id: row for row in db.query(
+            MonitoredGroup.id, MonitoredGroup.whatsapp_group_id, MonitoredGroup.group_name
+        ).filter(
+            MonitoredGroup.id.in_(group_ids),
+            MonitoredGroup.user_id == user_id
+        ).all()}
+
+        for group_id in group_ids:
+            await message_scheduler.wait_for_send_slot(user_id)
 
             try:
                 # Get the WhatsApp group ID
-                group = db.query(MonitoredGroup).filter(
-                    MonitoredGroup.id == group_id,
-                    MonitoredGroup.user_id == user_id
-                ).first()
+                group = groups_by_id.get(group_id)
 
                 if not group:
-                    errors.append(f"Group {group_id} not found")
+                    errors.append({'task_id': scheduled_msg.id, 'group_id': group_id, 'error': f"Group {group_id} not found"})
                     groups_failed += 1
                     continue
 
@@ -109,23 +133,23 @@ async def send_immediate_broadcast(
                         group_id=group.whatsapp_group_id,
                         file_path=scheduled_msg.media_path,
                         caption=scheduled_msg.content,
-                        mention_all=(scheduled_msg.mention_type == 'all'),
-                        mention_ids=scheduled_msg.mention_ids if scheduled_msg.mention_type == 'selected' else None
+                        mention_all=mention_all,
+                        mention_ids=mention_ids
                     )
                 else:
                     result = await whatsapp_bridge.send_message(
                         user_id=user_id,
                         group_id=group.whatsapp_group_id,
                         content=scheduled_msg.content,
-                        mention_all=(scheduled_msg.mention_type == 'all'),
-                        mention_ids=scheduled_msg.mention_ids if scheduled_msg.mention_type == 'selected' else None
+                        mention_all=mention_all,
+                        mention_ids=mention_ids
                     )
 
                 if result.get('success'):
                     groups_sent += 1
 
-                    # Notify progress via WebSocket
-                    await websocket_manager.send_to_user(user_id, {
+                    # Notify progress via WebSocket (queued, never blocks the send loop)
+                    websocket_manager.send_to_user_nowait(user_id, {
                         'type': 'broadcast_progress',
                         'message_id': scheduled_msg.id,
                         'group_name': group.group_name,
@@ -135,16 +159,16 @@ async def send_immediate_broadcast(
                 else:
                     groups_failed += 1
                     error_msg = result.get('error', 'Unknown error')
-                    errors.append(f"{group.group_name}: {error_msg}")
+                    errors.append({'task_id': scheduled_msg.id, 'group_id': group_id, 'error': f"{group.group_name}: {error_msg}"})
 
             except Exception as e:
                 groups_failed += 1
-                errors.append(f"Group {group_id}: {str(e)}")
+                errors.append({'task_id': scheduled_msg.id, 'group_id': group_id, 'error': f"Group {group_id}: {str(e)}"})
 
         # Update final status
         scheduled_msg.groups_sent = groups_sent
         scheduled_msg.groups_failed = groups_failed
-        scheduled_msg.sent_at = datetime.utcnow()
+        scheduled_msg.sent_at = utcnow()
 
         if groups_failed == 0:
             scheduled_msg.status = 'sent'
@@ -154,7 +178,8 @@ async def send_immediate_broadcast(
             scheduled_msg.status = 'partially_sent'
 
         if errors:
-            scheduled_msg.error_message = "; ".join(errors)
+            db.bulk_insert_mappings(ScheduledMessageError, errors)
+            scheduled_msg.error_message = error_summary(errors[0]['error'], len(errors))
 
         # Clean up media file on WhatsApp service after broadcast
         if has_media:
@@ -200,24 +225,25 @@ async def send_immediate_poll(
         groups_failed = 0
         errors = []
 
-        # Mark as sending
-        scheduled_msg.status = 'sending'
-        db.commit()
+        mention_all, mention_ids = mention_args(scheduled_msg.mention_type, scheduled_msg.mention_ids)
 
-        for i, group_id in enumerate(group_ids):
-            # 30-second delay between groups (except first)
-            if i > 0:
-                await asyncio.sleep(30)
+        # Fetch all target groups in one query (only the columns a send needs)
+        groups_by_id = {row.id: row for row in db.query(
+            MonitoredGroup.id, MonitoredGroup.whatsapp_group_id, MonitoredGroup.group_name
+        ).filter(
+            MonitoredGroup.id.in_(group_ids),
+            MonitoredGroup.user_id == user_id
+        ).all()}
+
+        for group_id in group_ids:
+            await message_scheduler.wait_for_send_slot(user_id)
 
             try:
                 # Get the WhatsApp group ID
-                group = db.query(MonitoredGroup).filter(
-                    MonitoredGroup.id == group_id,
-                    MonitoredGroup.user_id == user_id
-                ).first()
+                group = groups_by_id.get(group_id)
 
                 if not group:
-                    errors.append(f"Group {group_id} not found")
+                    errors.append({'task_id': scheduled_msg.id, 'group_id': group_id, 'error': f"Group {group_id} not found"})
                     groups_failed += 1
                     continue
 
@@ -228,15 +254,15 @@ async def send_immediate_poll(
                     question=scheduled_msg.content,  # Poll question stored in content
                     options=scheduled_msg.poll_options or [],
                     allow_multiple_answers=scheduled_msg.poll_allow_multiple or False,
-                    mention_all=(scheduled_msg.mention_type == 'all'),
-                    mention_ids=scheduled_msg.mention_ids if scheduled_msg.mention_type == 'selected' else None
+                    mention_all=mention_all,
+                    mention_ids=mention_ids
                 )
 
                 if result.get('success'):
                     groups_sent += 1
 
-                    # Notify progress via WebSocket
-                    await websocket_manager.send_to_user(user_id, {
+                    # Notify progress via WebSocket (queued, never blocks the send loop)
+                    websocket_manager.send_to_user_nowait(user_id, {
                         'type': 'poll_progress',
                         'message_id': scheduled_msg.id,
                         'group_name': group.group_name,
@@ -246,16 +272,16 @@ async def send_immediate_poll(
                 else:
                     groups_failed += 1
                     error_msg = result.get('error', 'Unknown error')
-                    errors.append(f"{group.group_name}: {error_msg}")
+                    errors.append({'task_id': scheduled_msg.id, 'group_id': group_id, 'error': f"{group.group_name}: {error_msg}"})
 
             except Exception as e:
                 groups_failed += 1
-                errors.append(f"Group {group_id}: {str(e)}")
+                errors.append({'task_id': scheduled_msg.id, 'group_id': group_id, 'error': f"Group {group_id}: {str(e)}"})
 
         # Update final status
         scheduled_msg.groups_sent = groups_sent
         scheduled_msg.groups_failed = groups_failed
-        scheduled_msg.sent_at = datetime.utcnow()
+        scheduled_msg.sent_at = utcnow()
 
         if groups_failed == 0:
             scheduled_msg.status = 'sent'
@@ -265,7 +291,8 @@ async def send_immediate_poll(
             scheduled_msg.status = 'partially_sent'
 
         if errors:
-            scheduled_msg.error_message = "; ".join(errors)
+            db.bulk_insert_mappings(ScheduledMessageError, errors)
+            scheduled_msg.error_message = error_summary(errors[0]['error'], len(errors))
 
         db.commit()
 
@@ -306,14 +333,8 @@ async def send_immediate_channel_broadcast(
         errors = []
         has_media = bool(scheduled_msg.media_path)
 
-        # Mark as sending
-        scheduled_msg.status = 'sending'
-        db.commit()
-
         for i, channel_id in enumerate(channel_ids):
-            # 30-second delay between channels (except first)
-            if i > 0:
-                await asyncio.sleep(30)
+            await message_scheduler.wait_for_send_slot(user_id)
 
             try:
                 channel_name = channel_names[i] if i < len(channel_names) else channel_id
@@ -336,8 +357,8 @@ async def send_immediate_channel_broadcast(
                 if result.get('success'):
                     channels_sent += 1
 
-                    # Notify progress via WebSocket
-                    await websocket_manager.send_to_user(user_id, {
+                    # Notify progress via WebSocket (queued, never blocks the send loop)
+                    websocket_manager.send_to_user_nowait(user_id, {
                         'type': 'channel_broadcast_progress',
                         'message_id': scheduled_msg.id,
                         'channel_name': channel_name,
@@ -347,16 +368,16 @@ async def send_immediate_channel_broadcast(
                 else:
                     channels_failed += 1
                     error_msg = result.get('error', 'Unknown error')
-                    errors.append(f"{channel_name}: {error_msg}")
+                    errors.append({'task_id': scheduled_msg.id, 'group_id': None, 'error': f"{channel_name}: {error_msg}"})
 
             except Exception as e:
                 channels_failed += 1
-                errors.append(f"Channel {channel_id}: {str(e)}")
+                errors.append({'task_id': scheduled_msg.id, 'group_id': None, 'error': f"Channel {channel_id}: {str(e)}"})
 
         # Update final status
         scheduled_msg.groups_sent = channels_sent  # Reuse groups_sent for channels
         scheduled_msg.groups_failed = channels_failed
-        scheduled_msg.sent_at = datetime.utcnow()
+        scheduled_msg.sent_at = utcnow()
 
         if channels_failed == 0:
             scheduled_msg.status = 'sent'
@@ -366,7 +387,8 @@ async def send_immediate_channel_broadcast(
             scheduled_msg.status = 'partially_sent'
 
         if errors:
-            scheduled_msg.error_message = "; ".join(errors)
+            db.bulk_insert_mappings(ScheduledMessageError, errors)
+            scheduled_msg.error_message = error_summary(errors[0]['error'], len(errors))
 
         # Clean up media file on WhatsApp service after broadcast
         if has_media:
@@ -413,14 +435,8 @@ async def send_immediate_channel_poll(
         channels_failed = 0
         errors = []
 
-        # Mark as sending
-        scheduled_msg.status = 'sending'
-        db.commit()
-
         for i, channel_id in enumerate(channel_ids):
-            # 30-second delay between channels (except first)
-            if i > 0:
-                await asyncio.sleep(30)
+            await message_scheduler.wait_for_send_slot(user_id)
 
             try:
                 channel_name = channel_names[i] if i < len(channel_names) else channel_id
@@ -437,8 +453,8 @@ async def send_immediate_channel_poll(
                 if result.get('success'):
                     channels_sent += 1
 
-                    # Notify progress via WebSocket
-                    await websocket_manager.send_to_user(user_id, {
+                    # Notify progress via WebSocket (queued, never blocks the send loop)
+                    websocket_manager.send_to_user_nowait(user_id, {
                         'type': 'channel_poll_progress',
                         'message_id': scheduled_msg.id,
                         'channel_name': channel_name,
@@ -448,16 +464,16 @@ async def send_immediate_channel_poll(
                 else:
                     channels_failed += 1
                     error_msg = result.get('error', 'Unknown error')
-                    errors.append(f"{channel_name}: {error_msg}")
+                    errors.append({'task_id': scheduled_msg.id, 'group_id': None, 'error': f"{channel_name}: {error_msg}"})
 
             except Exception as e:
                 channels_failed += 1
-                errors.append(f"Channel {channel_id}: {str(e)}")
+                errors.append({'task_id': scheduled_msg.id, 'group_id': None, 'error': f"Channel {channel_id}: {str(e)}"})
 
         # Update final status
         scheduled_msg.groups_sent = channels_sent
         scheduled_msg.groups_failed = channels_failed
-        scheduled_msg.sent_at = datetime.utcnow()
+        scheduled_msg.sent_at = utcnow()
 
         if channels_failed == 0:
             scheduled_msg.status = 'sent'
@@ -467,7 +483,8 @@ async def send_immediate_channel_poll(
             scheduled_msg.status = 'partially_sent'
 
         if errors:
-            scheduled_msg.error_message = "; ".join(errors)
+            db.bulk_insert_mappings(ScheduledMessageError, errors)
+            scheduled_msg.error_message = error_summary(errors[0]['error'], len(errors))
 
         db.commit()
 
@@ -532,12 +549,13 @@ async def send_broadcast(
         # Convert to naive datetime for comparison
         scheduled_at = request.scheduled_at.replace(tzinfo=None) if request.scheduled_at.tzinfo else request.scheduled_at
         # Validate scheduled time is in the future
-        if scheduled_at <= datetime.utcnow():
+        if scheduled_at <= utcnow():
             raise HTTPException(status_code=400, detail="Scheduled time must be in the future")
         status = 'pending'
     else:
-        # Immediate send - set status to 'sending' so scheduler doesn't pick it up
-        scheduled_at = datetime.utcnow()
+        # Immediate send - set status to 'sending' so scheduler doesn't pick it up;
+        # the send task writes everything else in one commit at the end
+        scheduled_at = utcnow()
         status = 'sending'
 
     # Create scheduled message record
@@ -553,6 +571,7 @@ async def send_broadcast(
     )
     db.add(scheduled_msg)
     db.commit()
+    message_scheduler.notify_new_task()
     db.refresh(scheduled_msg)
 
     # If immediate send, execute in background
@@ -587,8 +606,6 @@ async def send_broadcast_with_media(
 ):
     """Send a broadcast message with media to multiple groups (immediate or scheduled)"""
     import json
-    import tempfile
-    import shutil
 
     # Parse group_ids from JSON string
     try:
@@ -626,25 +643,20 @@ async def send_broadcast_with_media(
     group_names = [g.group_name for g in groups]
 
     # Save uploaded file temporarily
-    file_extension = os.path.splitext(media.filename)[1] if media.filename else ""
-    with tempfile.NamedTemporaryFile(delete=False, suffix=file_extension) as temp_file:
-        shutil.copyfileobj(media.file, temp_file)
-        temp_filepath = temp_file.name
+    temp_filepath = await asyncio.to_thread(_save_temp_upload, media)
 
     # Upload media to WhatsApp service's persistent volume
     try:
         upload_result = await whatsapp_bridge.upload_media(temp_filepath)
         if not upload_result.get('success'):
-            os.remove(temp_filepath)
             raise HTTPException(status_code=500, detail=f"Failed to upload media: {upload_result.get('error')}")
 
         # Get the path on WhatsApp service's volume
         remote_media_path = upload_result.get('filePath')
-        print(f"[BROADCAST] Media uploaded to WhatsApp service: {remote_media_path}", flush=True)
+        logger.info("Media uploaded to WhatsApp service: %s", remote_media_path)
     finally:
         # Clean up local temp file
-        if os.path.exists(temp_filepath):
-            os.remove(temp_filepath)
+        await _remove_temp_file(temp_filepath)
 
     # Determine scheduled time
     parsed_scheduled_at = None
@@ -654,7 +666,7 @@ async def send_broadcast_with_media(
             parsed_scheduled_at = datetime.fromisoformat(scheduled_at.replace('Z', '+00:00'))
             # Remove timezone info for consistent comparison with utcnow()
             parsed_scheduled_at = parsed_scheduled_at.replace(tzinfo=None)
-            if parsed_scheduled_at <= datetime.utcnow():
+            if parsed_scheduled_at <= utcnow():
                 # Clean up remote media
                 await whatsapp_bridge.delete_media(remote_media_path)
                 raise HTTPException(status_code=400, detail="Scheduled time must be in the future")
@@ -662,7 +674,7 @@ async def send_broadcast_with_media(
             await whatsapp_bridge.delete_media(remote_media_path)
             raise HTTPException(status_code=400, detail="Invalid scheduled_at format")
 
-    final_scheduled_at = parsed_scheduled_at if parsed_scheduled_at else datetime.utcnow()
+    final_scheduled_at = parsed_scheduled_at if parsed_scheduled_at else utcnow()
     # Set status to 'sending' for immediate sends so scheduler doesn't pick it up
     status_val = 'pending' if parsed_scheduled_at else 'sending'
 
@@ -680,6 +692,7 @@ async def send_broadcast_with_media(
     )
     db.add(scheduled_msg)
     db.commit()
+    message_scheduler.notify_new_task()
     db.refresh(scheduled_msg)
 
     # If immediate send, execute in background
@@ -795,7 +808,7 @@ def cancel_scheduled_message(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Cancel a pending scheduled message"""
+    """Cancel a pending scheduled message, or stop a scheduled one that is mid-send"""
     message = db.query(ScheduledMessage).filter(
         ScheduledMessage.id == message_id,
         ScheduledMessage.user_id == current_user.id
@@ -804,15 +817,29 @@ def cancel_scheduled_message(
     if not message:
         raise HTTPException(status_code=404, detail="Scheduled message not found")
 
-    if message.status != 'pending':
+    if message.status not in ('pending', 'sending'):
         raise HTTPException(
             status_code=400,
             detail=f"Cannot cancel message with status '{message.status}'"
         )
 
+    # Immediate sends run in a background task that the scheduler cannot stop;
+    # only 'sending' rows the scheduler owns carry a next_send_at lease
+    if message.status == 'sending' and message.next_send_at is None:
+        raise HTTPException(
+            status_code=400,
+            detail="Cannot cancel an immediate send that is already in progress"
+        )
+
+    was_sending = message.status == 'sending'
     message.status = 'cancelled'
+    message.next_send_at = None
     db.commit()
 
+    if was_sending:
+        # Groups already sent stay sent; the remaining ones are skipped
+        message_scheduler.cancel_task(message_id)
+
     return {"success": True, "message": "Scheduled message cancelled"}
 
 
@@ -860,12 +887,12 @@ async def send_poll_broadcast(
         # Convert to naive datetime for comparison
         scheduled_at = request.scheduled_at.replace(tzinfo=None) if request.scheduled_at.tzinfo else request.scheduled_at
         # Validate scheduled time is in the future
-        if scheduled_at <= datetime.utcnow():
+        if scheduled_at <= utcnow():
             raise HTTPException(status_code=400, detail="Scheduled time must be in the future")
         status = 'pending'
     else:
         # Immediate send - set status to 'sending' so scheduler doesn't pick it up
-        scheduled_at = datetime.utcnow()
+        scheduled_at = utcnow()
         status = 'sending'
 
     # Create scheduled message record with task_type='poll'
@@ -884,6 +911,7 @@ async def send_poll_broadcast(
     )
     db.add(scheduled_msg)
     db.commit()
+    message_scheduler.notify_new_task()
     db.refresh(scheduled_msg)
 
     # If immediate send, execute in background
@@ -927,11 +955,11 @@ async def send_channel_broadcast(
     # Determine scheduled time
     if request.scheduled_at:
         scheduled_at = request.scheduled_at.replace(tzinfo=None) if request.scheduled_at.tzinfo else request.scheduled_at
-        if scheduled_at <= datetime.utcnow():
+        if scheduled_at <= utcnow():
             raise HTTPException(status_code=400, detail="Scheduled time must be in the future")
         status = 'pending'
     else:
-        scheduled_at = datetime.utcnow()
+        scheduled_at = utcnow()
         status = 'sending'
 
     # Create scheduled message record
@@ -946,6 +974,7 @@ async def send_channel_broadcast(
     )
     db.add(scheduled_msg)
     db.commit()
+    message_scheduler.notify_new_task()
     db.refresh(scheduled_msg)
 
     # If immediate send, execute in background
@@ -979,8 +1008,6 @@ async def send_channel_broadcast_with_media(
 ):
     """Send a broadcast message with media to multiple channels (immediate or scheduled)"""
     import json
-    import tempfile
-    import shutil
 
     # Parse channel_ids from JSON string
     try:
@@ -1001,23 +1028,18 @@ async def send_channel_broadcast_with_media(
         raise HTTPException(status_code=400, detail="channel_ids and channel_names must have the same length")
 
     # Save uploaded file temporarily
-    file_extension = os.path.splitext(media.filename)[1] if media.filename else ""
-    with tempfile.NamedTemporaryFile(delete=False, suffix=file_extension) as temp_file:
-        shutil.copyfileobj(media.file, temp_file)
-        temp_filepath = temp_file.name
+    temp_filepath = await asyncio.to_thread(_save_temp_upload, media)
 
     # Upload media to WhatsApp service's persistent volume
     try:
         upload_result = await whatsapp_bridge.upload_media(temp_filepath)
         if not upload_result.get('success'):
-            os.remove(temp_filepath)
             raise HTTPException(status_code=500, detail=f"Failed to upload media: {upload_result.get('error')}")
 
         remote_media_path = upload_result.get('filePath')
-        print(f"[CHANNEL_BROADCAST] Media uploaded to WhatsApp service: {remote_media_path}", flush=True)
+        logger.info("Channel media uploaded to WhatsApp service: %s", remote_media_path)
     finally:
-        if os.path.exists(temp_filepath):
-            os.remove(temp_filepath)
+        await _remove_temp_file(temp_filepath)
 
     # Determine scheduled time
     parsed_scheduled_at = None
@@ -1025,14 +1047,14 @@ async def send_channel_broadcast_with_media(
         try:
             parsed_scheduled_at = datetime.fromisoformat(scheduled_at.replace('Z', '+00:00'))
             parsed_scheduled_at = parsed_scheduled_at.replace(tzinfo=None)
-            if parsed_scheduled_at <= datetime.utcnow():
+            if parsed_scheduled_at <= utcnow():
                 await whatsapp_bridge.delete_media(remote_media_path)
                 raise HTTPException(status_code=400, detail="Scheduled time must be in the future")
         except ValueError:
             await whatsapp_bridge.delete_media(remote_media_path)
             raise HTTPException(status_code=400, detail="Invalid scheduled_at format")
 
-    final_scheduled_at = parsed_scheduled_at if parsed_scheduled_at else datetime.utcnow()
+    final_scheduled_at = parsed_scheduled_at if parsed_scheduled_at else utcnow()
     status_val = 'pending' if parsed_scheduled_at else 'sending'
 
     # Create scheduled message record
@@ -1048,6 +1070,7 @@ async def send_channel_broadcast_with_media(
     )
     db.add(scheduled_msg)
     db.commit()
+    message_scheduler.notify_new_task()
     db.refresh(scheduled_msg)
 
     # If immediate send, execute in background
@@ -1096,11 +1119,11 @@ async def send_channel_poll_broadcast(
     # Determine scheduled time
     if request.scheduled_at:
         scheduled_at = request.scheduled_at.replace(tzinfo=None) if request.scheduled_at.tzinfo else request.scheduled_at
-        if scheduled_at <= datetime.utcnow():
+        if scheduled_at <= utcnow():
             raise HTTPException(status_code=400, detail="Scheduled time must be in the future")
         status = 'pending'
     else:
-        scheduled_at = datetime.utcnow()
+        scheduled_at = utcnow()
         status = 'sending'
 
     # Create scheduled message record
@@ -1117,6 +1140,7 @@ async def send_channel_poll_broadcast(
     )
     db.add(scheduled_msg)
     db.commit()
+    message_scheduler.notify_new_task()
     db.refresh(scheduled_msg)
 
     # If immediate send, execute in background
@@ -1164,5 +1188,13 @@ def get_broadcast_details(
         "groups_sent": message.groups_sent or 0,
         "groups_failed": message.groups_failed or 0,
         "error_message": message.error_message,
+        "errors": [
+            {
+                "group_id": e.group_id,
+                "error": e.error,
+                "created_at": e.created_at.isoformat() if e.created_at else None
+            }
+            for e in message.errors
+        ],
         "created_at": message.created_at.isoformat() if message.created_at else None
     }
@@ -1,15 +1,16 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import desc, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import desc, and_, func, select
 from typing import List, Optional
 from datetime import date
 import csv
 import io
 
-from app.database import get_db
+from app.database import get_db, get_async_db
 from app.models.user import User
-from app.models.event import Event
+from app.models.event import Event, EVENT_TYPES
 from app.models.monitored_group import MonitoredGroup
 from app.schemas.event import EventResponse, EventList, EventFilter
 from app.api.deps import get_current_user
@@ -18,7 +19,7 @@ router = APIRouter()
 
 
 @router.get("/", response_model=EventList)
-def get_events(
+async def get_events(
     event_type: Optional[str] = None,
     date_from: Optional[date] = None,
     date_to: Optional[date] = None,
@@ -27,36 +28,39 @@ def get_events(
     limit: int = Query(default=50, le=100),
     offset: int = 0,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get events with optional filtering"""
-    query = db.query(Event).filter(Event.user_id == current_user.id)
+    query = select(Event).where(Event.user_id == current_user.id)
 
     # Exclude certificates by default - they have their own page
-    query = query.filter(Event.event_type.in_(["JOIN", "LEAVE"]))
+    query = query.where(Event.event_type.in_(["JOIN", "LEAVE"]))
 
     # Apply filters
     if event_type:
-        query = query.filter(Event.event_type == event_type.upper())
+        if event_type.upper() not in EVENT_TYPES:
+            raise HTTPException(status_code=400, detail="Invalid event_type")
+        query = query.where(Event.event_type == event_type.upper())
 
     if date_from:
-        query = query.filter(Event.event_date >= date_from)
+        query = query.where(Event.event_date >= date_from)
 
     if date_to:
-        query = query.filter(Event.event_date <= date_to)
+        query = query.where(Event.event_date <= date_to)
 
     if member_name:
-        query = query.filter(Event.member_name.ilike(f"%{member_name}%"))
+        query = query.where(Event.member_name.ilike(f"%{member_name}%"))
 
     if group_id:
-        query = query.filter(Event.group_id == group_id)
+        query = query.where(Event.group_id == group_id)
 
-    total = query.count()
+    total = await db.scalar(select(func.count()).select_from(query.subquery()))
 
-    events = query.order_by(desc(Event.timestamp))\
-        .offset(offset)\
-        .limit(limit)\
-        .all()
+    events = (await db.scalars(
+        query.order_by(desc(Event.timestamp))
+        .offset(offset)
+        .limit(limit)
+    )).all()
 
     return EventList(
         events=events,
@@ -67,7 +71,7 @@ def get_events(
 
 
 @router.get("/group/{group_id}", response_model=EventList)
-def get_group_events(
+async def get_group_events(
     group_id: int,
     event_type: Optional[str] = None,
     date_from: Optional[date] = None,
@@ -75,42 +79,45 @@ def get_group_events(
     limit: int = Query(default=50, le=100),
     offset: int = 0,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get events for a specific group"""
     # Verify group belongs to user
-    group = db.query(MonitoredGroup).filter(
+    group = await db.scalar(select(MonitoredGroup.id).where(
         MonitoredGroup.id == group_id,
         MonitoredGroup.user_id == current_user.id
-    ).first()
+    ))
 
     if not group:
         raise HTTPException(status_code=404, detail="Group not found")
 
-    query = db.query(Event).filter(
+    query = select(Event).where(
         Event.user_id == current_user.id,
         Event.group_id == group_id
     )
 
     # Exclude certificates by default
-    query = query.filter(Event.event_type.in_(["JOIN", "LEAVE"]))
+    query = query.where(Event.event_type.in_(["JOIN", "LEAVE"]))
 
     # Apply filters
     if event_type:
-        query = query.filter(Event.event_type == event_type.upper())
+        if event_type.upper() not in EVENT_TYPES:
+            raise HTTPException(status_code=400, detail="Invalid event_type")
+        query = query.where(Event.event_type == event_type.upper())
 
     if date_from:
-        query = query.filter(Event.event_date >= date_from)
+        query = query.where(Event.event_date >= date_from)
 
     if date_to:
-        query = query.filter(Event.event_date <= date_to)
+        query = query.where(Event.event_date <= date_to)
 
-    total = query.count()
+    total = await db.scalar(select(func.count()).select_from(query.subquery()))
 
-    events = query.order_by(desc(Event.timestamp))\
-        .offset(offset)\
-        .limit(limit)\
-        .all()
+    events = (await db.scalars(
+        query.order_by(desc(Event.timestamp))
+        .offset(offset)
+        .limit(limit)
+    )).all()
 
     return EventList(
         events=events,
@@ -161,7 +168,6 @@ def get_daily_events(
 ):
     """Get daily event counts for charting"""
     from datetime import timedelta
-    from sqlalchemy import func
 
     end_date = date.today()
     start_date = end_date - timedelta(days=days)
@@ -213,6 +219,8 @@ def export_events_csv(
 
     # Apply filters
     if event_type:
+        if event_type.upper() not in EVENT_TYPES:
+            raise HTTPException(status_code=400, detail="Invalid event_type")
         query = query.filter(Event.event_type == event_type.upper())
 
     if date_from:
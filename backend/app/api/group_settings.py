@@ -1,3 +1,4 @@
+import asyncio
 from datetime import datetime, timedelta, time
 from typing import List, Optional
 
@@ -13,6 +14,7 @@ from app.models.monitored_group import MonitoredGroup
 from app.api.deps import get_current_user
 from app.services.whatsapp_bridge import whatsapp_bridge
 from app.services.websocket_manager import websocket_manager
+from app.services.message_scheduler import message_scheduler, mention_args, utcnow, SCHEDULER_TZ, local_to_utc
 
 router = APIRouter()
 
@@ -48,26 +50,22 @@ def parse_time_string(time_str: str) -> tuple:
         raise HTTPException(status_code=400, detail=f"Invalid time format: {time_str}. Use HH:MM format.")
 
 
-def calculate_next_scheduled_time(time_str: str, timezone_offset_hours: int = 2) -> datetime:
+def calculate_next_scheduled_time(time_str: str) -> datetime:
     """
     Calculate next occurrence of the given time (today if not passed, tomorrow if passed).
-    Converts from local time to UTC by subtracting the timezone offset.
+    The time is read in SCHEDULER_TZ and returned as naive UTC.
 
     Args:
         time_str: Time in HH:MM format (user's local time)
-        timezone_offset_hours: Hours ahead of UTC (default 2 for Egypt/UTC+2)
     """
     hour, minute = parse_time_string(time_str)
-    now = datetime.utcnow()
+    at = time(hour, minute)
+    today = datetime.now(SCHEDULER_TZ).date()
 
-    # Create datetime in user's local time, then convert to UTC
-    local_scheduled = datetime.combine(now.date(), time(hour, minute))
-    # Subtract timezone offset to convert local time to UTC
-    scheduled_utc = local_scheduled - timedelta(hours=timezone_offset_hours)
-
-    # If time has already passed today (in UTC), schedule for tomorrow
-    if scheduled_utc <= now:
-        scheduled_utc = scheduled_utc + timedelta(days=1)
+    scheduled_utc = local_to_utc(today, at)
+    # If time has already passed today, schedule for tomorrow
+    if scheduled_utc <= utcnow():
+        scheduled_utc = local_to_utc(today + timedelta(days=1), at)
 
     return scheduled_utc
 
@@ -147,6 +145,7 @@ def create_settings_schedule(
     )
     db.add(close_task)
     db.commit()
+    message_scheduler.notify_new_task()
 
     return {
         "success": True,
@@ -338,6 +337,7 @@ def toggle_schedule(
         db.add(new_open)
         db.add(new_close)
         db.commit()
+        message_scheduler.notify_new_task()
 
         return {
             "success": True,
@@ -363,17 +363,21 @@ async def execute_immediate_settings(
     groups_failed = 0
     errors = []
 
-    for i, group_id in enumerate(group_ids):
-        # 30-second delay between groups (except first)
-        if i > 0:
-            import asyncio
-            await asyncio.sleep(30)
+    mention_all, selected_ids = mention_args(mention_type, mention_ids)
+
+    # Fetch all target groups in one query (only the columns a send needs)
+    groups_by_id = {row.id: row for row in db.query(
+        MonitoredGroup.id, MonitoredGroup.whatsapp_group_id, MonitoredGroup.group_name
+    ).filter(
+        MonitoredGroup.id.in_(group_ids),
+        MonitoredGroup.user_id == user_id
+    ).all()}
+
+    for group_id in group_ids:
+        await message_scheduler.wait_for_send_slot(user_id)
 
         try:
-            group = db.query(MonitoredGroup).filter(
-                MonitoredGroup.id == group_id,
-                MonitoredGroup.user_id == user_id
-            ).first()
+            group = groups_by_id.get(group_id)
 
             if not group:
                 groups_failed += 1
@@ -396,12 +400,12 @@ async def execute_immediate_settings(
                         user_id=user_id,
                         group_id=group.whatsapp_group_id,
                         content=message,
-                        mention_all=(mention_type == 'all'),
-                        mention_ids=mention_ids if mention_type == 'selected' else None
+                        mention_all=mention_all,
+                        mention_ids=selected_ids
                     )
 
-                # Notify progress
-                await websocket_manager.send_to_user(user_id, {
+                # Notify progress (queued, never blocks the send loop)
+                websocket_manager.send_to_user_nowait(user_id, {
                     'type': 'immediate_settings_progress',
                     'action': action,
                     'group_name': group.group_name,
@@ -1,3 +1,4 @@
+import asyncio
 import os
 import shutil
 import uuid
@@ -18,6 +19,12 @@ UPLOAD_DIR = "/tmp/whatsapp_uploads"
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
 
+def _write_upload(media: UploadFile, path: str):
+    """Copy an upload to disk (blocking, run in a thread)"""
+    with open(path, "wb") as buffer:
+        shutil.copyfileobj(media.file, buffer)
+
+
 class SendMessageRequest(BaseModel):
     content: str
     mention_all: bool = False
@@ -214,12 +221,10 @@ async def send_media_to_group(
 
     # Save uploaded file temporarily
     file_extension = os.path.splitext(media.filename)[1] if media.filename else ""
-    temp_filename = f"{uuid.uuid4()}{file_extension}"
-    temp_filepath = os.path.join(UPLOAD_DIR, temp_filename)
+    temp_filepath = f"{UPLOAD_DIR}/{uuid.uuid4().hex}{file_extension}"
 
     try:
-        with open(temp_filepath, "wb") as buffer:
-            shutil.copyfileobj(media.file, buffer)
+        await asyncio.to_thread(_write_upload, media, temp_filepath)
 
         # Parse mention_ids if provided
         parsed_mention_ids = None
@@ -248,8 +253,7 @@ async def send_media_to_group(
         return result
     finally:
         # Clean up temp file
-        if os.path.exists(temp_filepath):
-            try:
-                os.remove(temp_filepath)
-            except Exception:
-                pass
+        try:
+            await asyncio.to_thread(os.remove, temp_filepath)
+        except OSError:
+            pass
@@ -1,9 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import desc, func, select
 from typing import List, Optional
 
-from app.database import get_db
+from app.database import get_async_db
 from app.models.user import User
 from app.models.message import Message
 from app.models.monitored_group import MonitoredGroup
@@ -14,25 +14,26 @@ router = APIRouter()
 
 
 @router.get("/", response_model=MessageList)
-def get_messages(
+async def get_messages(
     group_id: Optional[int] = None,
     limit: int = Query(default=50, le=100),
     offset: int = 0,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get messages for current user (optionally filtered by group)"""
-    query = db.query(Message).filter(Message.user_id == current_user.id)
+    query = select(Message).where(Message.user_id == current_user.id)
 
     if group_id:
-        query = query.filter(Message.group_id == group_id)
+        query = query.where(Message.group_id == group_id)
 
-    total = query.count()
+    total = await db.scalar(select(func.count()).select_from(query.subquery()))
 
-    messages = query.order_by(desc(Message.timestamp))\
-        .offset(offset)\
-        .limit(limit)\
-        .all()
+    messages = (await db.scalars(
+        query.order_by(desc(Message.timestamp))
+        .offset(offset)
+        .limit(limit)
+    )).all()
 
     return MessageList(
         messages=messages,
@@ -43,34 +44,35 @@ def get_messages(
 
 
 @router.get("/group/{group_id}", response_model=MessageList)
-def get_group_messages(
+async def get_group_messages(
     group_id: int,
     limit: int = Query(default=50, le=100),
     offset: int = 0,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get messages for a specific group"""
     # Verify group belongs to user
-    group = db.query(MonitoredGroup).filter(
+    group = await db.scalar(select(MonitoredGroup.id).where(
         MonitoredGroup.id == group_id,
         MonitoredGroup.user_id == current_user.id
-    ).first()
+    ))
 
     if not group:
         raise HTTPException(status_code=404, detail="Group not found")
 
-    query = db.query(Message).filter(
+    query = select(Message).where(
         Message.user_id == current_user.id,
         Message.group_id == group_id
     )
 
-    total = query.count()
+    total = await db.scalar(select(func.count()).select_from(query.subquery()))
 
-    messages = query.order_by(desc(Message.timestamp))\
-        .offset(offset)\
-        .limit(limit)\
-        .all()
+    messages = (await db.scalars(
+        query.order_by(desc(Message.timestamp))
+        .offset(offset)
+        .limit(limit)
+    )).all()
 
     return MessageList(
         messages=messages,
@@ -81,29 +83,30 @@ def get_group_messages(
 
 
 @router.get("/search", response_model=MessageList)
-def search_messages(
+async def search_messages(
     q: str = Query(..., min_length=1),
     group_id: Optional[int] = None,
     limit: int = Query(default=50, le=100),
     offset: int = 0,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Search messages by content"""
-    query = db.query(Message).filter(
+    query = select(Message).where(
         Message.user_id == current_user.id,
         Message.content.ilike(f"%{q}%")
     )
 
     if group_id:
-        query = query.filter(Message.group_id == group_id)
+        query = query.where(Message.group_id == group_id)
 
-    total = query.count()
+    total = await db.scalar(select(func.count()).select_from(query.subquery()))
 
-    messages = query.order_by(desc(Message.timestamp))\
-        .offset(offset)\
-        .limit(limit)\
-        .all()
+    messages = (await db.scalars(
+        query.order_by(desc(Message.timestamp))
+        .offset(offset)
+        .limit(limit)
+    )).all()
 
     return MessageList(
         messages=messages,
@@ -114,16 +117,16 @@ def search_messages(
 
 
 @router.get("/{message_id}", response_model=MessageResponse)
-def get_message(
+async def get_message(
     message_id: str,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get a specific message"""
-    message = db.query(Message).filter(
+    message = await db.scalar(select(Message).where(
         Message.id == message_id,
         Message.user_id == current_user.id
-    ).first()
+    ))
 
     if not message:
         raise HTTPException(status_code=404, detail="Message not found")
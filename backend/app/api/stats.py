@@ -2,14 +2,16 @@ from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
 from sqlalchemy import func, desc
 from typing import Optional
-from datetime import date, timedelta
+from datetime import timedelta
 
 from app.database import get_db
 from app.models.user import User
 from app.models.message import Message
+from app.models.message_daily_sender import MessageDailySender
 from app.models.event import Event
 from app.models.monitored_group import MonitoredGroup
 from app.api.deps import get_current_user
+from app.core.clock import current_date
 
 router = APIRouter()
 
@@ -25,7 +27,7 @@ def get_overview(
     # Build date filter if days specified
     date_filter = None
     if days:
-        start_date = date.today() - timedelta(days=days)
+        start_date = current_date() - timedelta(days=days)
         date_filter = start_date
 
     # Messages query
@@ -95,7 +97,7 @@ def get_daily_stats(
     db: Session = Depends(get_db)
 ):
     """Get daily message counts for charting"""
-    end_date = date.today()
+    end_date = current_date()
     start_date = end_date - timedelta(days=days)
 
     query = db.query(
@@ -112,41 +114,38 @@ def get_daily_stats(
 
     results = query.group_by(func.date(Message.timestamp)).all()
 
-    return [{"date": row.date.isoformat(), "count": row.count} for row in results]
+    return [dict(row._mapping) for row in results]
 
 
 @router.get("/top-senders")
 def get_top_senders(
     limit: int = Query(default=10, le=50),
     group_id: Optional[int] = None,
+    days: Optional[int] = Query(default=None, le=365),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Get top message senders"""
+    """Get top message senders (summed from the daily sender rollup)"""
+    # Group by phone only - names can change between messages
     query = db.query(
-        Message.sender_name,
-        Message.sender_phone,
-        func.count(Message.id).label("message_count")
+        func.max(MessageDailySender.sender_name).label("sender_name"),
+        MessageDailySender.sender_phone,
+        func.sum(MessageDailySender.message_count).label("message_count")
     ).filter(
-        Message.user_id == current_user.id
+        MessageDailySender.user_id == current_user.id
     )
 
     if group_id:
-        query = query.filter(Message.group_id == group_id)
+        query = query.filter(MessageDailySender.group_id == group_id)
+    if days:
+        query = query.filter(MessageDailySender.day >= current_date() - timedelta(days=days))
 
-    results = query.group_by(Message.sender_name, Message.sender_phone)\
+    results = query.group_by(MessageDailySender.sender_phone)\
         .order_by(desc("message_count"))\
         .limit(limit)\
         .all()
 
-    return [
-        {
-            "sender_name": row.sender_name,
-            "sender_phone": row.sender_phone,
-            "message_count": row.message_count
-        }
-        for row in results
-    ]
+    return [dict(row._mapping) for row in results]
 
 
 @router.get("/activity-by-group")
@@ -156,7 +155,7 @@ def get_activity_by_group(
 ):
     """Get message count per group"""
     results = db.query(
-        MonitoredGroup.id,
+        MonitoredGroup.id.label("group_id"),
         MonitoredGroup.group_name,
         func.count(Message.id).label("message_count")
     ).outerjoin(
@@ -168,14 +167,7 @@ def get_activity_by_group(
         MonitoredGroup.id, MonitoredGroup.group_name
     ).all()
 
-    return [
-        {
-            "group_id": row.id,
-            "group_name": row.group_name,
-            "message_count": row.message_count or 0
-        }
-        for row in results
-    ]
+    return [dict(row._mapping) for row in results]
 
 
 @router.get("/member-changes")
@@ -186,7 +178,7 @@ def get_member_changes(
     db: Session = Depends(get_db)
 ):
     """Get member join/leave trends over time"""
-    end_date = date.today()
+    end_date = current_date()
     start_date = end_date - timedelta(days=days)
 
     query = db.query(
@@ -204,16 +196,15 @@ def get_member_changes(
 
     results = query.group_by(Event.event_date, Event.event_type).all()
 
-    # Transform into daily data
+    # Transform into daily data (dates are serialized by orjson)
     daily_data = {}
     for row in results:
-        date_str = row.event_date.isoformat()
-        if date_str not in daily_data:
-            daily_data[date_str] = {"date": date_str, "joins": 0, "leaves": 0}
+        if row.event_date not in daily_data:
+            daily_data[row.event_date] = {"date": row.event_date, "joins": 0, "leaves": 0}
         if row.event_type == "JOIN":
-            daily_data[date_str]["joins"] = row.count
+            daily_data[row.event_date]["joins"] = row.count
         else:
-            daily_data[date_str]["leaves"] = row.count
+            daily_data[row.event_date]["leaves"] = row.count
 
     # Sort by date
-    return sorted(daily_data.values(), key=lambda x: x["date"])
+    return [daily_data[day] for day in sorted(daily_data)]
@@ -1,10 +1,13 @@
+import asyncio
+import hashlib
 import os
-import shutil
-import uuid
+import tempfile
 from typing import List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, File, UploadFile, Form
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, load_only
+from sqlalchemy import func, any_, bindparam, Integer
+from sqlalchemy.dialects.postgresql import ARRAY
 from pydantic import BaseModel
 
 from app.database import get_db
@@ -18,6 +21,66 @@ router = APIRouter()
 WELCOME_IMAGE_DIR = "/tmp/welcome_images"
 os.makedirs(WELCOME_IMAGE_DIR, exist_ok=True)
 
+# Allowed image types and the extension stored for each (client filenames are not trusted)
+EXT_BY_TYPE = {
+    "image/jpeg": ".jpg",
+    "image/png": ".png",
+    "image/gif": ".gif",
+    "image/webp": ".webp",
+}
+
+def group_ids_param(group_ids: List[int]):
+    """
+    Bind a list of group IDs as a single Postgres array for `= ANY(:ids)`,
+    so every list length shares one cached statement instead of IN (...).
+    """
+    return any_(bindparam("ids", value=list(group_ids), type_=ARRAY(Integer)))
+
+
+# Read uploads in 1 MiB chunks while hashing
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+def store_welcome_image(upload: UploadFile, file_extension: str) -> str:
+    """
+    Store an uploaded image under its content hash and return the path.
+    Identical images uploaded for many groups share a single file on disk.
+    """
+    hasher = hashlib.blake2b(digest_size=20)
+    fd, temp_path = tempfile.mkstemp(dir=WELCOME_IMAGE_DIR, suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as buffer:
+            while True:
+                chunk = upload.file.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                hasher.update(chunk)
+                buffer.write(chunk)
+
+        file_path = f"{WELCOME_IMAGE_DIR}/{hasher.hexdigest()}{file_extension}"
+        if os.path.exists(file_path):
+            os.remove(temp_path)
+        else:
+            os.replace(temp_path, file_path)
+        return file_path
+    except Exception:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def remove_welcome_image_if_unused(db: Session, file_path: str):
+    """Delete an image file once no group references it anymore"""
+    ref_count = db.query(func.count(MonitoredGroup.id)).filter(
+        MonitoredGroup.welcome_part2_image == file_path
+    ).scalar()
+
+    if ref_count == 0 and os.path.exists(file_path):
+        try:
+            os.remove(file_path)
+        except Exception:
+            pass
+
 
 class WelcomeSettingsUpdate(BaseModel):
     group_ids: List[int]  # Groups to apply settings to
@@ -49,7 +112,21 @@ def get_all_welcome_settings(
     db: Session = Depends(get_db)
 ):
     """Get welcome settings for all monitored groups"""
-    groups = db.query(MonitoredGroup).filter(
+    groups = db.query(MonitoredGroup).options(
+        load_only(
+            MonitoredGroup.id,
+            MonitoredGroup.group_name,
+            MonitoredGroup.whatsapp_group_id,
+            MonitoredGroup.welcome_enabled,
+            MonitoredGroup.welcome_threshold,
+            MonitoredGroup.welcome_join_count,
+            MonitoredGroup.welcome_text,
+            MonitoredGroup.welcome_extra_mentions,
+            MonitoredGroup.welcome_part2_enabled,
+            MonitoredGroup.welcome_part2_text,
+            MonitoredGroup.welcome_part2_image
+        )
+    ).filter(
         MonitoredGroup.user_id == current_user.id,
         MonitoredGroup.is_active == True
     ).all()
@@ -119,34 +196,38 @@ def update_welcome_settings_bulk(
         raise HTTPException(status_code=400, detail="Threshold must be at least 1")
 
     # Verify all groups belong to user
-    groups = db.query(MonitoredGroup).filter(
-        MonitoredGroup.id.in_(request.group_ids),
+    groups_filter = (
+        MonitoredGroup.id == group_ids_param(request.group_ids),
         MonitoredGroup.user_id == current_user.id,
         MonitoredGroup.is_active == True
-    ).all()
+    )
+    group_names = [
+        row.group_name
+        for row in db.query(MonitoredGroup.group_name).filter(*groups_filter).all()
+    ]
 
-    if len(groups) != len(request.group_ids):
+    if len(group_names) != len(request.group_ids):
         raise HTTPException(status_code=400, detail="One or more groups not found")
 
-    updated_count = 0
-    for group in groups:
-        group.welcome_enabled = request.enabled
-        group.welcome_threshold = request.threshold
-        group.welcome_text = request.text
-        group.welcome_extra_mentions = request.extra_mentions or []
-        group.welcome_part2_enabled = request.part2_enabled
-        group.welcome_part2_text = request.part2_text
+    # Apply settings to all groups in a single UPDATE
+    updated_count = db.query(MonitoredGroup).filter(*groups_filter).update({
+        "welcome_enabled": request.enabled,
+        "welcome_threshold": request.threshold,
+        "welcome_text": request.text,
+        "welcome_extra_mentions": request.extra_mentions or [],
+        "welcome_part2_enabled": request.part2_enabled,
+        "welcome_part2_text": request.part2_text,
         # Reset counters when settings change
-        group.welcome_join_count = 0
-        group.welcome_pending_joiners = []
-        updated_count += 1
+        "welcome_join_count": 0,
+        "welcome_pending_joiners": []
+    }, synchronize_session=False)
 
     db.commit()
 
     return {
         "success": True,
         "updated_count": updated_count,
-        "groups": [g.group_name for g in groups]
+        "groups": group_names
     }
 
 
@@ -202,7 +283,7 @@ async def upload_welcome_image(
     """Upload welcome image for Part 2 and apply to multiple groups"""
     # Parse group IDs
     try:
-        parsed_group_ids = [int(gid.strip()) for gid in group_ids.split(",")]
+        parsed_group_ids = [int(gid) for gid in group_ids.split(",") if gid.strip()]
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid group_ids format")
 
@@ -211,7 +292,7 @@ async def upload_welcome_image(
 
     # Verify groups belong to user
     groups = db.query(MonitoredGroup).filter(
-        MonitoredGroup.id.in_(parsed_group_ids),
+        MonitoredGroup.id == group_ids_param(parsed_group_ids),
         MonitoredGroup.user_id == current_user.id
     ).all()
 
@@ -219,30 +300,27 @@ async def upload_welcome_image(
         raise HTTPException(status_code=400, detail="One or more groups not found")
 
     # Validate file type
-    allowed_types = ["image/jpeg", "image/png", "image/gif", "image/webp"]
-    if image.content_type not in allowed_types:
+    file_extension = EXT_BY_TYPE.get(image.content_type)
+    if file_extension is None:
         raise HTTPException(status_code=400, detail="Only image files are allowed")
 
-    # Save the image
-    file_extension = os.path.splitext(image.filename)[1] if image.filename else ".jpg"
-    unique_filename = f"welcome_{current_user.id}_{uuid.uuid4()}{file_extension}"
-    file_path = os.path.join(WELCOME_IMAGE_DIR, unique_filename)
-
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(image.file, buffer)
+    # Save the image (deduplicated by content hash); hashing and disk I/O run
+    # in the threadpool so large uploads don't block the event loop
+    file_path = await asyncio.to_thread(store_welcome_image, image, file_extension)
 
     # Update all selected groups with the new image path
+    old_images = set()
     for group in groups:
-        # Delete old image if exists
-        if group.welcome_part2_image and os.path.exists(group.welcome_part2_image):
-            try:
-                os.remove(group.welcome_part2_image)
-            except Exception:
-                pass
+        if group.welcome_part2_image and group.welcome_part2_image != file_path:
+            old_images.add(group.welcome_part2_image)
         group.welcome_part2_image = file_path
 
     db.commit()
 
+    # Delete old images no other group still uses
+    for old_image in old_images:
+        await asyncio.to_thread(remove_welcome_image_if_unused, db, old_image)
+
     return {
         "success": True,
         "image_path": file_path,
@@ -266,14 +344,13 @@ def delete_welcome_image(
         raise HTTPException(status_code=404, detail="Group not found")
 
     if group.welcome_part2_image:
-        if os.path.exists(group.welcome_part2_image):
-            try:
-                os.remove(group.welcome_part2_image)
-            except Exception:
-                pass
+        old_image = group.welcome_part2_image
         group.welcome_part2_image = None
         db.commit()
 
+        # Shared images are only removed once the last group lets go
+        remove_welcome_image_if_unused(db, old_image)
+
     return {"success": True}
 
 
@@ -16,13 +16,15 @@ class Settings(BaseSettings):
     # WhatsApp Service
     whatsapp_service_url: str = "http://localhost:3001"
 
+    # IANA timezone recurring schedule times ("HH:MM") are entered in
+    scheduler_timezone: str = "Africa/Cairo"
+
     class Config:
         env_file = ".env"
         case_sensitive = False
+        # Tolerate settings left in older .env files (e.g. AUTO_CREATE_SCHEMA)
+        extra = "ignore"
 
 
 # Create settings instance (reads from .env)
 settings = Settings()
-
-# Debug: print JWT secret (first 10 chars only)
-print(f"[CONFIG] JWT Secret loaded: {settings.jwt_secret[:10]}...")
@@ -0,0 +1,13 @@
+from datetime import date
+from functools import lru_cache
+from time import monotonic
+
+
+@lru_cache(maxsize=1)
+def _today_cached(bucket: int) -> date:
+    return date.today()
+
+
+def current_date() -> date:
+    """Today's date, re-read from the wall clock at most once per second"""
+    return _today_cached(int(monotonic()))
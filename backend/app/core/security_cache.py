@@ -0,0 +1,31 @@
+import hashlib
+import time
+from typing import Optional
+
+from cachetools import TTLCache
+
+from app.core.security import decode_token
+
+# Upper bound on how long a decoded token is trusted without re-verifying it
+TOKEN_CACHE_TTL = 60
+
+# blake2b(token) -> (payload, exp)
+_token_cache = TTLCache(maxsize=10_000, ttl=TOKEN_CACHE_TTL)
+
+
+def decode_token_cached(token: str) -> Optional[dict]:
+    """Decode a JWT token, reusing the result for repeat tokens until min(exp, 60s)"""
+    key = hashlib.blake2b(token.encode(), digest_size=16).digest()
+    now = time.time()
+
+    cached = _token_cache.get(key)
+    if cached is not None:
+        payload, exp = cached
+        if exp is None or exp > now:
+            return payload
+        _token_cache.pop(key, None)
+
+    payload = decode_token(token)
+    if payload is not None:
+        _token_cache[key] = (payload, payload.get("exp"))
+    return payload
@@ -1,54 +1,73 @@
 # Redeploy trigger
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from uvicorn.middleware.proxy_headers import ProxyHeadersMiddleware
 from contextlib import asynccontextmanager
+from sqlalchemy.orm import configure_mappers
 import asyncio
+import logging
+import orjson
 import redis.asyncio as redis
 import os
 
-from app.config import settings
-from app.database import engine, Base, get_db
+from app.core.logging_config import setup_logging, stop_logging
+from app.database import engine, async_engine, get_db
+from app import redis_pool
 from app.api import auth, whatsapp, groups, messages, events, stats, admin, certificates, broadcast, group_settings, welcome, agents
 from app.services.websocket_manager import websocket_manager
 from app.services.redis_subscriber import redis_subscriber
 from app.services.message_scheduler import message_scheduler
-from app.core.security import decode_token
+from app.services.agent_service import agent_service
+from app.services.whatsapp_bridge import whatsapp_bridge
+from app.core.security_cache import decode_token_cached
 from app.models.user import User
 
+setup_logging()
+logger = logging.getLogger(__name__)
+ws_logger = logging.getLogger("ws")
 
-def run_migrations():
-    """Run Alembic migrations on startup"""
+# Compile all ORM mappers now so the first request doesn't pay for it
+configure_mappers()
+
+
+def assert_db_at_head():
+    """Check the database is on the latest Alembic revision (migrations run in scripts/prestart.py)"""
     from alembic.config import Config
-    from alembic import command
+    from alembic.runtime.migration import MigrationContext
+    from alembic.script import ScriptDirectory
 
     # Get the directory where alembic.ini is located
     base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
     alembic_ini = os.path.join(base_dir, "alembic.ini")
+    if not os.path.exists(alembic_ini):
+        return
+
+    alembic_cfg = Config(alembic_ini)
+    alembic_cfg.set_main_option("script_location", os.path.join(base_dir, "alembic"))
+    try:
+        head = ScriptDirectory.from_config(alembic_cfg).get_current_head()
+        with engine.connect() as conn:
+            current = MigrationContext.from_connection(conn).get_current_revision()
+    except Exception as e:
+        logger.error("Could not check Alembic revision: %s", e)
+        return
 
-    if os.path.exists(alembic_ini):
-        alembic_cfg = Config(alembic_ini)
-        alembic_cfg.set_main_option("script_location", os.path.join(base_dir, "alembic"))
-        try:
-            command.upgrade(alembic_cfg, "head")
-            print("[Startup] Alembic migrations completed")
-        except Exception as e:
-            print(f"[Startup] Alembic migration error: {e}")
-            # Fall back to create_all for new deployments
-            Base.metadata.create_all(bind=engine)
-    else:
-        # No alembic.ini, use create_all
-        Base.metadata.create_all(bind=engine)
+    if current != head:
+        logger.warning("Database is at revision %s, expected %s; run scripts/prestart.py", current, head)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
-    # Run database migrations
-    run_migrations()
+    # Migrations are applied by scripts/prestart.py before the workers boot
+    assert_db_at_head()
 
     # Initialize Redis connection
-    app.state.redis = redis.from_url(settings.redis_url)
+    app.state.redis = redis.Redis(connection_pool=redis_pool.pool)
+
+    # Shared pooled HTTP client for calls to the WhatsApp service
+    whatsapp_bridge.open()
 
     # Start Redis subscriber in background
     asyncio.create_task(redis_subscriber.start())
@@ -62,29 +81,38 @@ async def lifespan(app: FastAPI):
     message_scheduler.stop()
     await redis_subscriber.stop()
     await app.state.redis.close()
+    await redis_pool.pool.disconnect()
+    await agent_service.close()
+    await whatsapp_bridge.close()
+    await async_engine.dispose()
+    stop_logging()
 
 
 app = FastAPI(
     title="WhatsApp Analytics API",
     description="Multi-tenant WhatsApp group monitoring platform",
     version="1.0.0",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
 # Trust proxy headers (Railway uses X-Forwarded-Proto for HTTPS)
 app.add_middleware(ProxyHeadersMiddleware, trusted_hosts=["*"])
 
-# CORS middleware
+# CORS middleware (exact origins/methods/headers, no wildcard matching)
+CORS_ORIGINS = frozenset({
+    "http://localhost:5173",
+    "http://localhost:3000",
+    "https://frontend-production-a19b.up.railway.app",
+})
+
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=[
-        "http://localhost:5173",
-        "http://localhost:3000",
-        "https://frontend-production-a19b.up.railway.app",
-    ],
+    allow_origins=sorted(CORS_ORIGINS),
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST", "PUT", "DELETE", "PATCH", "OPTIONS"],
+    allow_headers=["authorization", "content-type"],
+    expose_headers=["content-disposition"],
 )
 
 # Include routers
@@ -123,7 +151,7 @@ async def websocket_endpoint(
         return
 
     # Validate token
-    payload = decode_token(token)
+    payload = decode_token_cached(token)
     if not payload:
         await websocket.close(code=4001)
         return
@@ -139,16 +167,34 @@ async def websocket_endpoint(
         await websocket.close(code=4001)
         return
 
-    print(f"[WS] User {user_id} connected")
+    ws_logger.info("connect user=%d", user_id)
 
     # Connect
     await websocket_manager.connect(websocket, user_id)
 
+    # Liveness is handled by uvicorn's protocol-level ping frames
+    # (--ws-ping-interval), so this loop only wakes for client frames
+    # (channel sub/unsub) and the final disconnect.
     try:
         while True:
-            # Keep connection alive, handle any incoming messages
-            data = await websocket.receive_text()
-            print(f"[WS] Received from user {user_id}: {data}")
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+
+            data = message.get("text") or message.get("bytes")
+            if not data:
+                continue
+            try:
+                frame = orjson.loads(data)
+            except orjson.JSONDecodeError:
+                ws_logger.debug("invalid frame user=%d", user_id)
+                continue
+            if ws_logger.isEnabledFor(logging.DEBUG):
+                ws_logger.debug("received from user=%d: %s", user_id, frame)
+            if isinstance(frame, dict):
+                websocket_manager.handle_frame(websocket, frame)
     except WebSocketDisconnect:
-        print(f"[WS] User {user_id} disconnected")
+        pass
+    finally:
+        ws_logger.info("disconnect user=%d", user_id)
         websocket_manager.disconnect(websocket, user_id)
@@ -4,5 +4,12 @@ from app.models.monitored_group import MonitoredGroup
 from app.models.message import Message
 from app.models.event import Event
 from app.models.scheduled_message import ScheduledMessage
+from app.models.scheduled_message_error import ScheduledMessageError
+from app.models.agent import Agent
+from app.models.agent_enabled_group import AgentEnabledGroup
+from app.models.message_daily_sender import MessageDailySender
 
-__all__ = ["User", "WhatsAppSession", "MonitoredGroup", "Message", "Event", "ScheduledMessage"]
+__all__ = [
+    "User", "WhatsAppSession", "MonitoredGroup", "Message", "Event", "ScheduledMessage", "Agent",
+    "AgentEnabledGroup", "MessageDailySender", "ScheduledMessageError"
+]
@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, JSON
+from typing import List
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
@@ -7,7 +8,7 @@ from app.database import Base
 class Agent(Base):
     __tablename__ = "agents"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
 
     # Agent settings
@@ -21,12 +22,15 @@ class Agent(Base):
     # Status
     is_active = Column(Boolean, default=False)  # Only one agent can be active per user
 
-    # Groups where agent is enabled (JSON array of group IDs)
-    enabled_group_ids = Column(JSON, default=list)
-
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
     # Relationships
     user = relationship("User", back_populates="agents")
+    # Groups where agent is enabled
+    enabled_groups = relationship("AgentEnabledGroup", cascade="all, delete-orphan", passive_deletes=True)
+
+    @property
+    def enabled_group_ids(self) -> List[int]:
+        return [g.group_id for g in self.enabled_groups]
@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Integer, ForeignKey, Index
+from app.database import Base
+
+
+class AgentEnabledGroup(Base):
+    """Groups an agent is enabled to reply in"""
+    __tablename__ = "agent_enabled_groups"
+
+    # Composite primary key doubles as the unique (agent_id, group_id) lookup index
+    agent_id = Column(Integer, ForeignKey("agents.id", ondelete="CASCADE"), primary_key=True)
+    group_id = Column(Integer, ForeignKey("monitored_groups.id", ondelete="CASCADE"), primary_key=True)
+
+    __table_args__ = (
+        Index('ix_agent_enabled_groups_group_id', 'group_id'),
+    )
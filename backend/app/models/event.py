@@ -1,29 +1,35 @@
-from sqlalchemy import Column, Integer, String, DateTime, Date, ForeignKey, Index
+from sqlalchemy import Column, Integer, String, DateTime, Date, ForeignKey, Index, Enum
 from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, text
 from app.database import Base
 
+EVENT_TYPES = ('JOIN', 'LEAVE', 'CERTIFICATE')
+
 
 class Event(Base):
     __tablename__ = "events"
 
-    id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     group_id = Column(Integer, ForeignKey("monitored_groups.id", ondelete="CASCADE"), nullable=False, index=True)
     whatsapp_group_id = Column(String(100), nullable=False)
     group_name = Column(String(255), nullable=False)
     member_id = Column(String(100), nullable=False)
     member_name = Column(String(255), nullable=False)
     member_phone = Column(String(50), nullable=True)
-    event_type = Column(String(50), nullable=False)  # JOIN, LEAVE
-    event_date = Column(Date, nullable=False, index=True)  # For filtering by date
+    event_type = Column(Enum(*EVENT_TYPES, name='event_type'), nullable=False)
+    event_date = Column(Date, nullable=False)  # For filtering by date
     timestamp = Column(DateTime(timezone=True), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     # Indexes for fast filtering
     __table_args__ = (
         Index('idx_events_type_date', 'event_type', 'event_date'),
-        Index('idx_events_user_group', 'user_id', 'group_id'),
+        Index('idx_events_user_group_ts', 'user_id', 'group_id', 'event_date'),
+        Index('idx_events_user_type_date', 'user_id', 'event_type', 'event_date'),
+        # One certificate per member per group per day
+        Index('ix_events_certificate_dedup', 'group_id', 'member_phone', 'event_date',
+              postgresql_where=text("event_type = 'CERTIFICATE'")),
     )
 
     # Relationships
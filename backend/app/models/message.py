@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
@@ -8,7 +8,7 @@ class Message(Base):
     __tablename__ = "messages"
 
     id = Column(String(100), primary_key=True)  # WhatsApp message ID
-    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     group_id = Column(Integer, ForeignKey("monitored_groups.id", ondelete="CASCADE"), nullable=False, index=True)
     whatsapp_group_id = Column(String(100), nullable=False)
     group_name = Column(String(255), nullable=False)
@@ -17,9 +17,15 @@ class Message(Base):
     sender_phone = Column(String(50), nullable=True)
     content = Column(Text, nullable=False)
     message_type = Column(String(50), default="text")  # text, image, video, audio, document
-    timestamp = Column(DateTime(timezone=True), nullable=False, index=True)
+    timestamp = Column(DateTime(timezone=True), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+    # Indexes for fast aggregation and newest-first listings
+    __table_args__ = (
+        Index('idx_msg_user_group_ts', 'user_id', 'group_id', timestamp.desc()),
+        Index('ix_messages_user_group_sender', 'user_id', 'group_id', 'sender_phone'),
+    )
+
     # Relationships
     user = relationship("User", back_populates="messages")
     group = relationship("MonitoredGroup", back_populates="messages")
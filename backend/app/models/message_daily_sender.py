@@ -0,0 +1,14 @@
+from sqlalchemy import Column, Integer, String, Date, ForeignKey
+from app.database import Base
+
+
+class MessageDailySender(Base):
+    """Per-day message counts per sender, maintained at ingest for top-senders stats"""
+    __tablename__ = "messages_daily_sender"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    group_id = Column(Integer, ForeignKey("monitored_groups.id", ondelete="CASCADE"), primary_key=True)
+    sender_phone = Column(String(50), primary_key=True)
+    day = Column(Date, primary_key=True)
+    sender_name = Column(String(255), nullable=False)  # Latest name seen that day
+    message_count = Column(Integer, nullable=False, default=0)
@@ -1,13 +1,14 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, JSON
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, Index
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, text
 from app.database import Base
 
 
 class MonitoredGroup(Base):
     __tablename__ = "monitored_groups"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
     whatsapp_group_id = Column(String(100), nullable=False)  # WhatsApp's internal ID
     group_name = Column(String(255), nullable=False)
@@ -19,11 +20,11 @@ class MonitoredGroup(Base):
     welcome_enabled = Column(Boolean, default=False)
     welcome_threshold = Column(Integer, default=1)  # Number of consecutive joins to trigger message
     welcome_join_count = Column(Integer, default=0)  # Current counter
-    welcome_pending_joiners = Column(JSON, default=list)  # List of joiner phone numbers waiting
+    welcome_pending_joiners = Column(JSONB, server_default=text("'[]'::jsonb"))  # List of joiner phone numbers waiting
 
     # Welcome Part 1: Mentions for joiners + text + extra mentions
     welcome_text = Column(Text)  # Custom welcome text
-    welcome_extra_mentions = Column(JSON)  # Additional phone numbers to always mention
+    welcome_extra_mentions = Column(JSONB)  # Additional phone numbers to always mention
 
     # Welcome Part 2 (optional): Text + Image
     welcome_part2_enabled = Column(Boolean, default=False)
@@ -32,10 +33,12 @@ class MonitoredGroup(Base):
 
     # Unique constraint: user can only monitor each group once
     __table_args__ = (
+        # Every incoming event resolves its group by (user, WhatsApp group id)
+        Index('ix_mg_user_wagroup_active', 'user_id', 'whatsapp_group_id', postgresql_where=text("is_active")),
         {"sqlite_autoincrement": True},
     )
 
     # Relationships
     user = relationship("User", back_populates="monitored_groups")
-    messages = relationship("Message", back_populates="group")
-    events = relationship("Event", back_populates="group")
+    messages = relationship("Message", back_populates="group", passive_deletes=True)
+    events = relationship("Event", back_populates="group", passive_deletes=True)
@@ -1,18 +1,23 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, JSON, Index, Boolean
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index, Boolean, Enum, DDL, event
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
-from datetime import datetime
+from sqlalchemy.sql import func, text
 
 from app.database import Base
 
+TASK_TYPES = ('broadcast', 'poll', 'open_group', 'close_group', 'channel_broadcast', 'channel_poll')
+MENTION_TYPES = ('none', 'all', 'selected')
+STATUSES = ('pending', 'sending', 'sent', 'partially_sent', 'failed', 'cancelled')
+
 
 class ScheduledMessage(Base):
     __tablename__ = "scheduled_messages"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
 
     # Task type: 'broadcast', 'poll', 'open_group', 'close_group'
-    task_type = Column(String(20), default='broadcast', nullable=False)
+    task_type = Column(Enum(*TASK_TYPES, name='task_type'), default='broadcast', nullable=False)
 
     # Recurring schedule support
     is_recurring = Column(Boolean, default=False)
@@ -24,33 +29,60 @@ class ScheduledMessage(Base):
     media_path = Column(String(500))  # Path to media file on WhatsApp service volume
 
     # Poll-specific fields (for task_type='poll')
-    poll_options = Column(JSON)  # List of poll option strings
+    poll_options = Column(JSONB)  # List of poll option strings
     poll_allow_multiple = Column(Boolean, default=False)  # Allow multiple answers
 
-    group_ids = Column(JSON)  # List of WhatsApp group IDs to send to (nullable for channel broadcasts)
-    group_names = Column(JSON)  # List of group names for display
+    group_ids = Column(JSONB)  # List of WhatsApp group IDs to send to (nullable for channel broadcasts)
+    group_names = Column(JSONB)  # List of group names for display
 
     # Channel-specific fields (for task_type='channel_broadcast')
-    channel_ids = Column(JSON)  # List of WhatsApp channel IDs (e.g., "123456@newsletter")
-    channel_names = Column(JSON)  # List of channel names for display
+    channel_ids = Column(JSONB)  # List of WhatsApp channel IDs (e.g., "123456@newsletter")
+    channel_names = Column(JSONB)  # List of channel names for display
 
-    mention_type = Column(String(20), default='none')  # 'none', 'all', 'selected'
-    mention_ids = Column(JSON)  # List of phone numbers to mention (for 'selected')
+    mention_type = Column(Enum(*MENTION_TYPES, name='mention_type'), default='none')
+    mention_ids = Column(JSONB)  # List of phone numbers to mention (for 'selected')
     scheduled_at = Column(DateTime, nullable=False)  # When to send
-    status = Column(String(20), default='pending')  # pending, sending, sent, partially_sent, failed, cancelled
+    status = Column(Enum(*STATUSES, name='scheduled_status'), default='pending')
     sent_at = Column(DateTime)
-    error_message = Column(Text)
+    error_message = Column(Text)  # Short summary; per-group failures live in scheduled_message_errors
     groups_sent = Column(Integer, default=0)  # Number of groups successfully sent to
     groups_failed = Column(Integer, default=0)  # Number of groups that failed
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Resumable send progress: index of the next group in group_ids and when to send to it
+    next_group_index = Column(Integer, nullable=False, server_default=text('0'))
+    next_send_at = Column(DateTime)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
     # Relationships
     user = relationship("User", back_populates="scheduled_messages")
+    errors = relationship("ScheduledMessageError", order_by="ScheduledMessageError.id", cascade="all, delete-orphan", passive_deletes=True)
 
     # Indexes for efficient querying
     __table_args__ = (
-        Index('idx_scheduled_status_time', 'status', 'scheduled_at'),
+        # Only live work is indexed; sent/failed/cancelled rows never enter these.
+        # The scheduler claim ORs one range scan on each.
+        Index('ix_sched_pending_due', 'scheduled_at', postgresql_where=text("status = 'pending'")),
+        Index('idx_scheduled_next_send', 'next_send_at', postgresql_where=text("status = 'sending'")),
         Index('idx_scheduled_user', 'user_id'),
+        # Recurring schedules are looked up (toggle/delete) by their parent id
+        Index('ix_sched_recurring', 'parent_schedule_id', postgresql_where=text("parent_schedule_id IS NOT NULL")),
         Index('idx_scheduled_task_type', 'task_type', 'user_id'),
     )
+
+
+# Same trigger as migration 015, so a schema built with create_all (fresh database,
+# then stamped at head) also wakes the scheduler when a task becomes pending
+event.listen(ScheduledMessage.__table__, 'after_create', DDL("""
+    CREATE OR REPLACE FUNCTION notify_scheduled_message() RETURNS trigger AS $$
+    BEGIN
+        PERFORM pg_notify('scheduled_message_inserted', '');
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+""").execute_if(dialect='postgresql'))
+event.listen(ScheduledMessage.__table__, 'after_create', DDL("""
+    CREATE TRIGGER scheduled_messages_notify
+    AFTER INSERT OR UPDATE OF scheduled_at, status ON scheduled_messages
+    FOR EACH ROW WHEN (NEW.status = 'pending')
+    EXECUTE FUNCTION notify_scheduled_message()
+""").execute_if(dialect='postgresql'))
@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, Text, DateTime, ForeignKey, Index
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class ScheduledMessageError(Base):
+    """One failed send of a scheduled task (per group or channel)"""
+    __tablename__ = "scheduled_message_errors"
+
+    id = Column(Integer, primary_key=True)
+    task_id = Column(Integer, ForeignKey("scheduled_messages.id", ondelete="CASCADE"), nullable=False)
+    group_id = Column(Integer)  # MonitoredGroup id; null for channel sends and task-wide errors
+    error = Column(Text, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        Index('ix_scheduled_message_errors_task_id', 'task_id'),
+    )
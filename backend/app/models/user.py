@@ -7,7 +7,7 @@ from app.database import Base
 class User(Base):
     __tablename__ = "users"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     username = Column(String(100), unique=True, nullable=False, index=True)
     email = Column(String(255), unique=True, nullable=False, index=True)
     password_hash = Column(String(255), nullable=False)
@@ -17,9 +17,10 @@ class User(Base):
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
     # Relationships - cascade delete all related records when user is deleted
-    whatsapp_session = relationship("WhatsAppSession", back_populates="user", uselist=False, cascade="all, delete-orphan")
-    monitored_groups = relationship("MonitoredGroup", back_populates="user", cascade="all, delete-orphan")
-    messages = relationship("Message", back_populates="user", cascade="all, delete-orphan")
-    events = relationship("Event", back_populates="user", cascade="all, delete-orphan")
-    scheduled_messages = relationship("ScheduledMessage", back_populates="user", cascade="all, delete-orphan")
-    agents = relationship("Agent", back_populates="user", cascade="all, delete-orphan")
+    # (passive_deletes lets the DB ON DELETE CASCADE remove rows without loading them first)
+    whatsapp_session = relationship("WhatsAppSession", back_populates="user", uselist=False, cascade="all, delete-orphan", passive_deletes=True)
+    monitored_groups = relationship("MonitoredGroup", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
+    messages = relationship("Message", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
+    events = relationship("Event", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
+    scheduled_messages = relationship("ScheduledMessage", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
+    agents = relationship("Agent", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
@@ -7,7 +7,7 @@ from app.database import Base
 class WhatsAppSession(Base):
     __tablename__ = "whatsapp_sessions"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), unique=True, nullable=False)
     session_id = Column(String(100), unique=True, nullable=False)  # format: "user_{user_id}"
     phone_number = Column(String(20), nullable=True)
@@ -0,0 +1,31 @@
+import socket
+
+import redis.asyncio as redis
+
+from app.config import settings
+
+# TCP keepalive so idle connections (the stream readers in particular) survive
+# NAT / load-balancer idle timeouts instead of hanging until the next write.
+# The per-option constants are Linux-specific, so only set the ones that exist.
+KEEPALIVE_OPTIONS = {
+    getattr(socket, name): value
+    for name, value in (("TCP_KEEPIDLE", 30), ("TCP_KEEPINTVL", 10), ("TCP_KEEPCNT", 3))
+    if hasattr(socket, name)
+}
+
+CONNECTION_OPTIONS = dict(
+    socket_keepalive=True,
+    socket_keepalive_options=KEEPALIVE_OPTIONS,
+    health_check_interval=30,
+)
+
+# Shared pool for regular commands (app.state.redis and any publisher)
+pool = redis.ConnectionPool.from_url(settings.redis_url, max_connections=50, **CONNECTION_OPTIONS)
+
+
+def stream_client(connections: int) -> redis.Redis:
+    """
+    Client for the event stream readers, on its own pool: each blocking
+    XREADGROUP holds a connection, so they're kept out of the shared pool
+    """
+    return redis.from_url(settings.redis_url, max_connections=connections, **CONNECTION_OPTIONS)
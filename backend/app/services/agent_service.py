@@ -1,13 +1,88 @@
+import asyncio
+import re
 import httpx
-import json
-from typing import Optional, Dict, Any
+import orjson
+from typing import NamedTuple, Optional, Set
+
+from cachetools import LRUCache
 
 from app.models.agent import Agent
 
 
+# API kinds, resolved once per agent from its URL
+GEMINI = 0
+OPENAI = 1
+
+# Most upstream origins with a live client; api_url is user-supplied, so the
+# least recently used client is retired beyond this
+MAX_UPSTREAM_CLIENTS = 32
+# Request timeout, also how long a retired client is kept for its in-flight calls
+REQUEST_TIMEOUT = 60.0
+
+_API_KIND = re.compile(r"(generativelanguage\.googleapis\.com)|(openai\.com|api\.openai)")
+
+
+class PreparedAgent(NamedTuple):
+    """Per-agent request pieces that only change when the agent row is edited"""
+    kind: int  # GEMINI or OPENAI
+    origin: str  # scheme://host[:port], selects the per-upstream client
+    path: str  # path + query, relative to origin
+    headers: dict
+    system_prompt: str
+    # Pre-encoded JSON fragments; per-message strings are spliced in between them
+    body_head: bytes
+    body_mid: bytes
+    body_tail: bytes
+
+
 class AgentService:
     """Service to handle AI agent responses using external APIs"""
 
+    def __init__(self):
+        # One HTTP/2 client per upstream origin, so concurrent replies to the
+        # same provider multiplex over a single kept-alive TLS connection
+        self._clients: LRUCache = LRUCache(maxsize=MAX_UPSTREAM_CLIENTS)
+        # Evicted clients closing once their in-flight calls are done
+        self._retiring: Set[asyncio.Task] = set()
+        # (agent.id, agent.updated_at) -> PreparedAgent
+        self._prepared: LRUCache = LRUCache(maxsize=256)
+
+    def client_for(self, origin: str) -> httpx.AsyncClient:
+        """Get (or lazily create) the HTTP/2 client for an upstream origin"""
+        client = self._clients.get(origin)
+        if client is None:
+            if len(self._clients) >= MAX_UPSTREAM_CLIENTS:
+                _, evicted = self._clients.popitem()
+                task = asyncio.create_task(self._retire(evicted))
+                self._retiring.add(task)
+                task.add_done_callback(self._retiring.discard)
+            client = httpx.AsyncClient(
+                http2=True,
+                base_url=origin,
+                limits=httpx.Limits(max_connections=50, max_keepalive_connections=20, keepalive_expiry=120.0),
+                timeout=REQUEST_TIMEOUT
+            )
+            self._clients[origin] = client
+        return client
+
+    @staticmethod
+    async def _retire(client: httpx.AsyncClient):
+        try:
+            await asyncio.sleep(REQUEST_TIMEOUT)
+        finally:
+            await client.aclose()
+
+    async def close(self):
+        """Close the per-upstream HTTP clients"""
+        retiring = list(self._retiring)
+        for task in retiring:
+            task.cancel()
+        await asyncio.gather(*retiring, return_exceptions=True)
+        clients = list(self._clients.values())
+        self._clients.clear()
+        for client in clients:
+            await client.aclose()
+
     async def generate_response(
         self,
         agent: Agent,
@@ -28,122 +103,129 @@ class AgentService:
             The generated response text, or None if failed
         """
         try:
-            # Build the system prompt with context
-            system_prompt = agent.system_prompt or "You are a helpful assistant."
+            prepared = self._prepare(agent)
 
             # Add context about the conversation
             context = f"You are responding to a message in the WhatsApp group '{group_name}'. "
             context += f"The message was sent by '{sender_name}'. "
             context += "Keep your response concise and friendly for a chat environment."
 
-            full_system_prompt = f"{system_prompt}\n\n{context}"
+            full_system_prompt = f"{prepared.system_prompt}\n\n{context}"
 
-            # Prepare the request based on the API URL (detect API type)
-            if "generativelanguage.googleapis.com" in agent.api_url:
-                return await self._call_gemini_api(agent, full_system_prompt, user_message)
-            elif "openai.com" in agent.api_url or "api.openai" in agent.api_url:
-                return await self._call_openai_api(agent, full_system_prompt, user_message)
-            else:
-                # Default to Gemini-style API
-                return await self._call_gemini_api(agent, full_system_prompt, user_message)
+            if prepared.kind == OPENAI:
+                body = (
+                    prepared.body_head + orjson.dumps(full_system_prompt)
+                    + prepared.body_mid + orjson.dumps(user_message)
+                    + prepared.body_tail
+                )
+                return await self._call_openai_api(prepared, body)
+
+            body = (
+                prepared.body_head
+                + orjson.dumps(f"{full_system_prompt}\n\nUser message: {user_message}")
+                + prepared.body_tail
+            )
+            return await self._call_gemini_api(prepared, body)
 
         except Exception as e:
             print(f"[AGENT] Error generating response: {e}")
             return None
 
-    async def _call_gemini_api(
-        self,
-        agent: Agent,
-        system_prompt: str,
-        user_message: str
-    ) -> Optional[str]:
+    def _prepare(self, agent: Agent) -> PreparedAgent:
+        """Build (or reuse) the static parts of an agent's API request"""
+        key = (agent.id, agent.updated_at)
+        prepared = self._prepared.get(key)
+        if prepared is not None:
+            return prepared
+
+        system_prompt = agent.system_prompt or "You are a helpful assistant."
+        api_url = httpx.URL(agent.api_url)
+        origin = f"{api_url.scheme}://{api_url.netloc.decode()}"
+        path = api_url.raw_path.decode()
+        max_tokens = agent.output_token_limit or 1024
+
+        # Detect API type from the URL; default to Gemini-style API
+        match = _API_KIND.search(agent.api_url)
+        if match and match.group(2):
+            prepared = PreparedAgent(
+                kind=OPENAI,
+                origin=origin,
+                path=path,
+                headers={
+                    "Content-Type": "application/json",
+                    "Authorization": f"Bearer {agent.api_key}"
+                },
+                system_prompt=system_prompt,
+                body_head=b'{"model":"gpt-3.5-turbo","messages":[{"role":"system","content":',
+                body_mid=b'},{"role":"user","content":',
+                body_tail=b'}],"max_tokens":' + orjson.dumps(max_tokens) + b',"temperature":0.7}',
+            )
+        else:
+            generation_config = {"maxOutputTokens": max_tokens, "temperature": 0.7}
+            prepared = PreparedAgent(
+                kind=GEMINI,
+                origin=origin,
+                path=f"{path}{'&' if api_url.query else '?'}key={agent.api_key}",
+                headers={"Content-Type": "application/json"},
+                system_prompt=system_prompt,
+                body_head=b'{"contents":[{"parts":[{"text":',
+                body_mid=b"",
+                body_tail=b'}]}],"generationConfig":' + orjson.dumps(generation_config) + b"}",
+            )
+
+        self._prepared[key] = prepared
+        return prepared
+
+    async def _call_gemini_api(self, prepared: PreparedAgent, body: bytes) -> Optional[str]:
         """Call Google Gemini API"""
         try:
-            # Build the API URL with key
-            url = f"{agent.api_url}?key={agent.api_key}"
-
-            # Prepare the request payload
-            payload = {
-                "contents": [
-                    {
-                        "parts": [
-                            {"text": f"{system_prompt}\n\nUser message: {user_message}"}
-                        ]
-                    }
-                ],
-                "generationConfig": {
-                    "maxOutputTokens": agent.output_token_limit or 1024,
-                    "temperature": 0.7
-                }
-            }
-
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    url,
-                    json=payload,
-                    headers={"Content-Type": "application/json"},
-                    timeout=60.0
-                )
-
-                if response.status_code == 200:
-                    data = response.json()
-                    # Extract text from Gemini response
-                    if "candidates" in data and len(data["candidates"]) > 0:
-                        candidate = data["candidates"][0]
-                        if "content" in candidate and "parts" in candidate["content"]:
-                            parts = candidate["content"]["parts"]
-                            if len(parts) > 0 and "text" in parts[0]:
-                                return parts[0]["text"]
-
-                    print(f"[AGENT] Gemini response structure unexpected: {data}")
-                    return None
-                else:
-                    print(f"[AGENT] Gemini API error: {response.status_code} - {response.text}")
-                    return None
+            response = await self.client_for(prepared.origin).post(
+                prepared.path,
+                content=body,
+                headers=prepared.headers,
+                timeout=60.0
+            )
+
+            if response.status_code == 200:
+                data = orjson.loads(response.content)
+                # Extract text from Gemini response
+                if "candidates" in data and len(data["candidates"]) > 0:
+                    candidate = data["candidates"][0]
+                    if "content" in candidate and "parts" in candidate["content"]:
+                        parts = candidate["content"]["parts"]
+                        if len(parts) > 0 and "text" in parts[0]:
+                            return parts[0]["text"]
+
+                print(f"[AGENT] Gemini response structure unexpected: {data}")
+                return None
+            else:
+                print(f"[AGENT] Gemini API error: {response.status_code} - {response.text}")
+                return None
 
         except Exception as e:
             print(f"[AGENT] Gemini API call failed: {e}")
             return None
 
-    async def _call_openai_api(
-        self,
-        agent: Agent,
-        system_prompt: str,
-        user_message: str
-    ) -> Optional[str]:
+    async def _call_openai_api(self, prepared: PreparedAgent, body: bytes) -> Optional[str]:
         """Call OpenAI-compatible API"""
         try:
-            payload = {
-                "model": "gpt-3.5-turbo",
-                "messages": [
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_message}
-                ],
-                "max_tokens": agent.output_token_limit or 1024,
-                "temperature": 0.7
-            }
-
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    agent.api_url,
-                    json=payload,
-                    headers={
-                        "Content-Type": "application/json",
-                        "Authorization": f"Bearer {agent.api_key}"
-                    },
-                    timeout=60.0
-                )
-
-                if response.status_code == 200:
-                    data = response.json()
-                    if "choices" in data and len(data["choices"]) > 0:
-                        return data["choices"][0]["message"]["content"]
-
-                    print(f"[AGENT] OpenAI response structure unexpected: {data}")
-                    return None
-                else:
-                    print(f"[AGENT] OpenAI API error: {response.status_code} - {response.text}")
-                    return None
+            response = await self.client_for(prepared.origin).post(
+                prepared.path,
+                content=body,
+                headers=prepared.headers,
+                timeout=60.0
+            )
+
+            if response.status_code == 200:
+                data = orjson.loads(response.content)
+                if "choices" in data and len(data["choices"]) > 0:
+                    return data["choices"][0]["message"]["content"]
+
+                print(f"[AGENT] OpenAI response structure unexpected: {data}")
+                return None
+            else:
+                print(f"[AGENT] OpenAI API error: {response.status_code} - {response.text}")
+                return None
 
         except Exception as e:
             print(f"[AGENT] OpenAI API call failed: {e}")
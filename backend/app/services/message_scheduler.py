@@ -1,54 +1,301 @@
 import asyncio
-import os
-from datetime import datetime, timedelta, time
-from typing import Optional, Dict, Callable, Any
-
-from sqlalchemy.orm import Session
-
-from app.database import SessionLocal
+import logging
+import random
+import threading
+from collections import defaultdict
+from datetime import date, datetime, timedelta, time, timezone
+from functools import lru_cache, partial
+from time import monotonic
+from typing import Optional, Dict, List, Set, Callable, Any, Awaitable, Tuple, NamedTuple
+from zoneinfo import ZoneInfo
+
+import asyncpg
+from cachetools import TTLCache
+from sqlalchemy import event, DateTime, func, case, or_, and_, update, insert, select, literal
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import defer
+
+from app.config import settings
+from app.database import AsyncSessionLocal
 from app.models.scheduled_message import ScheduledMessage
+from app.models.scheduled_message_error import ScheduledMessageError
 from app.models.monitored_group import MonitoredGroup
-from app.services.whatsapp_bridge import whatsapp_bridge
+from app.services.whatsapp_bridge import whatsapp_bridge, SERVICE_UNAVAILABLE
 from app.services.websocket_manager import websocket_manager
 
 
+logger = logging.getLogger(__name__)
+
+# Seconds between sends to consecutive groups of one task
+GROUP_DELAY = 30
+# Task types this scheduler knows how to run
+HANDLED_TASK_TYPES = ('broadcast', 'poll', 'open_group', 'close_group')
+# Run order within one user's tick: open/close are quick, time-of-day sensitive
+# steps, so they never wait behind a broadcast or poll send
+TASK_PRIORITY = {'open_group': 0, 'close_group': 0, 'poll': 1, 'broadcast': 1}
+# How long a claimed step may run before another scan may reclaim it
+STEP_LEASE = 15 * 60
+# Most task steps one scheduler pass claims
+CLAIM_BATCH = 100
+# How long a group's send target is reused before re-reading monitored_groups
+GROUP_CACHE_TTL = 5 * 60
+# How long a "ready" health check is trusted (failures are never cached)
+HEALTH_CACHE_TTL = 20
+# A successful send vouches for the client this long (spans consecutive steps of a
+# task), so no health probe runs while sends keep succeeding
+SEND_VERIFIED_TTL = 2 * GROUP_DELAY
+# Send retry backoff: RETRY_BASE doubling per attempt, capped, then jittered
+RETRY_BASE = 5
+RETRY_MAX = 30
+# Longest wait for a recovered client to report ready, and the poll backoff bounds
+RECOVERY_WAIT = 15
+RECOVERY_POLL_START = 0.5
+RECOVERY_POLL_MAX = 4.0
+# A send slot this close to free counts as free, so a re-armed step picked up on
+# time is never deferred by clock jitter
+SLOT_SLACK = 1.0
+# A re-armed step's progress mapping plus the error rows it produced
+StepProgress = Tuple[dict, List[dict]]
+# Postgres channel the scheduled_messages trigger notifies when a task becomes pending
+NOTIFY_CHANNEL = 'scheduled_message_inserted'
+# Longest sleep while LISTEN is up, in case a notification never arrives (a
+# half-open connection, or a database without the trigger)
+LISTEN_MAX_SLEEP = 5 * 60
+# Columns a group step never reads (recurring clones copy group_names in SQL)
+STEP_LOAD_OPTIONS = [
+    defer(ScheduledMessage.channel_ids),
+    defer(ScheduledMessage.channel_names),
+    defer(ScheduledMessage.group_names),
+    defer(ScheduledMessage.created_at),
+]
+
+
+# Timezone recurring "HH:MM" times are expressed in (loaded from tzdb once)
+SCHEDULER_TZ = ZoneInfo(settings.scheduler_timezone)
+
+
+def utcnow() -> datetime:
+    """Naive UTC now, matching the naive UTC DateTime columns (datetime.utcnow is deprecated)"""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+@lru_cache(maxsize=1440)
+def parse_hhmm(time_str: str) -> time:
+    """Parse 'HH:MM' into a time (there are only 1440 distinct values)"""
+    hour, minute = map(int, time_str.split(':'))
+    return time(hour, minute)
+
+
+def mention_args(mention_type: Optional[str], mention_ids: Optional[list]) -> Tuple[bool, Optional[list]]:
+    """Resolve a task's mention settings into the (mention_all, mention_ids) send kwargs"""
+    return mention_type == 'all', (mention_ids if mention_type == 'selected' else None)
+
+
+def error_summary(first_error: str, failed: int) -> str:
+    """Short error_message for a task; the full list is in scheduled_message_errors"""
+    return first_error if failed <= 1 else f"{first_error} ({failed} failed)"
+
+
+def retry_delay(attempt: int) -> float:
+    """Jittered exponential backoff, so users retrying a struggling bridge don't wake in lockstep"""
+    return min(RETRY_MAX, RETRY_BASE * 2 ** attempt) * random.uniform(0.5, 1.5)
+
+
+def local_to_utc(day: date, at: time) -> datetime:
+    """Convert a wall-clock time in SCHEDULER_TZ to naive UTC, DST-aware"""
+    local_dt = datetime.combine(day, at, tzinfo=SCHEDULER_TZ)
+    return local_dt.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+class GroupTarget(NamedTuple):
+    """The monitored-group fields a send needs"""
+    id: int
+    whatsapp_group_id: str
+    group_name: str
+
+
 class MessageScheduler:
     """Unified background service that processes all scheduled tasks (broadcasts + group settings)"""
 
     def __init__(self):
         self.running = False
-        self.check_interval = 60  # Check every 60 seconds for low CPU usage
+        self.check_interval = 60  # Upper bound on sleep between scans
+        # Set by API routes when they insert a task so the loop re-plans immediately
+        self._wakeup = asyncio.Event()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # Dedicated LISTEN connection; while it is up the loop needs no polling cap
+        self._listen_conn: Optional[asyncpg.Connection] = None
+        # (user_id, group_id) -> GroupTarget; every step of a multi-group task and
+        # every task aimed at the same groups reuses these instead of querying again.
+        # Invalidated from ORM events, which can fire on threadpool threads.
+        self._group_cache: TTLCache = TTLCache(maxsize=4096, ttl=GROUP_CACHE_TTL)
+        self._group_cache_lock = threading.Lock()
+        # user_id -> monotonic time of the last "ready" health check
+        self._healthy_at: Dict[int, float] = {}
+        # user_id -> monotonic time of the last successful send
+        self._sent_ok_at: Dict[int, float] = {}
+        # user_id -> monotonic time the user's next message send may start; paces
+        # sends GROUP_DELAY apart across all of a user's tasks and immediate sends
+        self._send_slot_at: Dict[int, float] = {}
+        # user_id -> lock held while recovering that user's client, so callers that
+        # find it down together share one init_client + stabilize wait
+        self._recovery_locks: Dict[int, asyncio.Lock] = defaultdict(asyncio.Lock)
+        # task id -> the asyncio task running its current step, so cancel_task can stop it
+        self._running_steps: Dict[int, asyncio.Task] = {}
+        # Fire-and-forget cleanup tasks, referenced until done so they aren't collected
+        self._background: Set[asyncio.Task] = set()
+        # task_type -> step handler(db, task)
+        self._handlers: Dict[str, Callable[[AsyncSession, ScheduledMessage], Awaitable[Optional[StepProgress]]]] = {
+            'broadcast': self._process_broadcast,
+            'poll': self._process_poll,
+            'open_group': partial(self._process_group_settings, admin_only=False),
+            'close_group': partial(self._process_group_settings, admin_only=True),
+        }
 
     async def start(self):
         """Start the scheduler loop"""
         self.running = True
-        print("[SCHEDULER] Unified scheduler started", flush=True)
+        self._loop = asyncio.get_running_loop()
+        logger.info("Unified scheduler started")
 
-        while self.running:
-            try:
-                await self.process_due_tasks()
-            except Exception as e:
-                print(f"[SCHEDULER] Error in scheduler loop: {e}", flush=True)
+        try:
+            while self.running:
+                if self._listen_conn is None or self._listen_conn.is_closed():
+                    await self._listen()
 
-            await asyncio.sleep(self.check_interval)
+                try:
+                    await self.process_due_tasks()
+                except Exception as e:
+                    logger.error("Error in scheduler loop: %s", e, exc_info=True)
+
+                # Sleep until the earliest pending task is due, or until a task is
+                # added (by an API route or, via NOTIFY, by any other process)
+                timeout = await self._seconds_until_next_task()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+        finally:
+            if self._listen_conn is not None and not self._listen_conn.is_closed():
+                await self._listen_conn.close()
+            self._listen_conn = None
+
+    async def _listen(self):
+        """(Re)open the LISTEN connection; on failure the loop falls back to polling"""
+        try:
+            conn = await asyncpg.connect(settings.database_url)
+            await conn.add_listener(NOTIFY_CHANNEL, self._on_notify)
+            conn.add_termination_listener(self._on_listen_lost)
+            self._listen_conn = conn
+            logger.info("Listening on %s", NOTIFY_CHANNEL)
+        except Exception as e:
+            self._listen_conn = None
+            logger.warning("LISTEN unavailable, polling every %ss: %s", self.check_interval, e)
+
+    def _on_notify(self, connection, pid, channel, payload):
+        self._wakeup.set()
+
+    def _on_listen_lost(self, connection):
+        logger.warning("LISTEN connection lost, polling until it is re-established")
+        self._listen_conn = None
+        self._wakeup.set()
 
     def stop(self):
         """Stop the scheduler"""
         self.running = False
-        print("[SCHEDULER] Scheduler stopped", flush=True)
+        self._wakeup.set()
+        logger.info("Scheduler stopped")
+
+    def cancel_task(self, task_id: int):
+        """
+        Stop a task's in-flight step if this instance is running one. The caller
+        marks the row cancelled first, so the task is never claimed again.
+        Safe to call from any thread.
+        """
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._cancel_step, task_id)
+
+    def _spawn(self, coro: Awaitable):
+        """Run a coroutine in the background, off the step's critical path"""
+        bg = asyncio.create_task(coro)
+        self._background.add(bg)
+        bg.add_done_callback(self._background.discard)
+
+    async def _delete_media(self, media_path: str):
+        try:
+            result = await whatsapp_bridge.delete_media(media_path)
+            if not result.get('success'):
+                logger.warning("Could not delete media %s: %s", media_path, result.get('error'))
+        except Exception as e:
+            logger.warning("Could not delete media %s: %s", media_path, e)
+
+    def _cancel_step(self, task_id: int):
+        step = self._running_steps.get(task_id)
+        if step is not None:
+            step.cancel()
+
+    def notify_new_task(self):
+        """Wake the scheduler loop so a newly inserted task is planned right away"""
+        # Also while LISTEN is up: the NOTIFY may never arrive, and a spurious
+        # wakeup only costs one scan
+        if self._loop is None:
+            return
+        try:
+            on_loop = asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            on_loop = False
+        if on_loop:
+            self._wakeup.set()
+        else:
+            # Sync routes run in the threadpool; hand the wakeup to the loop thread
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    async def _seconds_until_next_task(self) -> float:
+        """
+        Seconds until the earliest pending task is due, capped at check_interval,
+        or at LISTEN_MAX_SLEEP while the LISTEN connection is up
+        """
+        cap = LISTEN_MAX_SLEEP if self._listen_conn is not None else self.check_interval
+        # Pending tasks are due at scheduled_at, in-flight ones at next_send_at
+        due_at = case(
+            (ScheduledMessage.status == 'pending', ScheduledMessage.scheduled_at),
+            else_=ScheduledMessage.next_send_at
+        )
+        try:
+            async with AsyncSessionLocal() as db:
+                next_at = await db.scalar(select(func.min(due_at)).where(
+                    ScheduledMessage.status.in_(['pending', 'sending']),
+                    ScheduledMessage.task_type.in_(HANDLED_TASK_TYPES)
+                ))
+        except Exception as e:
+            logger.error("Error reading next due time: %s", e)
+            return self.check_interval
+
+        if next_at is None:
+            return cap
+        return min(cap, max(0.0, (next_at - utcnow()).total_seconds()))
 
     async def _check_client_health(self, user_id: int) -> bool:
-        """Check if WhatsApp client is ready before sending"""
+        """Check if WhatsApp client is ready before sending (a recent "ready" is reused)"""
+        checked_at = self._healthy_at.get(user_id)
+        if checked_at is not None and monotonic() - checked_at < HEALTH_CACHE_TTL:
+            return True
         try:
             status = await whatsapp_bridge.get_status(user_id)
-            return status.get('status') == 'ready'
+            ready = status.get('status') == 'ready'
+            if ready:
+                self._healthy_at[user_id] = monotonic()
+            else:
+                self._healthy_at.pop(user_id, None)
+            return ready
         except Exception as e:
-            print(f"[SCHEDULER] Health check failed for user {user_id}: {e}", flush=True)
+            self._healthy_at.pop(user_id, None)
+            logger.warning("Health check failed for user %s: %s", user_id, e)
             return False
 
     async def _send_with_retry(self, send_func: Callable, max_retries: int = 3) -> Dict[str, Any]:
         """Execute send function with exponential backoff retry for timeout errors"""
-        delays = [5, 10, 20]  # seconds between retries
         last_error = None
 
         for attempt in range(max_retries):
@@ -64,8 +311,8 @@ class MessageScheduler:
                 # Check if it's a timeout error worth retrying
                 if 'timed out' in error.lower() or 'timeout' in error.lower():
                     if attempt < max_retries - 1:
-                        delay = delays[attempt]
-                        print(f"[SCHEDULER] Timeout error, retry {attempt + 1}/{max_retries} in {delay}s...", flush=True)
+                        delay = retry_delay(attempt)
+                        logger.warning("Timeout error, retry %s/%s in %.1fs...", attempt + 1, max_retries, delay)
                         await asyncio.sleep(delay)
                         continue
 
@@ -75,503 +322,599 @@ class MessageScheduler:
             except Exception as e:
                 last_error = str(e)
                 if attempt < max_retries - 1:
-                    delay = delays[attempt]
-                    print(f"[SCHEDULER] Exception, retry {attempt + 1}/{max_retries} in {delay}s: {e}", flush=True)
+                    delay = retry_delay(attempt)
+                    logger.warning("Exception, retry %s/%s in %.1fs: %s", attempt + 1, max_retries, delay, e)
                     await asyncio.sleep(delay)
                 else:
                     break
 
         return {"success": False, "error": last_error or "Max retries exceeded"}
 
+    def _take_send_slot(self, user_id: int) -> float:
+        """Reserve the user's next send slot; returns seconds until it frees if it is taken"""
+        now = monotonic()
+        wait = self._send_slot_at.get(user_id, 0.0) - now
+        if wait > SLOT_SLACK:
+            return wait
+        self._send_slot_at[user_id] = now + GROUP_DELAY
+        return 0.0
+
+    async def wait_for_send_slot(self, user_id: int):
+        """
+        Wait for and reserve the user's next send slot, for send loops that run
+        outside the scheduler (immediate broadcasts and settings changes), so they
+        stay GROUP_DELAY apart from the user's scheduled sends too
+        """
+        while wait := self._take_send_slot(user_id):
+            await asyncio.sleep(wait)
+
+    def _distrust_client(self, user_id: int):
+        """Forget cached health verdicts so the next send probes the client again"""
+        self._healthy_at.pop(user_id, None)
+        self._sent_ok_at.pop(user_id, None)
+
     async def _ensure_client_ready(self, user_id: int) -> bool:
         """Ensure client is ready, attempt recovery if not"""
+        sent_ok_at = self._sent_ok_at.get(user_id)
+        if sent_ok_at is not None and monotonic() - sent_ok_at < SEND_VERIFIED_TTL:
+            return True
+
         if await self._check_client_health(user_id):
             return True
 
-        print(f"[SCHEDULER] Client not ready for user {user_id}, attempting recovery...", flush=True)
+        lock = self._recovery_locks[user_id]
+        waited = lock.locked()
+        async with lock:
+            # Another caller may have recovered the client while we waited
+            if waited and await self._check_client_health(user_id):
+                return True
+            return await self._recover_client(user_id)
+
+    async def _recover_client(self, user_id: int) -> bool:
+        """Reinitialize a user's client and wait for it to report ready"""
+        logger.warning("Client not ready for user %s, attempting recovery...", user_id)
 
         # Try to reinitialize the client
         try:
             recovery = await whatsapp_bridge.init_client(user_id)
             if not recovery.get('success'):
-                print(f"[SCHEDULER] Client recovery failed for user {user_id}: {recovery.get('error')}", flush=True)
+                logger.warning("Client recovery failed for user %s: %s", user_id, recovery.get('error'))
                 return False
 
-            # Wait for client to stabilize
-            print(f"[SCHEDULER] Recovery initiated, waiting 15s for client to stabilize...", flush=True)
-            await asyncio.sleep(15)
-
-            # Check again
-            if await self._check_client_health(user_id):
-                print(f"[SCHEDULER] Client recovered successfully for user {user_id}", flush=True)
-                return True
-            else:
-                print(f"[SCHEDULER] Client still not ready after recovery for user {user_id}", flush=True)
-                return False
+            # Poll until the client reports ready (failed checks are never cached,
+            # so each poll is a real probe), backing off up to RECOVERY_WAIT
+            logger.info("Recovery initiated, waiting up to %ss for client to stabilize...", RECOVERY_WAIT)
+            deadline = monotonic() + RECOVERY_WAIT
+            delay = RECOVERY_POLL_START
+            while True:
+                await asyncio.sleep(min(delay, max(0.0, deadline - monotonic())))
+                if await self._check_client_health(user_id):
+                    logger.info("Client recovered successfully for user %s", user_id)
+                    return True
+                if monotonic() >= deadline:
+                    logger.warning("Client still not ready after recovery for user %s", user_id)
+                    return False
+                delay = min(delay * 2, RECOVERY_POLL_MAX)
 
         except Exception as e:
-            print(f"[SCHEDULER] Recovery exception for user {user_id}: {e}", flush=True)
+            logger.warning("Recovery exception for user %s: %s", user_id, e)
             return False
 
     async def process_due_tasks(self):
-        """Process all tasks that are due"""
-        db = SessionLocal()
+        """Claim a batch of due tasks and process them concurrently across users"""
+        now = utcnow()
         try:
-            now = datetime.utcnow()
-            # Get pending tasks that are due
-            due_tasks = db.query(ScheduledMessage).filter(
-                ScheduledMessage.status == 'pending',
-                ScheduledMessage.scheduled_at <= now
-            ).all()
-
-            if due_tasks:
-                print(f"[SCHEDULER] Found {len(due_tasks)} tasks to process at {now}", flush=True)
-
-            for task in due_tasks:
-                # Route to appropriate handler based on task_type
-                task_type = task.task_type or 'broadcast'
-
-                if task_type == 'broadcast':
-                    await self._process_broadcast(db, task)
-                elif task_type == 'poll':
-                    await self._process_poll(db, task)
-                elif task_type == 'open_group':
-                    await self._process_group_settings(db, task, admin_only=False)
-                elif task_type == 'close_group':
-                    await self._process_group_settings(db, task, admin_only=True)
-                else:
-                    print(f"[SCHEDULER] Unknown task type: {task_type}", flush=True)
-
+            async with AsyncSessionLocal() as db:
+                is_new = ScheduledMessage.status == 'pending'
+                # Pending tasks that are due, plus in-flight tasks whose next group is due.
+                # SKIP LOCKED lets several scheduler instances claim disjoint batches
+                # without waiting on each other's row locks.
+                due_ids = select(ScheduledMessage.id).where(
+                    ScheduledMessage.task_type.in_(HANDLED_TASK_TYPES),
+                    or_(
+                        and_(ScheduledMessage.status == 'pending', ScheduledMessage.scheduled_at <= now),
+                        and_(ScheduledMessage.status == 'sending', ScheduledMessage.next_send_at <= now)
+                    )
+                ).limit(CLAIM_BATCH).with_for_update(skip_locked=True)
+                # The claim leases the step by pushing next_send_at out, so no other
+                # instance picks the same row and a crashed step is retried once the
+                # lease lapses
+                stmt = update(ScheduledMessage).where(
+                    ScheduledMessage.id.in_(due_ids)
+                ).values(
+                    status='sending',
+                    next_send_at=now + timedelta(seconds=STEP_LEASE),
+                    next_group_index=case((is_new, 0), else_=ScheduledMessage.next_group_index),
+                    groups_sent=case((is_new, 0), else_=ScheduledMessage.groups_sent),
+                    groups_failed=case((is_new, 0), else_=ScheduledMessage.groups_failed),
+                    error_message=case((is_new, None), else_=ScheduledMessage.error_message)
+                ).returning(
+                    ScheduledMessage.id, ScheduledMessage.user_id, ScheduledMessage.task_type
+                ).execution_options(synchronize_session=False)
+
+                due_tasks = (await db.execute(stmt)).all()
+                await db.commit()
         except Exception as e:
-            print(f"[SCHEDULER] Error processing due tasks: {e}", flush=True)
-        finally:
-            db.close()
+            logger.error("Error processing due tasks: %s", e)
+            return
+
+        if not due_tasks:
+            return
+        if len(due_tasks) == CLAIM_BATCH:
+            # More may be due; run another pass right after this one
+            self._wakeup.set()
 
-    async def _process_broadcast(self, db: Session, scheduled_msg: ScheduledMessage):
-        """Send a scheduled message to all target groups with delays"""
-        print(f"[SCHEDULER] Processing message {scheduled_msg.id} for user {scheduled_msg.user_id}", flush=True)
+        logger.info("Found %s tasks to process at %s", len(due_tasks), now)
 
-        # Mark as sending
-        scheduled_msg.status = 'sending'
-        db.commit()
+        # Users run concurrently; one user's tasks run one after another, so sends
+        # through a single WhatsApp session never overlap
+        by_user: Dict[int, List[Tuple[int, Optional[str]]]] = defaultdict(list)
+        for task_id, user_id, task_type in due_tasks:
+            by_user[user_id].append((task_id, task_type))
+        for tasks in by_user.values():
+            tasks.sort(key=lambda t: TASK_PRIORITY.get(t[1] or 'broadcast', 1))
 
+        await asyncio.gather(*(self._run_user_tasks(tasks) for tasks in by_user.values()))
+
+    async def _run_user_tasks(self, tasks: List[Tuple[int, Optional[str]]]):
+        """
+        Run one user's due task steps serially, saving each re-armed task's
+        progress before the next step starts
+        """
+        for task_id, task_type in tasks:
+            step = asyncio.create_task(self._dispatch(task_id, task_type))
+            self._running_steps[task_id] = step
+            try:
+                result = await step
+            except asyncio.CancelledError:
+                if asyncio.current_task().cancelling():
+                    raise
+                logger.info("Step of task %s cancelled", task_id)
+                continue
+            except Exception as e:
+                logger.error("Error processing task %s: %s", task_id, e, exc_info=True)
+                continue
+            finally:
+                self._running_steps.pop(task_id, None)
+            if result:
+                await self._save_progress(*result)
+
+    async def _save_progress(self, progress: dict, errors: List[dict]):
+        """Persist a re-armed task's progress and its step errors"""
         try:
-            group_ids = scheduled_msg.group_ids or []
-            groups_sent = 0
-            groups_failed = 0
-            errors = []
-            has_media = bool(scheduled_msg.media_path)  # Media is on WhatsApp service's volume
-
-            for i, group_id in enumerate(group_ids):
-                # 30-second delay between groups (except first)
-                if i > 0:
-                    print(f"[SCHEDULER] Waiting 30 seconds before next group...", flush=True)
-                    await asyncio.sleep(30)
+            async with AsyncSessionLocal() as db:
+                # ORM UPDATE by primary key / bulk INSERT (executemany)
+                await db.execute(update(ScheduledMessage), [progress])
+                if errors:
+                    await db.execute(insert(ScheduledMessageError), errors)
+                await db.commit()
+        except Exception as e:
+            logger.error("Error saving progress of task %s: %s", progress['id'], e)
 
+    async def _dispatch(self, task_id: int, task_type: Optional[str]) -> Optional[StepProgress]:
+        """
+        Run one task step on its own session.
+        Returns the task's progress mapping and error rows if it was re-armed for another step.
+        """
+        async with AsyncSessionLocal() as db:
+            task = await db.get(ScheduledMessage, task_id, options=STEP_LOAD_OPTIONS)
+            if task is None or task.status != 'sending':
+                return
+
+            # Route to appropriate handler based on task_type
+            handler = self._handlers.get(task_type or 'broadcast')
+            if handler is None:
+                logger.warning("Unknown task type: %s", task_type)
+                return None
+            return await handler(db, task)
+
+    async def _process_step(
+        self,
+        db: AsyncSession,
+        task: ScheduledMessage,
+        label: str,
+        send_to_group: Callable[[GroupTarget], Awaitable[Dict[str, Any]]],
+        progress_payload: Callable[[GroupTarget, int], dict],
+        complete_payload: Callable[[], dict],
+        on_complete: Optional[Callable[[], Awaitable[None]]] = None,
+        paced: bool = True
+    ) -> Optional[StepProgress]:
+        """
+        Send a task to its next target group, then either re-arm it for the
+        following group GROUP_DELAY seconds later or finalize it. Progress is
+        persisted on the row, so other tasks run in the gaps and a restart
+        resumes where it left off.
+
+        A re-armed task is not committed here: its progress mapping and error rows
+        are returned, and _run_user_tasks saves them before the user's next step.
+        Finalized tasks commit right away, since completion has side effects.
+
+        Paced steps also share a per-user send slot: while another of the user's
+        tasks holds it, the step is deferred until the slot frees, without sending.
+        Likewise, while the bridge's circuit breaker is open the step is re-armed
+        for the same group instead of failing it.
+        """
+        if paced and (task.next_group_index or 0) < len(task.group_ids or []):
+            wait = self._take_send_slot(task.user_id)
+            if wait:
+                return {'id': task.id, 'next_send_at': utcnow() + timedelta(seconds=wait)}, []
+
+        # The claim in process_due_tasks already marked the task as sending
+        if not task.next_group_index:
+            logger.info("Processing %s %s for user %s", label, task.id, task.user_id)
+
+        errors: List[dict] = []
+        step_started = utcnow()
+        # Set when the circuit breaker kept this step from reaching the service
+        deferred = False
+        try:
+            group_ids = task.group_ids or []
+            index = task.next_group_index or 0
+
+            if index < len(group_ids):
+                group_id = group_ids[index]
+                task.next_group_index = index + 1
+                # Get the WhatsApp group ID from the monitored group
+                group = await self._group_target(db, task.user_id, group_id, group_ids)
+
+                # Hand the pooled connection back while waiting on WhatsApp (health
+                # check, recovery, send and retries); the task keeps its loaded state
+                # and pending changes, and is re-attached once the I/O is done
+                await db.close()
                 try:
                     # Health check before each send - ensure client is ready
-                    if not await self._ensure_client_ready(scheduled_msg.user_id):
-                        errors.append("WhatsApp client not ready - recovery failed")
-                        groups_failed += len(group_ids) - i  # Fail remaining groups
-                        print(f"[SCHEDULER] Aborting broadcast - client not ready", flush=True)
-                        break  # Exit loop - can't send without client
-
-                    # Get the WhatsApp group ID from the monitored group
-                    group = db.query(MonitoredGroup).filter(
-                        MonitoredGroup.id == group_id,
-                        MonitoredGroup.user_id == scheduled_msg.user_id
-                    ).first()
-
-                    if not group:
-                        errors.append(f"Group {group_id} not found")
-                        groups_failed += 1
-                        continue
-
-                    print(f"[SCHEDULER] Sending to group: {group.group_name}", flush=True)
-
-                    # Send the message with retry logic for timeout errors
-                    if has_media:
-                        # Media is on WhatsApp service's volume, use send_media_from_path
-                        result = await self._send_with_retry(
-                            lambda g=group: whatsapp_bridge.send_media_from_path(
-                                user_id=scheduled_msg.user_id,
-                                group_id=g.whatsapp_group_id,
-                                file_path=scheduled_msg.media_path,
-                                caption=scheduled_msg.content,
-                                mention_all=(scheduled_msg.mention_type == 'all'),
-                                mention_ids=scheduled_msg.mention_ids if scheduled_msg.mention_type == 'selected' else None
-                            )
-                        )
+                    if not await self._ensure_client_ready(task.user_id):
+                        if whatsapp_bridge.unavailable_for():
+                            # The service is unreachable, not this user's client
+                            deferred = True
+                        else:
+                            self._add_error(task, errors, None, "WhatsApp client not ready - recovery failed")
+                            task.groups_failed = (task.groups_failed or 0) + len(group_ids) - index  # Fail remaining groups
+                            task.next_group_index = len(group_ids)
+                            logger.warning("Aborting %s %s - client not ready", label, task.id)
+                    elif not group:
+                        self._add_error(task, errors, group_id, f"Group {group_id} not found")
+                        task.groups_failed = (task.groups_failed or 0) + 1
                     else:
-                        result = await self._send_with_retry(
-                            lambda g=group: whatsapp_bridge.send_message(
-                                user_id=scheduled_msg.user_id,
-                                group_id=g.whatsapp_group_id,
-                                content=scheduled_msg.content,
-                                mention_all=(scheduled_msg.mention_type == 'all'),
-                                mention_ids=scheduled_msg.mention_ids if scheduled_msg.mention_type == 'selected' else None
+                        logger.info("Sending %s to group: %s", label, group.group_name)
+                        result = await send_to_group(group)
+
+                        if result.get('error') == SERVICE_UNAVAILABLE:
+                            deferred = True
+                        elif result.get('success'):
+                            task.groups_sent = (task.groups_sent or 0) + 1
+                            self._sent_ok_at[task.user_id] = monotonic()
+                            logger.info("Successfully sent %s to %s", label, group.group_name)
+
+                            # Notify user of progress via WebSocket (queued, never blocks the send loop)
+                            websocket_manager.send_to_user_nowait(
+                                task.user_id, progress_payload(group, len(group_ids))
                             )
-                        )
-
-                    if result.get('success'):
-                        groups_sent += 1
-                        print(f"[SCHEDULER] Successfully sent to {group.group_name}", flush=True)
-
-                        # Notify user of progress via WebSocket
-                        await websocket_manager.send_to_user(scheduled_msg.user_id, {
-                            'type': 'broadcast_progress',
-                            'message_id': scheduled_msg.id,
-                            'group_name': group.group_name,
-                            'groups_sent': groups_sent,
-                            'total_groups': len(group_ids)
-                        })
-                    else:
-                        groups_failed += 1
-                        error_msg = result.get('error', 'Unknown error')
-                        errors.append(f"{group.group_name}: {error_msg}")
-                        print(f"[SCHEDULER] Failed to send to {group.group_name}: {error_msg}", flush=True)
+                        else:
+                            task.groups_failed = (task.groups_failed or 0) + 1
+                            error_msg = result.get('error', 'Unknown error')
+                            self._add_error(task, errors, group_id, f"{group.group_name}: {error_msg}")
+                            logger.warning("Failed to send %s to %s: %s", label, group.group_name, error_msg)
+                            # The client may have dropped; re-check it before the next send
+                            self._distrust_client(task.user_id)
 
                 except Exception as e:
-                    groups_failed += 1
-                    errors.append(f"Group {group_id}: {str(e)}")
-                    print(f"[SCHEDULER] Error sending to group {group_id}: {e}", flush=True)
+                    task.groups_failed = (task.groups_failed or 0) + 1
+                    self._add_error(task, errors, group_id, f"Group {group_id}: {str(e)}")
+                    logger.warning("Error sending %s to group %s: %s", label, group_id, e)
+                    self._distrust_client(task.user_id)
+                finally:
+                    db.add(task)
+
+            if deferred:
+                # Retry the same group once the breaker lets calls through again
+                task.next_group_index = index
+                logger.info("WhatsApp service unavailable, deferring %s %s", label, task.id)
+                return {
+                    'id': task.id,
+                    'next_group_index': index,
+                    'next_send_at': utcnow() + timedelta(seconds=whatsapp_bridge.unavailable_for())
+                }, errors
+
+            if task.next_group_index < len(group_ids):
+                # Re-arm for the next group instead of sleeping inside the task. The
+                # delay counts from when this step started, not from when the send returned.
+                return {
+                    'id': task.id,
+                    'next_group_index': task.next_group_index,
+                    'next_send_at': step_started + timedelta(seconds=GROUP_DELAY),
+                    'groups_sent': task.groups_sent,
+                    'groups_failed': task.groups_failed,
+                    'error_message': task.error_message
+                }, errors
 
             # Update final status
-            scheduled_msg.groups_sent = groups_sent
-            scheduled_msg.groups_failed = groups_failed
-            scheduled_msg.sent_at = datetime.utcnow()
-
-            if groups_failed == 0:
-                scheduled_msg.status = 'sent'
-            elif groups_sent == 0:
-                scheduled_msg.status = 'failed'
+            task.next_send_at = None
+            task.sent_at = step_started
+
+            if (task.groups_failed or 0) == 0:
+                task.status = 'sent'
+            elif (task.groups_sent or 0) == 0:
+                task.status = 'failed'
             else:
-                scheduled_msg.status = 'partially_sent'
+                task.status = 'partially_sent'
 
-            if errors:
-                scheduled_msg.error_message = "; ".join(errors)
+            if task.error_message:
+                task.error_message = error_summary(task.error_message, task.groups_failed or 0)
 
-            # Clean up media file on WhatsApp service after broadcast
-            if has_media:
-                try:
-                    await whatsapp_bridge.delete_media(scheduled_msg.media_path)
-                except Exception:
-                    pass
+            # Before any write, so a network-only hook (media cleanup) runs without
+            # a connection checked out
+            if on_complete:
+                await on_complete()
 
-            db.commit()
+            if errors:
+                await db.execute(insert(ScheduledMessageError), errors)
+            await db.commit()
 
             # Notify user of completion via WebSocket
-            await websocket_manager.send_to_user(scheduled_msg.user_id, {
-                'type': 'broadcast_complete',
-                'message_id': scheduled_msg.id,
-                'status': scheduled_msg.status,
-                'groups_sent': groups_sent,
-                'groups_failed': groups_failed,
-                'error_message': scheduled_msg.error_message
-            })
+            await websocket_manager.send_to_user(task.user_id, complete_payload())
 
-            print(f"[SCHEDULER] Message {scheduled_msg.id} completed: {scheduled_msg.status}", flush=True)
+            logger.info("%s %s completed: %s", label.capitalize(), task.id, task.status)
 
         except Exception as e:
-            print(f"[SCHEDULER] Fatal error processing message {scheduled_msg.id}: {e}", flush=True)
-            scheduled_msg.status = 'failed'
-            scheduled_msg.error_message = str(e)
-            db.commit()
+            logger.error("Fatal error processing %s %s: %s", label, task.id, e, exc_info=True)
+            await db.rollback()
+            # The rollback expired the task; reload it (no lazy loads under asyncio)
+            await db.refresh(task)
+            task.status = 'failed'
+            task.next_send_at = None
+            task.error_message = str(e)
+            errors.append({'task_id': task.id, 'group_id': None, 'error': str(e)})
+            await db.execute(insert(ScheduledMessageError), errors)
+            await db.commit()
 
             # Notify user of failure
-            await websocket_manager.send_to_user(scheduled_msg.user_id, {
-                'type': 'broadcast_complete',
-                'message_id': scheduled_msg.id,
-                'status': 'failed',
-                'error_message': str(e)
-            })
-
-    async def _process_poll(self, db: Session, scheduled_msg: ScheduledMessage):
-        """Send a scheduled poll to all target groups with delays"""
-        print(f"[SCHEDULER] Processing poll {scheduled_msg.id} for user {scheduled_msg.user_id}", flush=True)
-
-        # Mark as sending
-        scheduled_msg.status = 'sending'
-        db.commit()
+            payload = complete_payload()
+            payload['status'] = 'failed'
+            await websocket_manager.send_to_user(task.user_id, payload)
 
-        try:
-            group_ids = scheduled_msg.group_ids or []
-            groups_sent = 0
-            groups_failed = 0
-            errors = []
-
-            for i, group_id in enumerate(group_ids):
-                # 30-second delay between groups (except first)
-                if i > 0:
-                    print(f"[SCHEDULER] Waiting 30 seconds before next group...", flush=True)
-                    await asyncio.sleep(30)
+        return None
 
-                try:
-                    # Health check before each send - ensure client is ready
-                    if not await self._ensure_client_ready(scheduled_msg.user_id):
-                        errors.append("WhatsApp client not ready - recovery failed")
-                        groups_failed += len(group_ids) - i  # Fail remaining groups
-                        print(f"[SCHEDULER] Aborting poll - client not ready", flush=True)
-                        break  # Exit loop - can't send without client
-
-                    # Get the WhatsApp group ID from the monitored group
-                    group = db.query(MonitoredGroup).filter(
-                        MonitoredGroup.id == group_id,
-                        MonitoredGroup.user_id == scheduled_msg.user_id
-                    ).first()
-
-                    if not group:
-                        errors.append(f"Group {group_id} not found")
-                        groups_failed += 1
-                        continue
-
-                    print(f"[SCHEDULER] Sending poll to group: {group.group_name}", flush=True)
-
-                    # Send the poll with retry logic for timeout errors
-                    result = await self._send_with_retry(
-                        lambda g=group: whatsapp_bridge.send_poll(
-                            user_id=scheduled_msg.user_id,
-                            group_id=g.whatsapp_group_id,
-                            question=scheduled_msg.content,  # Poll question stored in content
-                            options=scheduled_msg.poll_options or [],
-                            allow_multiple_answers=scheduled_msg.poll_allow_multiple or False,
-                            mention_all=(scheduled_msg.mention_type == 'all'),
-                            mention_ids=scheduled_msg.mention_ids if scheduled_msg.mention_type == 'selected' else None
-                        )
+    async def _group_target(self, db: AsyncSession, user_id: int, group_id: int, group_ids: List[int]) -> Optional[GroupTarget]:
+        """
+        Look up a user's monitored group, cached for GROUP_CACHE_TTL. A miss loads
+        every uncached group of the task with one IN query, so later steps hit.
+        """
+        with self._group_cache_lock:
+            target = self._group_cache.get((user_id, group_id))
+            missing = [] if target is not None else [
+                gid for gid in group_ids if (user_id, gid) not in self._group_cache
+            ]
+        if target is not None:
+            return target
+
+        rows = (await db.execute(select(
+            MonitoredGroup.id, MonitoredGroup.whatsapp_group_id, MonitoredGroup.group_name
+        ).where(
+            MonitoredGroup.id.in_(missing or [group_id]),
+            MonitoredGroup.user_id == user_id
+        ))).all()
+
+        targets = {row.id: GroupTarget(*row) for row in rows}
+        with self._group_cache_lock:
+            for gid, found in targets.items():
+                self._group_cache[(user_id, gid)] = found
+        return targets.get(group_id)
+
+    def invalidate_group(self, user_id: int, group_id: int):
+        with self._group_cache_lock:
+            self._group_cache.pop((user_id, group_id), None)
+
+    @staticmethod
+    def _add_error(task: ScheduledMessage, errors: List[dict], group_id: Optional[int], error: str):
+        """Buffer an error row for the step; the task keeps its first error as the summary"""
+        errors.append({'task_id': task.id, 'group_id': group_id, 'error': error})
+        if not task.error_message:
+            task.error_message = error
+
+    async def _process_broadcast(self, db: AsyncSession, scheduled_msg: ScheduledMessage) -> Optional[StepProgress]:
+        """Send a scheduled message to its next target group"""
+        # Snapshot the send inputs once; the task is detached from its session
+        # while the send runs, and these never change mid-task
+        user_id = scheduled_msg.user_id
+        content = scheduled_msg.content
+        media_path = scheduled_msg.media_path  # Media is on WhatsApp service's volume
+        mention_all, mention_ids = mention_args(scheduled_msg.mention_type, scheduled_msg.mention_ids)
+
+        def send_to_group(group: GroupTarget):
+            # Send the message with retry logic for timeout errors
+            if media_path:
+                # Media is on WhatsApp service's volume, use send_media_from_path
+                return self._send_with_retry(
+                    lambda: whatsapp_bridge.send_media_from_path(
+                        user_id=user_id,
+                        group_id=group.whatsapp_group_id,
+                        file_path=media_path,
+                        caption=content,
+                        mention_all=mention_all,
+                        mention_ids=mention_ids
                     )
-
-                    if result.get('success'):
-                        groups_sent += 1
-                        print(f"[SCHEDULER] Successfully sent poll to {group.group_name}", flush=True)
-
-                        # Notify user of progress via WebSocket
-                        await websocket_manager.send_to_user(scheduled_msg.user_id, {
-                            'type': 'poll_progress',
-                            'message_id': scheduled_msg.id,
-                            'group_name': group.group_name,
-                            'groups_sent': groups_sent,
-                            'total_groups': len(group_ids)
-                        })
-                    else:
-                        groups_failed += 1
-                        error_msg = result.get('error', 'Unknown error')
-                        errors.append(f"{group.group_name}: {error_msg}")
-                        print(f"[SCHEDULER] Failed to send poll to {group.group_name}: {error_msg}", flush=True)
-
-                except Exception as e:
-                    groups_failed += 1
-                    errors.append(f"Group {group_id}: {str(e)}")
-                    print(f"[SCHEDULER] Error sending poll to group {group_id}: {e}", flush=True)
-
-            # Update final status
-            scheduled_msg.groups_sent = groups_sent
-            scheduled_msg.groups_failed = groups_failed
-            scheduled_msg.sent_at = datetime.utcnow()
-
-            if groups_failed == 0:
-                scheduled_msg.status = 'sent'
-            elif groups_sent == 0:
-                scheduled_msg.status = 'failed'
-            else:
-                scheduled_msg.status = 'partially_sent'
-
-            if errors:
-                scheduled_msg.error_message = "; ".join(errors)
-
-            db.commit()
-
-            # Notify user of completion via WebSocket
-            await websocket_manager.send_to_user(scheduled_msg.user_id, {
-                'type': 'poll_complete',
+                )
+            return self._send_with_retry(
+                lambda: whatsapp_bridge.send_message(
+                    user_id=user_id,
+                    group_id=group.whatsapp_group_id,
+                    content=content,
+                    mention_all=mention_all,
+                    mention_ids=mention_ids
+                )
+            )
+
+        async def cleanup_media():
+            # Clean up media file on WhatsApp service after broadcast; the delete
+            # runs in the background so completion doesn't wait on it
+            if media_path:
+                self._spawn(self._delete_media(media_path))
+
+        return await self._process_step(
+            db, scheduled_msg, 'message',
+            send_to_group,
+            lambda group, total: {
+                'type': 'broadcast_progress',
+                'message_id': scheduled_msg.id,
+                'group_name': group.group_name,
+                'groups_sent': scheduled_msg.groups_sent,
+                'total_groups': total
+            },
+            lambda: {
+                'type': 'broadcast_complete',
                 'message_id': scheduled_msg.id,
                 'status': scheduled_msg.status,
-                'groups_sent': groups_sent,
-                'groups_failed': groups_failed,
+                'groups_sent': scheduled_msg.groups_sent,
+                'groups_failed': scheduled_msg.groups_failed,
                 'error_message': scheduled_msg.error_message
-            })
-
-            print(f"[SCHEDULER] Poll {scheduled_msg.id} completed: {scheduled_msg.status}", flush=True)
-
-        except Exception as e:
-            print(f"[SCHEDULER] Fatal error processing poll {scheduled_msg.id}: {e}", flush=True)
-            scheduled_msg.status = 'failed'
-            scheduled_msg.error_message = str(e)
-            db.commit()
+            },
+            on_complete=cleanup_media
+        )
+
+    async def _process_poll(self, db: AsyncSession, scheduled_msg: ScheduledMessage) -> Optional[StepProgress]:
+        """Send a scheduled poll to its next target group"""
+        user_id = scheduled_msg.user_id
+        question = scheduled_msg.content  # Poll question stored in content
+        options = scheduled_msg.poll_options or []
+        allow_multiple = scheduled_msg.poll_allow_multiple or False
+        mention_all, mention_ids = mention_args(scheduled_msg.mention_type, scheduled_msg.mention_ids)
+
+        def send_to_group(group: GroupTarget):
+            # Send the poll with retry logic for timeout errors
+            return self._send_with_retry(
+                lambda: whatsapp_bridge.send_poll(
+                    user_id=user_id,
+                    group_id=group.whatsapp_group_id,
+                    question=question,
+                    options=options,
+                    allow_multiple_answers=allow_multiple,
+                    mention_all=mention_all,
+                    mention_ids=mention_ids
+                )
+            )
 
-            # Notify user of failure
-            await websocket_manager.send_to_user(scheduled_msg.user_id, {
+        return await self._process_step(
+            db, scheduled_msg, 'poll',
+            send_to_group,
+            lambda group, total: {
+                'type': 'poll_progress',
+                'message_id': scheduled_msg.id,
+                'group_name': group.group_name,
+                'groups_sent': scheduled_msg.groups_sent,
+                'total_groups': total
+            },
+            lambda: {
                 'type': 'poll_complete',
                 'message_id': scheduled_msg.id,
-                'status': 'failed',
-                'error_message': str(e)
-            })
+                'status': scheduled_msg.status,
+                'groups_sent': scheduled_msg.groups_sent,
+                'groups_failed': scheduled_msg.groups_failed,
+                'error_message': scheduled_msg.error_message
+            }
+        )
 
-    async def _process_group_settings(self, db: Session, task: ScheduledMessage, admin_only: bool):
-        """Process group settings change task (open or close groups)"""
+    async def _process_group_settings(self, db: AsyncSession, task: ScheduledMessage, admin_only: bool) -> Optional[StepProgress]:
+        """Apply a group settings change (open or close) to the task's next target group"""
         action = 'close' if admin_only else 'open'
-        print(f"[SCHEDULER] Processing {action} groups for task {task.id}, user {task.user_id}", flush=True)
-
-        task.status = 'sending'
-        db.commit()
-
-        try:
-            group_ids = task.group_ids or []
-            groups_success = 0
-            groups_failed = 0
-            errors = []
-
-            for i, group_id in enumerate(group_ids):
-                # 30-second delay between groups (except first)
-                if i > 0:
-                    print(f"[SCHEDULER] Waiting 30 seconds before next group...", flush=True)
-                    await asyncio.sleep(30)
-
-                try:
-                    # Health check before each send - ensure client is ready
-                    if not await self._ensure_client_ready(task.user_id):
-                        errors.append("WhatsApp client not ready - recovery failed")
-                        groups_failed += len(group_ids) - i  # Fail remaining groups
-                        print(f"[SCHEDULER] Aborting group settings - client not ready", flush=True)
-                        break  # Exit loop - can't send without client
-
-                    # Get the WhatsApp group ID from the monitored group
-                    group = db.query(MonitoredGroup).filter(
-                        MonitoredGroup.id == group_id,
-                        MonitoredGroup.user_id == task.user_id
-                    ).first()
-
-                    if not group:
-                        errors.append(f"Group {group_id} not found")
-                        groups_failed += 1
-                        continue
-
-                    print(f"[SCHEDULER] Setting {action} for group: {group.group_name}", flush=True)
-
-                    # Change group settings with retry logic
-                    result = await self._send_with_retry(
-                        lambda g=group: whatsapp_bridge.set_group_admin_only(
-                            user_id=task.user_id,
-                            group_id=g.whatsapp_group_id,
-                            admin_only=admin_only
-                        )
+        user_id = task.user_id
+        content = task.content
+        mention_all, mention_ids = mention_args(task.mention_type, task.mention_ids)
+
+        async def send_to_group(group: GroupTarget):
+            # Change group settings with retry logic
+            result = await self._send_with_retry(
+                lambda: whatsapp_bridge.set_group_admin_only(
+                    user_id=user_id,
+                    group_id=group.whatsapp_group_id,
+                    admin_only=admin_only
+                )
+            )
+
+            # Send optional message if configured (also with retry)
+            if result.get('success') and content:
+                await self._send_with_retry(
+                    lambda: whatsapp_bridge.send_message(
+                        user_id=user_id,
+                        group_id=group.whatsapp_group_id,
+                        content=content,
+                        mention_all=mention_all,
+                        mention_ids=mention_ids
                     )
+                )
+            return result
 
-                    if result.get('success'):
-                        groups_success += 1
-                        print(f"[SCHEDULER] Successfully set {action} for {group.group_name}", flush=True)
-
-                        # Send optional message if configured (also with retry)
-                        if task.content:
-                            await self._send_with_retry(
-                                lambda g=group: whatsapp_bridge.send_message(
-                                    user_id=task.user_id,
-                                    group_id=g.whatsapp_group_id,
-                                    content=task.content,
-                                    mention_all=(task.mention_type == 'all'),
-                                    mention_ids=task.mention_ids if task.mention_type == 'selected' else None
-                                )
-                            )
-
-                        # Notify user of progress via WebSocket
-                        await websocket_manager.send_to_user(task.user_id, {
-                            'type': 'settings_progress',
-                            'task_id': task.id,
-                            'action': action,
-                            'group_name': group.group_name,
-                            'groups_done': groups_success + groups_failed,
-                            'total_groups': len(group_ids)
-                        })
-                    else:
-                        groups_failed += 1
-                        error_msg = result.get('error', 'Unknown error')
-                        errors.append(f"{group.group_name}: {error_msg}")
-                        print(f"[SCHEDULER] Failed to set {action} for {group.group_name}: {error_msg}", flush=True)
-
-                except Exception as e:
-                    groups_failed += 1
-                    errors.append(f"Group {group_id}: {str(e)}")
-                    print(f"[SCHEDULER] Error setting {action} for group {group_id}: {e}", flush=True)
-
-            # Update task status
-            task.groups_sent = groups_success
-            task.groups_failed = groups_failed
-            task.sent_at = datetime.utcnow()
-
-            if groups_failed == 0:
-                task.status = 'sent'
-            elif groups_success == 0:
-                task.status = 'failed'
-            else:
-                task.status = 'partially_sent'
-
-            if errors:
-                task.error_message = "; ".join(errors)
-
-            # If recurring, schedule next occurrence for tomorrow
+        async def schedule_recurring():
+            # If recurring, clone the task for tomorrow. The copy is an
+            # INSERT ... SELECT in the same transaction as the status update,
+            # so the next occurrence commits (or rolls back) with it.
             if task.is_recurring and task.recurring_time:
                 next_run = self._calculate_next_run(task.recurring_time)
-                new_task = ScheduledMessage(
-                    user_id=task.user_id,
-                    task_type=task.task_type,
-                    is_recurring=True,
-                    recurring_time=task.recurring_time,
-                    parent_schedule_id=task.parent_schedule_id or task.id,
-                    content=task.content,
-                    group_ids=task.group_ids,
-                    group_names=task.group_names,
-                    mention_type=task.mention_type,
-                    mention_ids=task.mention_ids,
-                    scheduled_at=next_run,
-                    status='pending'
-                )
-                db.add(new_task)
-                print(f"[SCHEDULER] Created recurring task for {next_run}", flush=True)
-
-            db.commit()
-
-            # Notify user of completion via WebSocket
-            await websocket_manager.send_to_user(task.user_id, {
-                'type': 'settings_complete',
+                await db.execute(insert(ScheduledMessage).from_select(
+                    [
+                        'user_id', 'task_type', 'is_recurring', 'recurring_time', 'parent_schedule_id',
+                        'content', 'group_ids', 'group_names', 'mention_type', 'mention_ids',
+                        'scheduled_at', 'status'
+                    ],
+                    select(
+                        ScheduledMessage.user_id,
+                        ScheduledMessage.task_type,
+                        ScheduledMessage.is_recurring,
+                        ScheduledMessage.recurring_time,
+                        func.coalesce(ScheduledMessage.parent_schedule_id, ScheduledMessage.id),
+                        ScheduledMessage.content,
+                        ScheduledMessage.group_ids,
+                        ScheduledMessage.group_names,
+                        ScheduledMessage.mention_type,
+                        ScheduledMessage.mention_ids,
+                        literal(next_run, DateTime),
+                        literal('pending', ScheduledMessage.status.type)
+                    ).where(ScheduledMessage.id == task.id)
+                ))
+                logger.info("Created recurring task for %s", next_run)
+
+        return await self._process_step(
+            db, task, f"{action} groups",
+            send_to_group,
+            lambda group, total: {
+                'type': 'settings_progress',
                 'task_id': task.id,
                 'action': action,
-                'status': task.status,
-                'groups_success': groups_success,
-                'groups_failed': groups_failed,
-                'error_message': task.error_message
-            })
-
-            print(f"[SCHEDULER] Task {task.id} ({action}) completed: {task.status}")
-
-        except Exception as e:
-            print(f"[SCHEDULER] Fatal error processing task {task.id}: {e}", flush=True)
-            task.status = 'failed'
-            task.error_message = str(e)
-            db.commit()
-
-            # Notify user of failure
-            await websocket_manager.send_to_user(task.user_id, {
+                'group_name': group.group_name,
+                'groups_done': (task.groups_sent or 0) + (task.groups_failed or 0),
+                'total_groups': total
+            },
+            lambda: {
                 'type': 'settings_complete',
                 'task_id': task.id,
                 'action': action,
-                'status': 'failed',
-                'error_message': str(e)
-            })
-
-    def _calculate_next_run(self, time_str: str, timezone_offset_hours: int = 2) -> datetime:
+                'status': task.status,
+                'groups_success': task.groups_sent,
+                'groups_failed': task.groups_failed,
+                'error_message': task.error_message
+            },
+            on_complete=schedule_recurring,
+            # Settings changes are time-of-day steps, not message sends; they keep
+            # only the per-task group delay
+            paced=False
+        )
+
+    def _calculate_next_run(self, time_str: str) -> datetime:
         """
-        Calculate next occurrence (tomorrow at the same time).
-        Converts from local time to UTC by subtracting the timezone offset.
+        Calculate next occurrence (tomorrow at the same local time), as naive UTC.
 
         Args:
-            time_str: Time in HH:MM format (user's local time)
-            timezone_offset_hours: Hours ahead of UTC (default 2 for Egypt/UTC+2)
+            time_str: Time in HH:MM format (SCHEDULER_TZ local time)
         """
-        tomorrow = datetime.utcnow().date() + timedelta(days=1)
-        hour, minute = map(int, time_str.split(':'))
-        # Create datetime in user's local time, then convert to UTC
-        local_time = datetime.combine(tomorrow, time(hour, minute))
-        return local_time - timedelta(hours=timezone_offset_hours)
+        tomorrow = datetime.now(SCHEDULER_TZ).date() + timedelta(days=1)
+        return local_to_utc(tomorrow, parse_hhmm(time_str))
 
 
 # Singleton instance
 message_scheduler = MessageScheduler()
+
+
+@event.listens_for(MonitoredGroup, 'after_update')
+@event.listens_for(MonitoredGroup, 'after_delete')
+def _invalidate_group_target(mapper, connection, target):
+    message_scheduler.invalidate_group(target.user_id, target.id)
@@ -1,104 +1,405 @@
 import asyncio
-import json
-import redis.asyncio as redis
-from datetime import datetime, date
-from sqlalchemy.orm import Session
-from sqlalchemy.orm.attributes import flag_modified
-
-from app.config import settings
-from app.database import SessionLocal
+import logging
+import re
+import threading
+from time import monotonic
+import orjson
+from datetime import datetime
+from functools import lru_cache, partial
+from typing import Awaitable, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+from cachetools import TTLCache
+from redis.exceptions import ResponseError
+from sqlalchemy import event, select, text, tuple_, Integer
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.dialects.postgresql import JSONB, insert as pg_insert
+
+from app.redis_pool import stream_client
+from app.database import AsyncSessionLocal
 from app.models.whatsapp_session import WhatsAppSession
 from app.models.message import Message
+from app.models.message_daily_sender import MessageDailySender
 from app.models.event import Event
 from app.models.monitored_group import MonitoredGroup
 from app.models.agent import Agent
+from app.models.agent_enabled_group import AgentEnabledGroup
 from app.services.websocket_manager import websocket_manager
 from app.services.whatsapp_bridge import whatsapp_bridge
 from app.services.agent_service import agent_service
+from app.core.clock import current_date
+
+
+logger = logging.getLogger(__name__)
+
+# Events are published to whatsapp:events:{user_id % EVENT_SHARDS}; each shard has
+# its own reader, so one user's events stay in order while users are spread out
+EVENT_STREAM = "whatsapp:events"
+EVENT_SHARDS = 16
+CONSUMER_GROUP = "subs"
+# Most events one read hands to a single transaction
+BATCH_SIZE = 64
+# How long XREADGROUP waits for new entries before looping (ms)
+READ_BLOCK_MS = 1000
+# Entries left unacknowledged this long by another consumer (e.g. one from an older
+# deployment) are claimed (ms), checked every CLAIM_INTERVAL seconds
+CLAIM_IDLE_MS = 60_000
+CLAIM_INTERVAL = 30
+# Deliveries after which a failing entry is moved to the dead-letter stream
+MAX_DELIVERIES = 10
+DEAD_LETTER_STREAM = "whatsapp:events:dead"
+# Longest pause between retries of a shard's failed entries (seconds)
+RETRY_MAX = 30
+# How long a group lookup or a user's phone number is reused before re-reading it
+LOOKUP_CACHE_TTL = 60
+# Most agent replies (LLM call + send) in flight at once
+AGENT_CONCURRENCY = 16
+
+
+# Record a join: bump the counter and add the joiner (once) to the pending list.
+# Returns the new count, the threshold and the joiners; once the count reaches the
+# threshold the row itself is reset, and the returned joiners are the ones to greet.
+WELCOME_JOIN_SQL = text("""
+    UPDATE monitored_groups AS g
+    SET welcome_join_count = CASE WHEN j.join_count >= j.threshold THEN 0 ELSE j.join_count END,
+        welcome_pending_joiners = CASE WHEN j.join_count >= j.threshold THEN '[]'::jsonb ELSE j.joiners END
+    FROM (
+        SELECT id,
+               COALESCE(welcome_join_count, 0) + 1 AS join_count,
+               COALESCE(welcome_threshold, 1) AS threshold,
+               CASE
+                   WHEN welcome_pending_joiners IS NULL OR jsonb_typeof(welcome_pending_joiners) <> 'array'
+                       THEN jsonb_build_array(CAST(:phone AS text))
+                   WHEN welcome_pending_joiners @> jsonb_build_array(CAST(:phone AS text))
+                       THEN welcome_pending_joiners
+                   ELSE welcome_pending_joiners || jsonb_build_array(CAST(:phone AS text))
+               END AS joiners
+        FROM monitored_groups
+        WHERE id = :group_id
+        FOR UPDATE
+    ) AS j
+    WHERE g.id = j.id
+    RETURNING j.join_count, j.threshold, j.joiners
+""").columns(join_count=Integer, threshold=Integer, joiners=JSONB)
+
+
+def event_time(timestamp: Optional[float]) -> datetime:
+    """Local datetime for an event's epoch-seconds timestamp, or now if it has none"""
+    return datetime.fromtimestamp(timestamp) if timestamp is not None else datetime.now()
+
+
+@lru_cache(maxsize=1024)
+def mention_pattern(phone: str) -> re.Pattern:
+    """Compiled pattern for processed mentions of `phone`, e.g. @Name (1234567890)"""
+    return re.compile(rf'@[^@\n]+\({re.escape(phone)}\)')
+
+
+class GroupSnapshot(NamedTuple):
+    """The monitored-group fields event handling reads"""
+    id: int
+    user_id: int
+    whatsapp_group_id: str
+    group_name: str
 
 
 class RedisSubscriber:
-    """Subscribe to Redis pub/sub for WhatsApp events"""
+    """Consume WhatsApp events from the sharded Redis streams"""
 
     def __init__(self):
         self.redis = None
-        self.pubsub = None
         self.running = False
+        # One reader task per stream shard, each with a fixed consumer name ("c3"),
+        # so a restarted process picks up its predecessor's pending entries
+        self.readers: List[asyncio.Task] = []
+        # (user_id, whatsapp_group_id) -> GroupSnapshot, or None for groups that are
+        # not monitored (most traffic), and user_id -> phone number. Invalidated
+        # from ORM events, which can fire on threadpool threads. Phone numbers only
+        # change on login, so they're loaded up front and kept until invalidated.
+        self._group_cache: TTLCache = TTLCache(maxsize=8192, ttl=LOOKUP_CACHE_TTL)
+        self._phone_cache: Dict[int, Optional[str]] = {}
+        self._cache_lock = threading.Lock()
+        # Slow follow-ups (agent replies, welcome sends) run as background tasks so
+        # the readers keep handling events; referenced until done
+        self._background: Set[asyncio.Task] = set()
+        self._agent_slots = asyncio.Semaphore(AGENT_CONCURRENCY)
+        # event type -> handler(db, user_id, data); "message" events are batched separately
+        self._handlers = {
+            "qr": self.handle_qr,
+            "authenticated": self.handle_authenticated,
+            "ready": self.handle_ready,
+            "disconnected": self.handle_disconnected,
+            "member_join": partial(self.handle_member_event, event_type="JOIN"),
+            "member_leave": partial(self.handle_member_event, event_type="LEAVE"),
+            "certificate": self.handle_certificate_event,
+        }
 
     async def connect(self):
-        self.redis = redis.from_url(settings.redis_url)
-        self.pubsub = self.redis.pubsub()
-        await self.pubsub.subscribe("whatsapp:events")
+        # Dedicated client for the blocking stream reads, separate from app.state.redis
+        self.redis = stream_client(EVENT_SHARDS + 1)
+        for shard in range(EVENT_SHARDS):
+            try:
+                await self.redis.xgroup_create(f"{EVENT_STREAM}:{shard}", CONSUMER_GROUP, id="0", mkstream=True)
+            except ResponseError as e:
+                if "BUSYGROUP" not in str(e):
+                    raise
 
     async def start(self):
-        """Start listening for events"""
+        """Start reading events from every stream shard"""
         if not self.redis:
             await self.connect()
+        await self.load_phones()
 
         self.running = True
-        print("Redis subscriber started")
-
+        self.readers = [asyncio.create_task(self._read_shard(shard)) for shard in range(EVENT_SHARDS)]
+        logger.info("Redis subscriber started on %d stream shards", EVENT_SHARDS)
+
+    async def _read_shard(self, shard: int):
+        """
+        Read one shard through the consumer group, acknowledging entries only once
+        they've been handled. Starts from this consumer's own pending entries
+        (left by a previous run or failed events), then follows new ones.
+        """
+        stream = f"{EVENT_STREAM}:{shard}"
+        consumer = f"c{shard}"
+        last_id = "0"
+        next_claim = 0.0
+        failures = 0
         while self.running:
             try:
-                message = await self.pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
-                if message:
-                    await self.handle_message(message)
+                if monotonic() >= next_claim:
+                    next_claim = monotonic() + CLAIM_INTERVAL
+                    handled = await self._claim_stale(stream, consumer)
+                else:
+                    response = await self.redis.xreadgroup(
+                        CONSUMER_GROUP, consumer, {stream: last_id},
+                        count=BATCH_SIZE, block=None if last_id == "0" else READ_BLOCK_MS
+                    )
+                    entries = response[0][1] if response else []
+                    if not entries:
+                        # Own backlog is done; follow new entries from here on
+                        last_id = ">"
+                        continue
+                    handled = await self._handle_entries(stream, consumer, entries, retry=last_id == "0")
+            except asyncio.CancelledError:
+                break
             except Exception as e:
-                print(f"Redis subscriber error: {e}")
-                await asyncio.sleep(1)
+                logger.error("Redis subscriber error on %s: %s", stream, e, exc_info=True)
+                handled = False
+
+            if handled:
+                failures = 0
+                continue
+            # Unacknowledged entries are retried from the pending list, backing off
+            # while they keep failing (e.g. the database is down)
+            last_id = "0"
+            failures += 1
+            await asyncio.sleep(min(RETRY_MAX, 2 ** (failures - 1)))
+
+    async def _claim_stale(self, stream: str, consumer: str) -> bool:
+        """
+        Take over entries another consumer read but never acknowledged, then drop
+        consumers that have nothing pending any more. Returns False if any claimed
+        entry failed.
+        """
+        handled = True
+        start_id = "0-0"
+        while True:
+            start_id, entries = (await self.redis.xautoclaim(
+                stream, CONSUMER_GROUP, consumer, CLAIM_IDLE_MS, start_id=start_id, count=BATCH_SIZE
+            ))[:2]
+            if entries:
+                handled = await self._handle_entries(stream, consumer, entries, retry=True) and handled
+            if start_id in (b"0-0", "0-0"):
+                break
+
+        for info in await self.redis.xinfo_consumers(stream, CONSUMER_GROUP):
+            name = info["name"].decode() if isinstance(info["name"], bytes) else info["name"]
+            if not info["pending"] and not re.fullmatch(r"c\d+", name):
+                await self.redis.xgroup_delconsumer(stream, CONSUMER_GROUP, name)
+        return handled
+
+    async def _handle_entries(self, stream: str, consumer: str, entries: list, retry: bool = False) -> bool:
+        """
+        Handle a batch of stream entries and acknowledge the ones that succeeded.
+        Redelivered entries that have failed MAX_DELIVERIES times are moved to the
+        dead-letter stream instead. Returns False if any entry was left pending.
+        """
+        if retry:
+            entries = await self._dead_letter_exhausted(stream, consumer, entries)
+
+        # Entries trimmed from the stream while pending come back without fields
+        live = [(entry_id, fields[b"payload"]) for entry_id, fields in entries if fields]
+        failed = await self.handle_batch([payload for _, payload in live]) if live else set()
+        failed_ids = {live[i][0] for i in failed}
+        done = [entry_id for entry_id, _ in entries if entry_id not in failed_ids]
+        if done:
+            await self.redis.xack(stream, CONSUMER_GROUP, *done)
+        return not failed_ids
+
+    async def _dead_letter_exhausted(self, stream: str, consumer: str, entries: list) -> list:
+        """Move entries delivered MAX_DELIVERIES times out of the way; return the rest"""
+        pending = await self.redis.xpending_range(
+            stream, CONSUMER_GROUP, min=entries[0][0], max=entries[-1][0],
+            count=len(entries), consumername=consumer
+        )
+        exhausted = {p["message_id"] for p in pending if p["times_delivered"] > MAX_DELIVERIES}
+        if not exhausted:
+            return entries
+
+        remaining = []
+        for entry_id, fields in entries:
+            if entry_id not in exhausted:
+                remaining.append((entry_id, fields))
+                continue
+            logger.error("Moving event %s on %s to %s after %d deliveries",
+                         entry_id, stream, DEAD_LETTER_STREAM, MAX_DELIVERIES)
+            if fields:
+                await self.redis.xadd(
+                    DEAD_LETTER_STREAM, {"stream": stream, "id": entry_id, "payload": fields[b"payload"]},
+                    maxlen=10_000, approximate=True
+                )
+            await self.redis.xack(stream, CONSUMER_GROUP, entry_id)
+        return remaining
 
     async def stop(self):
         """Stop the subscriber"""
         self.running = False
-        if self.pubsub:
-            await self.pubsub.unsubscribe("whatsapp:events")
+        for task in list(self._background):
+            task.cancel()
+        for reader in self.readers:
+            reader.cancel()
+        await asyncio.gather(*self.readers, return_exceptions=True)
+        self.readers = []
         if self.redis:
             await self.redis.close()
 
-    async def handle_message(self, message):
-        """Handle incoming Redis message"""
-        try:
-            data = json.loads(message["data"])
-            event_type = data.get("type")
-            user_id = data.get("userId")
-
-            if not user_id:
-                return
-
-            # Get database session
-            db = SessionLocal()
+    def _spawn(self, coro: Awaitable):
+        """Run a coroutine in the background, off the event-handling path"""
+        task = asyncio.create_task(coro)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def monitored_groups(
+        self, db: AsyncSession, pairs: Iterable[Tuple[int, str]]
+    ) -> Dict[Tuple[int, str], Optional[GroupSnapshot]]:
+        """Resolve (user_id, whatsapp_group_id) pairs to active monitored groups, cached"""
+        found, missing = {}, []
+        with self._cache_lock:
+            for pair in pairs:
+                if pair in self._group_cache:
+                    found[pair] = self._group_cache[pair]
+                else:
+                    missing.append(pair)
+        if not missing:
+            return found
+
+        rows = (await db.execute(select(
+            MonitoredGroup.id, MonitoredGroup.user_id, MonitoredGroup.whatsapp_group_id, MonitoredGroup.group_name
+        ).where(
+            tuple_(MonitoredGroup.user_id, MonitoredGroup.whatsapp_group_id).in_(missing),
+            MonitoredGroup.is_active == True
+        ))).all()
+        loaded = {(row.user_id, row.whatsapp_group_id): GroupSnapshot(*row) for row in rows}
+        with self._cache_lock:
+            for pair in missing:
+                found[pair] = self._group_cache[pair] = loaded.get(pair)
+        return found
+
+    async def monitored_group(self, db: AsyncSession, user_id: int, group_id_wa: str) -> Optional[GroupSnapshot]:
+        return (await self.monitored_groups(db, [(user_id, group_id_wa)]))[(user_id, group_id_wa)]
+
+    async def user_phone(self, db: AsyncSession, user_id: int) -> Optional[str]:
+        """The phone number of a user's WhatsApp session, cached"""
+        with self._cache_lock:
+            if user_id in self._phone_cache:
+                return self._phone_cache[user_id]
+        phone = await db.scalar(select(WhatsAppSession.phone_number).where(
+            WhatsAppSession.user_id == user_id
+        ).limit(1))
+        with self._cache_lock:
+            self._phone_cache[user_id] = phone
+        return phone
+
+    async def load_phones(self):
+        """Bulk-load the phone numbers of authenticated sessions"""
+        async with AsyncSessionLocal() as db:
+            rows = (await db.execute(select(WhatsAppSession.user_id, WhatsAppSession.phone_number).where(
+                WhatsAppSession.is_authenticated == True
+            ))).all()
+        with self._cache_lock:
+            self._phone_cache.update(rows)
+
+    def invalidate_group(self, user_id: int, group_id_wa: str):
+        with self._cache_lock:
+            self._group_cache.pop((user_id, group_id_wa), None)
+
+    def invalidate_phone(self, user_id: int):
+        with self._cache_lock:
+            self._phone_cache.pop(user_id, None)
+
+    async def handle_batch(self, batch: list) -> Set[int]:
+        """
+        Handle a batch of raw event payloads on one database session. Events fail
+        individually; returns the positions of the ones to retry.
+        """
+        events = []  # (position, event)
+        for i, raw in enumerate(batch):
             try:
-                if event_type == "qr":
-                    await self.handle_qr(db, user_id, data)
-                elif event_type == "authenticated":
-                    await self.handle_authenticated(db, user_id, data)
-                elif event_type == "ready":
-                    await self.handle_ready(db, user_id, data)
-                elif event_type == "disconnected":
-                    await self.handle_disconnected(db, user_id, data)
-                elif event_type == "message":
-                    await self.handle_new_message(db, user_id, data)
-                elif event_type == "member_join":
-                    await self.handle_member_event(db, user_id, data, "JOIN")
-                elif event_type == "member_leave":
-                    await self.handle_member_event(db, user_id, data, "LEAVE")
-                elif event_type == "certificate":
-                    await self.handle_certificate_event(db, user_id, data)
-            finally:
-                db.close()
-
-        except Exception as e:
-            print(f"Error handling message: {e}")
-
-    async def handle_qr(self, db: Session, user_id: int, data: dict):
+                data = orjson.loads(raw)
+            except ValueError as e:
+                logger.error("Dropping undecodable event: %s", e)
+                continue
+            if isinstance(data, dict) and data.get("userId"):
+                events.append((i, data))
+        failed = set()
+        if not events:
+            return failed
+
+        # Get database session (asyncpg, so queries never block the event loop)
+        async with AsyncSessionLocal() as db:
+            new_messages = []
+            for i, data in events:
+                if data.get("type") == "message":
+                    new_messages.append((i, data))
+                    continue
+                try:
+                    await self.handle_message(db, data)
+                except Exception as e:
+                    logger.error("Error handling %s event: %s", data.get("type"), e, exc_info=True)
+                    await db.rollback()
+                    failed.add(i)
+
+            if new_messages:
+                try:
+                    await self.handle_new_messages(db, [data for _, data in new_messages])
+                except Exception as e:
+                    logger.error("Error handling message batch: %s", e, exc_info=True)
+                    await db.rollback()
+                    # Stored messages are skipped on retry (ON CONFLICT DO NOTHING), so
+                    # retry one by one to find the ones that actually fail
+                    for i, data in new_messages:
+                        try:
+                            await self.handle_new_messages(db, [data])
+                        except Exception as e:
+                            logger.error("Error handling message: %s", e)
+                            await db.rollback()
+                            failed.add(i)
+        return failed
+
+    async def handle_message(self, db: AsyncSession, data: dict):
+        """Handle one non-batched event"""
+        handler = self._handlers.get(data.get("type"))
+        if handler:
+            await handler(db, data.get("userId"), data)
+
+    async def handle_qr(self, db: AsyncSession, user_id: int, data: dict):
         """Handle QR code event"""
-        session = db.query(WhatsAppSession).filter(
+        session = await db.scalar(select(WhatsAppSession).where(
             WhatsAppSession.user_id == user_id
-        ).first()
+        ).limit(1))
 
         if session:
             session.auth_status = "qr_ready"
-            db.commit()
+            await db.commit()
 
         # Forward to WebSocket
         await websocket_manager.send_to_user(user_id, {
@@ -106,115 +407,162 @@ class RedisSubscriber:
             "qr": data.get("qr")
         })
 
-    async def handle_authenticated(self, db: Session, user_id: int, data: dict):
+    async def handle_authenticated(self, db: AsyncSession, user_id: int, data: dict):
         """Handle authenticated event"""
-        session = db.query(WhatsAppSession).filter(
+        session = await db.scalar(select(WhatsAppSession).where(
             WhatsAppSession.user_id == user_id
-        ).first()
+        ).limit(1))
 
         if session:
             session.auth_status = "authenticated"
-            db.commit()
+            await db.commit()
 
         await websocket_manager.send_to_user(user_id, {
             "type": "authenticated"
         })
 
-    async def handle_ready(self, db: Session, user_id: int, data: dict):
+    async def handle_ready(self, db: AsyncSession, user_id: int, data: dict):
         """Handle ready event"""
-        session = db.query(WhatsAppSession).filter(
+        session = await db.scalar(select(WhatsAppSession).where(
             WhatsAppSession.user_id == user_id
-        ).first()
+        ).limit(1))
 
         if session:
             session.auth_status = "ready"
             session.is_authenticated = True
             session.phone_number = data.get("phoneNumber")
             session.last_connected_at = datetime.utcnow()
-            db.commit()
+            await db.commit()
+            # The commit's ORM invalidation dropped the old number; we know the new one
+            with self._cache_lock:
+                self._phone_cache[user_id] = session.phone_number
 
         await websocket_manager.send_to_user(user_id, {
             "type": "ready",
             "phoneNumber": data.get("phoneNumber")
         })
 
-    async def handle_disconnected(self, db: Session, user_id: int, data: dict):
+    async def handle_disconnected(self, db: AsyncSession, user_id: int, data: dict):
         """Handle disconnected event"""
-        session = db.query(WhatsAppSession).filter(
+        session = await db.scalar(select(WhatsAppSession).where(
             WhatsAppSession.user_id == user_id
-        ).first()
+        ).limit(1))
 
         if session:
             session.auth_status = "disconnected"
             session.is_authenticated = False
-            db.commit()
+            await db.commit()
 
         await websocket_manager.send_to_user(user_id, {
             "type": "disconnected",
             "reason": data.get("reason")
         })
 
-    async def handle_new_message(self, db: Session, user_id: int, data: dict):
-        """Handle new message event"""
-        msg_data = data.get("message", {})
-        group_id_wa = msg_data.get("groupId")
+    async def handle_new_messages(self, db: AsyncSession, events: list):
+        """
+        Handle a batch of new message events: store every new message and its
+        sender rollup in one transaction, then forward them in arrival order
+        """
+        # At most one query for every monitored group the batch touches
+        groups = await self.monitored_groups(
+            db, {(data["userId"], data.get("message", {}).get("groupId")) for data in events}
+        )
 
-        print(f"[REDIS] New message for user {user_id} in group {group_id_wa}")
+        rows = {}  # message id -> (row, group, msg_data), in arrival order
+        for data in events:
+            user_id = data["userId"]
+            msg_data = data.get("message", {})
+            group_id_wa = msg_data.get("groupId")
 
-        # Find monitored group
-        group = db.query(MonitoredGroup).filter(
-            MonitoredGroup.user_id == user_id,
-            MonitoredGroup.whatsapp_group_id == group_id_wa,
-            MonitoredGroup.is_active == True
-        ).first()
+            logger.debug("New message for user %s in group %s", user_id, group_id_wa)
 
-        if not group:
-            print(f"[REDIS] Group {group_id_wa} not monitored by user {user_id}")
-            return  # Not monitoring this group
+            group = groups.get((user_id, group_id_wa))
+            if not group:
+                logger.debug("Group %s not monitored by user %s", group_id_wa, user_id)
+                continue  # Not monitoring this group
 
-        print(f"[REDIS] Group found: {group.group_name} (id: {group.id})")
+            # Create message record
+            row = {
+                "id": msg_data.get("id"),
+                "user_id": user_id,
+                "group_id": group.id,
+                "whatsapp_group_id": group_id_wa,
+                "group_name": msg_data.get("groupName", group.group_name),
+                "sender_id": msg_data.get("senderId"),
+                "sender_name": msg_data.get("senderName", "Unknown"),
+                "sender_phone": msg_data.get("senderPhone", ""),
+                "content": msg_data.get("content", ""),
+                "message_type": msg_data.get("messageType", "text"),
+                "timestamp": event_time(msg_data.get("timestamp"))
+            }
+            rows.setdefault(row["id"], (row, group, msg_data))
 
-        # Check if message already exists
-        existing = db.query(Message).filter(Message.id == msg_data.get("id")).first()
-        if existing:
+        if not rows:
             return
 
-        # Create message record
-        message = Message(
-            id=msg_data.get("id"),
-            user_id=user_id,
-            group_id=group.id,
-            whatsapp_group_id=group_id_wa,
-            group_name=msg_data.get("groupName", group.group_name),
-            sender_id=msg_data.get("senderId"),
-            sender_name=msg_data.get("senderName", "Unknown"),
-            sender_phone=msg_data.get("senderPhone", ""),
-            content=msg_data.get("content", ""),
-            message_type=msg_data.get("messageType", "text"),
-            timestamp=datetime.fromtimestamp(msg_data.get("timestamp", datetime.utcnow().timestamp()))
-        )
-        db.add(message)
-        db.commit()
+        try:
+            # The database drops messages it already has; RETURNING says which were new
+            inserted = set((await db.scalars(
+                pg_insert(Message)
+                .values([row for row, _, _ in rows.values()])
+                .on_conflict_do_nothing(index_elements=["id"])
+                .returning(Message.id)
+            )).all())
+            stored = [entry for msg_id, entry in rows.items() if msg_id in inserted]
+            if not stored:
+                return
 
-        # Forward to WebSocket
-        print(f"[REDIS] Sending message to WebSocket for user {user_id}")
-        await websocket_manager.send_to_user(user_id, {
-            "type": "new_message",
-            "message": {
-                "id": message.id,
-                "group_name": message.group_name,
-                "sender_name": message.sender_name,
-                "sender_phone": message.sender_phone,
-                "content": message.content,
-                "timestamp": message.timestamp.isoformat()
-            }
-        })
-        print(f"[REDIS] Message sent to WebSocket")
+            # Sum the batch per rollup row; one upsert may touch each row only once
+            rollups = {}
+            for row, _, _ in stored:
+                key = (row["user_id"], row["group_id"], row["sender_phone"] or "", row["timestamp"].date())
+                count = rollups[key]["message_count"] + 1 if key in rollups else 1
+                rollups[key] = {
+                    "user_id": key[0],
+                    "group_id": key[1],
+                    "sender_phone": key[2],
+                    "day": key[3],
+                    "sender_name": row["sender_name"],
+                    "message_count": count
+                }
+
+            # Bump the per-day sender rollup used by top-senders stats
+            rollup = pg_insert(MessageDailySender).values(list(rollups.values()))
+            await db.execute(rollup.on_conflict_do_update(
+                index_elements=["user_id", "group_id", "sender_phone", "day"],
+                set_={
+                    "message_count": MessageDailySender.message_count + rollup.excluded.message_count,
+                    "sender_name": rollup.excluded.sender_name
+                }
+            ))
+            await db.commit()
+        except IntegrityError:
+            # e.g. a group deleted mid-batch; retry one by one so only its messages are dropped
+            await db.rollback()
+            if len(events) == 1:
+                return
+            for data in events:
+                await self.handle_new_messages(db, [data])
+            return
 
-        # Check if user is mentioned and should trigger agent response
-        await self.check_agent_mention(db, user_id, group, msg_data)
+        for row, group, msg_data in stored:
+            # Forward to WebSocket
+            await websocket_manager.send_to_user(row["user_id"], {
+                "type": "new_message",
+                "message": {
+                    "id": row["id"],
+                    "group_name": row["group_name"],
+                    "sender_name": row["sender_name"],
+                    "sender_phone": row["sender_phone"],
+                    "content": row["content"],
+                    "timestamp": row["timestamp"].isoformat()
+                }
+            })
+
+            # Check if user is mentioned and should trigger agent response
+            await self.check_agent_mention(db, row["user_id"], group, msg_data)
 
-    async def check_agent_mention(self, db: Session, user_id: int, group: MonitoredGroup, msg_data: dict):
+    async def check_agent_mention(self, db: AsyncSession, user_id: int, group: GroupSnapshot, msg_data: dict):
         """Check if the user is mentioned and trigger agent response if applicable"""
         try:
             content = msg_data.get("content", "")
@@ -222,16 +570,11 @@ class RedisSubscriber:
             mentioned_phones = msg_data.get("mentionedPhones", [])
 
             # Get user's phone number from WhatsApp session
-            session = db.query(WhatsAppSession).filter(
-                WhatsAppSession.user_id == user_id
-            ).first()
-
-            if not session or not session.phone_number:
+            user_phone = await self.user_phone(db, user_id)
+            if not user_phone:
                 return
 
-            user_phone = session.phone_number
-
-            print(f"[AGENT] Checking mentions - user phone: {user_phone}, mentioned phones: {mentioned_phones}")
+            logger.debug("Checking mentions - user phone: %s, mentioned phones: %s", user_phone, mentioned_phones)
 
             # Check if user is mentioned in the message
             # The mentionedPhones list contains phone numbers of all mentioned contacts
@@ -242,37 +585,28 @@ class RedisSubscriber:
                 is_mentioned = user_phone in content
 
             if not is_mentioned:
-                print(f"[AGENT] User {user_id} NOT mentioned in this message")
+                logger.debug("User %s not mentioned in this message", user_id)
                 return
 
-            print(f"[AGENT] User {user_id} mentioned in {group.group_name}")
+            logger.info("User %s mentioned in %s", user_id, group.group_name)
 
-            # Get active agent for this user
-            agent = db.query(Agent).filter(
+            # Get active agent for this user that is enabled for this group
+            agent = await db.scalar(select(Agent).where(
                 Agent.user_id == user_id,
-                Agent.is_active == True
-            ).first()
+                Agent.is_active == True,
+                Agent.enabled_groups.any(AgentEnabledGroup.group_id == group.id)
+            ).limit(1))
 
             if not agent:
-                print(f"[AGENT] No active agent for user {user_id}")
+                logger.info("No active agent enabled for user %s in %s", user_id, group.group_name)
                 return
 
-            # Check if agent is enabled for this group
-            enabled_groups = agent.enabled_group_ids or []
-            if group.id not in enabled_groups:
-                print(f"[AGENT] Agent not enabled for group {group.group_name}")
-                return
-
-            print(f"[AGENT] Generating response using agent '{agent.name}'")
+            logger.info("Generating response using agent '%s'", agent.name)
 
             # Remove the mention from the message to get the actual question
             # The content now contains processed mentions like "@Name (phone)"
-            import re
-            clean_message = content
-
             # Remove mentions that contain the user's phone number (e.g., "@Name (1234567890)")
-            pattern = rf'@[^@\n]+\({user_phone}\)'
-            clean_message = re.sub(pattern, '', clean_message).strip()
+            clean_message = mention_pattern(user_phone).sub('', content).strip()
 
             # Also try to remove plain phone number mentions as fallback
             clean_message = clean_message.replace(f"@{user_phone}", "").strip()
@@ -281,16 +615,26 @@ class RedisSubscriber:
             if not clean_message:
                 clean_message = "Hello"
 
-            # Generate response using the agent
-            response_text = await agent_service.generate_response(
-                agent=agent,
-                user_message=clean_message,
-                sender_name=sender_name,
-                group_name=group.group_name
-            )
+            # The LLM call and send take seconds; reply in the background
+            self._spawn(self.reply_as_agent(agent, user_id, group, clean_message, sender_name))
+
+        except Exception as e:
+            logger.error("Error in check_agent_mention: %s", e)
+
+    async def reply_as_agent(self, agent: Agent, user_id: int, group: GroupSnapshot, clean_message: str, sender_name: str):
+        """Generate the agent's reply and send it to the group"""
+        try:
+            async with self._agent_slots:
+                # Generate response using the agent
+                response_text = await agent_service.generate_response(
+                    agent=agent,
+                    user_message=clean_message,
+                    sender_name=sender_name,
+                    group_name=group.group_name
+                )
 
             if response_text:
-                print(f"[AGENT] Got response: {response_text[:100]}...")
+                logger.debug("Got agent response: %.100s...", response_text)
 
                 # Send the response to the group
                 result = await whatsapp_bridge.send_message(
@@ -300,7 +644,7 @@ class RedisSubscriber:
                 )
 
                 if result.get("success"):
-                    print(f"[AGENT] Response sent successfully to {group.group_name}")
+                    logger.info("Agent response sent to %s", group.group_name)
 
                     # Notify via WebSocket
                     await websocket_manager.send_to_user(user_id, {
@@ -310,24 +654,20 @@ class RedisSubscriber:
                         "response": response_text[:200] + "..." if len(response_text) > 200 else response_text
                     })
                 else:
-                    print(f"[AGENT] Failed to send response: {result.get('error')}")
+                    logger.warning("Failed to send agent response: %s", result.get('error'))
             else:
-                print(f"[AGENT] No response generated")
+                logger.warning("No agent response generated")
 
         except Exception as e:
-            print(f"[AGENT] Error in check_agent_mention: {e}")
+            logger.error("Error in reply_as_agent: %s", e)
 
-    async def handle_member_event(self, db: Session, user_id: int, data: dict, event_type: str):
+    async def handle_member_event(self, db: AsyncSession, user_id: int, data: dict, event_type: str):
         """Handle member join/leave event"""
         event_data = data.get("event", {})
         group_id_wa = event_data.get("groupId")
 
         # Find monitored group
-        group = db.query(MonitoredGroup).filter(
-            MonitoredGroup.user_id == user_id,
-            MonitoredGroup.whatsapp_group_id == group_id_wa,
-            MonitoredGroup.is_active == True
-        ).first()
+        group = await self.monitored_group(db, user_id, group_id_wa)
 
         if not group:
             return  # Not monitoring this group
@@ -342,11 +682,11 @@ class RedisSubscriber:
             member_name=event_data.get("memberName", "Unknown"),
             member_phone=event_data.get("memberPhone"),
             event_type=event_type,
-            event_date=date.today(),
-            timestamp=datetime.fromtimestamp(event_data.get("timestamp", datetime.utcnow().timestamp()))
+            event_date=current_date(),
+            timestamp=event_time(event_data.get("timestamp"))
         )
         db.add(event)
-        db.commit()
+        await db.commit()
 
         # Forward to WebSocket
         await websocket_manager.send_to_user(user_id, {
@@ -364,79 +704,51 @@ class RedisSubscriber:
         })
 
         # Handle welcome message for JOIN events
-        if event_type == "JOIN" and group.welcome_enabled:
-            await self.process_welcome_message(db, user_id, group, event_data)
+        if event_type == "JOIN":
+            # Welcome state is writable and changes with every join, so read the row itself
+            group_row = await db.get(MonitoredGroup, group.id)
+            if group_row and group_row.welcome_enabled:
+                await self.process_welcome_message(db, user_id, group_row, event_data)
 
-    async def process_welcome_message(self, db: Session, user_id: int, group: MonitoredGroup, event_data: dict):
+    async def process_welcome_message(self, db: AsyncSession, user_id: int, group: MonitoredGroup, event_data: dict):
         """Process welcome message logic when a member joins"""
         member_phone = event_data.get("memberPhone", "")
 
         if not member_phone:
-            print(f"[WELCOME] No phone number for joiner, skipping")
+            logger.debug("No phone number for joiner, skipping welcome")
             return
 
-        # IMPORTANT: Refresh group from DB to get latest state (prevents race conditions)
-        db.refresh(group)
-
-        # Get current pending joiners list (create a NEW list to ensure mutation detection)
-        existing_joiners = group.welcome_pending_joiners or []
-        if not isinstance(existing_joiners, list):
-            existing_joiners = []
-
-        # Create a new list (important for SQLAlchemy JSON mutation detection)
-        pending_joiners = list(existing_joiners)
-
-        # Add this joiner to pending list if not already there
-        if member_phone not in pending_joiners:
-            pending_joiners.append(member_phone)
-
-        # Increment join count
-        current_count = (group.welcome_join_count or 0) + 1
-        threshold = group.welcome_threshold or 1
-
-        print(f"[WELCOME] Group {group.group_name}: join count {current_count}/{threshold}, pending: {pending_joiners}")
+        # Count the join and record the joiner in one atomic UPDATE; when the threshold
+        # is met the same statement resets the counter, so concurrent joins never
+        # double-send or drop a joiner
+        row = (await db.execute(WELCOME_JOIN_SQL, {"group_id": group.id, "phone": member_phone})).one_or_none()
+        await db.commit()
+        if row is None:
+            return
 
-        # Update group with new count and pending joiners
-        group.welcome_join_count = current_count
-        group.welcome_pending_joiners = pending_joiners
-        # Flag the JSON field as modified (SQLAlchemy sometimes doesn't detect list changes)
-        flag_modified(group, 'welcome_pending_joiners')
-        db.commit()
+        current_count, threshold, pending_joiners = row
+        logger.info("Welcome for %s: join count %s/%s, pending: %s", group.group_name, current_count, threshold, pending_joiners)
 
         # Check if threshold is met
         if current_count >= threshold:
-            print(f"[WELCOME] Threshold met for {group.group_name}, sending welcome message")
-            # Pass a copy of the list before resetting
-            joiners_to_mention = list(pending_joiners)
+            logger.info("Welcome threshold met for %s, sending welcome message", group.group_name)
+            self._spawn(self.send_welcome_message(user_id, group, list(pending_joiners)))
 
-            # Reset counter and pending joiners FIRST (in case send takes time)
-            group.welcome_join_count = 0
-            group.welcome_pending_joiners = []
-            flag_modified(group, 'welcome_pending_joiners')
-            db.commit()
-
-            await self.send_welcome_message(db, user_id, group, joiners_to_mention)
-
-    async def send_welcome_message(self, db: Session, user_id: int, group: MonitoredGroup, joiner_phones: list):
+    async def send_welcome_message(self, user_id: int, group: MonitoredGroup, joiner_phones: list):
         """Send the welcome message with mentions"""
         try:
             # Get extra mention phones from group settings (configurable)
             extra_mention_phones = group.welcome_extra_mentions or []
 
-            # Remove duplicates from joiner phones while preserving order
-            seen = set()
-            unique_joiner_phones = []
-            for phone in joiner_phones:
-                if phone and phone not in seen:
-                    seen.add(phone)
-                    unique_joiner_phones.append(phone)
+            # Remove duplicates from joiner phones while preserving order, and
+            # drop any that are already extra mentions
+            extras = set(extra_mention_phones)
+            unique_joiner_phones = [
+                phone for phone in dict.fromkeys(joiner_phones)
+                if phone and phone not in extras
+            ]
 
-            # Remove extra mentions from joiners if present
-            for extra_phone in extra_mention_phones:
-                if extra_phone in unique_joiner_phones:
-                    unique_joiner_phones.remove(extra_phone)
-
-            print(f"[WELCOME] Sending Part 1 to {group.group_name} with joiner mentions: {unique_joiner_phones}, extra mentions: {extra_mention_phones}")
+            logger.info("Sending welcome part 1 to %s with joiner mentions: %s, extra mentions: %s", group.group_name, unique_joiner_phones, extra_mention_phones)
 
             # Part 1: Joiner Mentions + Text + Extra Mentions
             welcome_text = group.welcome_text or "Welcome!"
@@ -450,13 +762,13 @@ class RedisSubscriber:
             )
 
             if result.get('success'):
-                print(f"[WELCOME] Part 1 sent successfully to {group.group_name}")
+                logger.info("Welcome part 1 sent to %s", group.group_name)
             else:
-                print(f"[WELCOME] Part 1 failed for {group.group_name}: {result.get('error')}")
+                logger.warning("Welcome part 1 failed for %s: %s", group.group_name, result.get('error'))
 
             # Part 2: Optional Text + Image
             if group.welcome_part2_enabled:
-                print(f"[WELCOME] Sending Part 2 to {group.group_name}")
+                logger.info("Sending welcome part 2 to %s", group.group_name)
 
                 if group.welcome_part2_image:
                     # Send image with optional caption
@@ -477,9 +789,9 @@ class RedisSubscriber:
                     result2 = {'success': True}  # Nothing to send for Part 2
 
                 if result2.get('success'):
-                    print(f"[WELCOME] Part 2 sent successfully to {group.group_name}")
+                    logger.info("Welcome part 2 sent to %s", group.group_name)
                 else:
-                    print(f"[WELCOME] Part 2 failed for {group.group_name}: {result2.get('error')}")
+                    logger.warning("Welcome part 2 failed for %s: %s", group.group_name, result2.get('error'))
 
             # Notify via WebSocket
             await websocket_manager.send_to_user(user_id, {
@@ -490,36 +802,32 @@ class RedisSubscriber:
             })
 
         except Exception as e:
-            print(f"[WELCOME] Error sending welcome message: {e}")
+            logger.error("Error sending welcome message: %s", e)
 
-    async def handle_certificate_event(self, db: Session, user_id: int, data: dict):
+    async def handle_certificate_event(self, db: AsyncSession, user_id: int, data: dict):
         """Handle certificate event (voice message) with deduplication"""
         event_data = data.get("event", {})
         group_id_wa = event_data.get("groupId")
         member_phone = event_data.get("memberPhone", "")
 
         # Find monitored group
-        group = db.query(MonitoredGroup).filter(
-            MonitoredGroup.user_id == user_id,
-            MonitoredGroup.whatsapp_group_id == group_id_wa,
-            MonitoredGroup.is_active == True
-        ).first()
+        group = await self.monitored_group(db, user_id, group_id_wa)
 
         if not group:
             return  # Not monitoring this group
 
         # Deduplication: Check if certificate already exists for this member today in this group
-        today = date.today()
-        existing = db.query(Event).filter(
+        today = current_date()
+        existing = await db.scalar(select(Event).where(
             Event.user_id == user_id,
             Event.group_id == group.id,
             Event.member_phone == member_phone,
             Event.event_type == "CERTIFICATE",
             Event.event_date == today
-        ).first()
+        ).limit(1))
 
         if existing:
-            print(f"[CERTIFICATE] Already recorded for {member_phone} today in {group.group_name}")
+            logger.debug("Certificate already recorded for %s today in %s", member_phone, group.group_name)
             return  # Already has certificate for today
 
         # Create certificate event record
@@ -533,12 +841,12 @@ class RedisSubscriber:
             member_phone=member_phone,
             event_type="CERTIFICATE",
             event_date=today,
-            timestamp=datetime.fromtimestamp(event_data.get("timestamp", datetime.utcnow().timestamp()))
+            timestamp=event_time(event_data.get("timestamp"))
         )
         db.add(event)
-        db.commit()
+        await db.commit()
 
-        print(f"[CERTIFICATE] Recorded for {event.member_name} ({member_phone}) in {group.group_name}")
+        logger.info("Certificate recorded for %s (%s) in %s", event.member_name, member_phone, group.group_name)
 
         # Forward to WebSocket
         await websocket_manager.send_to_user(user_id, {
@@ -558,3 +866,17 @@ class RedisSubscriber:
 
 # Singleton instance
 redis_subscriber = RedisSubscriber()
+
+
+@event.listens_for(MonitoredGroup, 'after_insert')
+@event.listens_for(MonitoredGroup, 'after_update')
+@event.listens_for(MonitoredGroup, 'after_delete')
+def _invalidate_monitored_group(mapper, connection, target):
+    redis_subscriber.invalidate_group(target.user_id, target.whatsapp_group_id)
+
+
+@event.listens_for(WhatsAppSession, 'after_insert')
+@event.listens_for(WhatsAppSession, 'after_update')
+@event.listens_for(WhatsAppSession, 'after_delete')
+def _invalidate_user_phone(mapper, connection, target):
+    redis_subscriber.invalidate_phone(target.user_id)
@@ -1,6 +1,26 @@
-from typing import Dict, List, Set
+from typing import Dict, List, Optional, Set
 from fastapi import WebSocket
-import json
+import asyncio
+import orjson
+
+# Logical channel for each outbound message type; anything else is a broadcast/task update
+CHANNEL_BY_TYPE = {
+    "qr": "whatsapp",
+    "authenticated": "whatsapp",
+    "ready": "whatsapp",
+    "disconnected": "whatsapp",
+    "new_message": "messages",
+    "member_join": "events",
+    "member_leave": "events",
+    "certificate": "events",
+    "welcome_sent": "events",
+    "agent_response": "agent",
+}
+DEFAULT_CHANNEL = "broadcast"
+
+# Frames buffered per connection before a slow client is dropped; well above
+# the stream consumer's batch size, which is forwarded to a user in one burst
+OUTBOX_SIZE = 256
 
 
 class WebSocketManager:
@@ -9,6 +29,12 @@ class WebSocketManager:
     def __init__(self):
         # Map user_id to set of active connections
         self.active_connections: Dict[int, Set[WebSocket]] = {}
+        # Channels each connection subscribed to (None = all channels)
+        self.subscriptions: Dict[WebSocket, Optional[Set[str]]] = {}
+        # Per-connection outbound queue and the task relaying it to the socket,
+        # so one slow client never blocks sends to anyone else
+        self.outboxes: Dict[WebSocket, asyncio.Queue] = {}
+        self.relays: Dict[WebSocket, asyncio.Task] = {}
 
     async def connect(self, websocket: WebSocket, user_id: int):
         """Accept a new WebSocket connection"""
@@ -16,32 +42,108 @@ class WebSocketManager:
         if user_id not in self.active_connections:
             self.active_connections[user_id] = set()
         self.active_connections[user_id].add(websocket)
+        self.subscriptions[websocket] = None
+
+        outbox = asyncio.Queue(maxsize=OUTBOX_SIZE)
+        self.outboxes[websocket] = outbox
+        self.relays[websocket] = asyncio.create_task(self._relay(websocket, user_id, outbox))
 
     def disconnect(self, websocket: WebSocket, user_id: int):
         """Remove a WebSocket connection"""
+        self.subscriptions.pop(websocket, None)
+        self.outboxes.pop(websocket, None)
+        relay = self.relays.pop(websocket, None)
+        if relay and relay is not asyncio.current_task():
+            relay.cancel()
         if user_id in self.active_connections:
             self.active_connections[user_id].discard(websocket)
             if not self.active_connections[user_id]:
                 del self.active_connections[user_id]
 
-    async def send_to_user(self, user_id: int, message: dict):
-        """Send a message to all connections for a specific user"""
+    async def _relay(self, websocket: WebSocket, user_id: int, outbox: asyncio.Queue):
+        """Drain a connection's outbox onto the socket"""
+        try:
+            while True:
+                payload = await outbox.get()
+                await websocket.send_bytes(payload)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            self.disconnect(websocket, user_id)
+
+    def _drop_slow_client(self, websocket: WebSocket, user_id: int):
+        """Disconnect a client whose outbox is full"""
+        self.disconnect(websocket, user_id)
+        asyncio.create_task(self._close_quietly(websocket))
+
+    @staticmethod
+    async def _close_quietly(websocket: WebSocket):
+        try:
+            await websocket.close(code=1013)  # Try again later
+        except Exception:
+            pass
+
+    def handle_frame(self, websocket: WebSocket, frame: dict):
+        """
+        Apply a client control frame: {"c": "<channel>", "op": "sub" | "unsub"}.
+        The first "sub" narrows the connection from all channels to the listed ones.
+        """
+        channel = frame.get("c")
+        op = frame.get("op")
+        if not channel or websocket not in self.subscriptions:
+            return
+
+        channels = self.subscriptions[websocket]
+        if op == "sub":
+            if channels is None:
+                channels = set()
+            channels.add(channel)
+        elif op == "unsub":
+            if channels is None:
+                channels = set(CHANNEL_BY_TYPE.values()) | {DEFAULT_CHANNEL}
+            channels.discard(channel)
+        self.subscriptions[websocket] = channels
+
+    def _is_subscribed(self, websocket: WebSocket, channel: str) -> bool:
+        channels = self.subscriptions.get(websocket)
+        return channels is None or channel in channels
+
+    def _send_payload(self, user_id: int, channel: str, payload: bytes):
+        """Queue an already-encoded frame for every subscribed connection of a user"""
+        for connection in list(self.active_connections.get(user_id, ())):
+            if not self._is_subscribed(connection, channel):
+                continue
+            outbox = self.outboxes.get(connection)
+            if outbox is None:
+                continue
+            try:
+                outbox.put_nowait(payload)
+            except asyncio.QueueFull:
+                self._drop_slow_client(connection, user_id)
+
+    @staticmethod
+    def _encode(message: dict):
+        """Tag a message with its channel and serialize it once with orjson"""
+        channel = CHANNEL_BY_TYPE.get(message.get("type"), DEFAULT_CHANNEL)
+        return channel, orjson.dumps({**message, "c": channel})
+
+    def send_to_user_nowait(self, user_id: int, message: dict):
+        """Queue a message for all of a user's connections without awaiting anything"""
         if user_id in self.active_connections:
-            disconnected = set()
-            for connection in self.active_connections[user_id]:
-                try:
-                    await connection.send_json(message)
-                except Exception:
-                    disconnected.add(connection)
+            channel, payload = self._encode(message)
+            self._send_payload(user_id, channel, payload)
 
-            # Clean up disconnected connections
-            for conn in disconnected:
-                self.active_connections[user_id].discard(conn)
+    async def send_to_user(self, user_id: int, message: dict):
+        """Send a message to all connections for a specific user"""
+        self.send_to_user_nowait(user_id, message)
+        # Let the relays drain before the caller queues its next frame
+        await asyncio.sleep(0)
 
     async def broadcast(self, message: dict):
         """Broadcast a message to all connected users"""
+        channel, payload = self._encode(message)
         for user_id in list(self.active_connections.keys()):
-            await self.send_to_user(user_id, message)
+            self._send_payload(user_id, channel, payload)
 
     def get_connected_users(self) -> List[int]:
         """Get list of connected user IDs"""
@@ -1,92 +1,263 @@
+import asyncio
+import functools
 import httpx
-import json
+import orjson
 import os
-from typing import Optional, List, Dict, Any
+import uuid
+from time import monotonic
+from cachetools import LRUCache, TTLCache
+from typing import AsyncIterator, Optional, List, Dict, Any, Tuple
 from app.config import settings
 
+# Error for calls the WhatsApp service didn't answer in time (its operation queue is busy)
+TIMED_OUT = "Request timed out - WhatsApp service is busy"
+TIMED_OUT_RETRY = TIMED_OUT + ". Please try again."
+# Error returned without calling the service while the circuit breaker is open
+SERVICE_UNAVAILABLE = "WhatsApp service unavailable - please try again shortly"
+# Consecutive connect failures that open the breaker, and for how long (seconds)
+BREAKER_THRESHOLD = 5
+BREAKER_COOLDOWN = 10.0
+# How long a successful group / member / channel listing is served from memory
+LISTING_CACHE_TTL = 20
+# Bytes read from disk per chunk when streaming a media upload
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+
+async def _file_chunks(path: str, head: bytes, tail: bytes) -> AsyncIterator[bytes]:
+    """Yield head, the file in UPLOAD_CHUNK_SIZE pieces read off the event loop, then tail"""
+    yield head
+    f = await asyncio.to_thread(open, path, 'rb')
+    try:
+        while chunk := await asyncio.to_thread(f.read, UPLOAD_CHUNK_SIZE):
+            yield chunk
+    finally:
+        await asyncio.to_thread(f.close)
+    yield tail
+
+
+def multipart_upload(file_path: str, fields: Optional[Dict[str, str]] = None) -> Tuple[Dict[str, str], AsyncIterator[bytes]]:
+    """
+    Headers and a streamed multipart/form-data body carrying `fields` plus the file
+    as the "media" part, so an upload never holds the whole file in memory
+    """
+    boundary = uuid.uuid4().hex
+    head = b"".join(
+        f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode()
+        for name, value in (fields or {}).items()
+    )
+    filename = os.path.basename(file_path).replace('"', "%22")
+    head += (
+        f'--{boundary}\r\nContent-Disposition: form-data; name="media"; filename="{filename}"\r\n'
+        f'Content-Type: application/octet-stream\r\n\r\n'
+    ).encode()
+    tail = f'\r\n--{boundary}--\r\n'.encode()
+    headers = {
+        "Content-Type": f"multipart/form-data; boundary={boundary}",
+        # Known up front, so the body goes out with a length instead of chunked
+        "Content-Length": str(len(head) + os.path.getsize(file_path) + len(tail)),
+    }
+    return headers, _file_chunks(file_path, head, tail)
+
+
+def bridge_call(default: Dict[str, Any], timeout_error: Optional[str] = None):
+    """
+    Turn transport errors from a bridge method into its error response: `default`
+    plus the error text, with `timeout_error` used for read timeouts when given.
+    While the circuit breaker is open the method fails fast without a request.
+    Only failures to connect count towards the breaker: a read timeout means the
+    service is up but one user's operation queue is busy.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        async def wrapper(self, *args, **kwargs):
+            if monotonic() < self._open_until:
+                return {**default, "error": SERVICE_UNAVAILABLE}
+            try:
+                result = await method(self, *args, **kwargs)
+            except httpx.ReadTimeout as e:
+                self._failures = 0
+                return {**default, "error": timeout_error or str(e)}
+            except (httpx.ConnectError, httpx.ConnectTimeout) as e:
+                self._record_failure()
+                return {**default, "error": str(e)}
+            except httpx.RequestError as e:
+                self._failures = 0
+                return {**default, "error": str(e)}
+            self._failures = 0
+            return result
+        return wrapper
+    return decorator
+
+
+def coalesced(method):
+    """
+    Share one in-flight request between concurrent identical calls of a read-only
+    bridge method: later callers await the first call's task instead of issuing
+    their own HTTP request.
+    """
+    @functools.wraps(method)
+    async def wrapper(self, *args):
+        key = (method.__name__, *args)
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(method(self, *args))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # Shielded so one caller being cancelled doesn't cancel it for the others
+        return await asyncio.shield(task)
+    return wrapper
+
+
+def cached_listing(method):
+    """
+    Serve successful listings from a short-lived per-(method, user, *args) cache;
+    the WhatsApp Web queue behind them is slow and UIs re-request the same list
+    """
+    @functools.wraps(method)
+    async def wrapper(self, user_id: int, *args):
+        key = (method.__name__, user_id, *args)
+        result = self._listings.get(key)
+        if result is None:
+            result = await method(self, user_id, *args)
+            if result.get("success") is True:
+                self._listings[key] = result
+        return result
+    return wrapper
+
 
 class WhatsAppBridge:
     """Bridge to communicate with Node.js WhatsApp service"""
 
     def __init__(self):
         self.base_url = settings.whatsapp_service_url
+        # Shared keep-alive pool to the Node.js service, opened in the app lifespan.
+        # HTTP/2 is negotiated via ALPN when the service is reached over https
+        # (e.g. through the platform's proxy), multiplexing concurrent calls on one
+        # connection; plain-http URLs stay on HTTP/1.1 keep-alive.
+        self.client: Optional[httpx.AsyncClient] = None
+        # (method name, *args) -> task of the in-flight read, see coalesced()
+        self._inflight: Dict[Tuple, asyncio.Task] = {}
+        # (method name, user_id, *args) -> successful listing, see cached_listing()
+        self._listings: TTLCache = TTLCache(maxsize=1024, ttl=LISTING_CACHE_TTL)
+        # path -> (ETag, decoded body) of the last full listing, for conditional GETs
+        self._etags: LRUCache = LRUCache(maxsize=1024)
+        # Circuit breaker: consecutive connect failures, and until when calls
+        # fail fast. Once the cooldown passes the next call goes through as a probe.
+        self._failures = 0
+        self._open_until = 0.0
+
+    def open(self) -> httpx.AsyncClient:
+        """Create the shared HTTP client if it doesn't exist yet"""
+        if self.client is None:
+            self.client = httpx.AsyncClient(
+                http2=True,
+                base_url=self.base_url,
+                limits=httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=30.0),
+                timeout=httpx.Timeout(10.0, read=120.0)
+            )
+        return self.client
+
+    async def _get_listing(self, path: str, timeout: float) -> Dict[str, Any]:
+        """
+        GET a listing, revalidating the last copy with If-None-Match; Express tags
+        JSON responses with an ETag and answers 304 when the body is unchanged
+        """
+        cached = self._etags.get(path)
+        headers = {"If-None-Match": cached[0]} if cached else None
+        response = await self.open().get(path, headers=headers, timeout=timeout)
+        if response.status_code == 304 and cached:
+            return cached[1]
+        result = orjson.loads(response.content)
+        etag = response.headers.get("ETag")
+        if etag and result.get("success") is True:
+            self._etags[path] = (etag, result)
+        return result
 
+    def _record_failure(self):
+        """Count a connect failure, opening the breaker at BREAKER_THRESHOLD"""
+        self._failures += 1
+        if self._failures >= BREAKER_THRESHOLD:
+            self._open_until = monotonic() + BREAKER_COOLDOWN
+
+    def unavailable_for(self) -> float:
+        """Seconds until the circuit breaker lets calls through again (0 while closed)"""
+        return max(0.0, self._open_until - monotonic())
+
+    def invalidate(self, user_id: int):
+        """Drop a user's cached listings after anything that changes them"""
+        for key in [key for key in self._listings.keys() if key[1] == user_id]:
+            self._listings.pop(key, None)
+
+    async def close(self):
+        """Close the shared HTTP client"""
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+
+    @bridge_call({"success": False, "status": "error"})
     async def init_client(self, user_id: int) -> Dict[str, Any]:
         """Initialize WhatsApp client for a user"""
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.post(
-                    f"{self.base_url}/api/clients/{user_id}/init",
-                    timeout=30.0
-                )
-                return response.json()
-            except httpx.RequestError as e:
-                return {"success": False, "error": str(e), "status": "error"}
+        client = self.open()
+        response = await client.post(
+            f"/api/clients/{user_id}/init",
+            timeout=30.0
+        )
+        return orjson.loads(response.content)
 
+    @coalesced
+    @bridge_call({"status": "not_initialized", "hasQR": False})
     async def get_status(self, user_id: int) -> Dict[str, Any]:
         """Get WhatsApp client status"""
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(
-                    f"{self.base_url}/api/clients/{user_id}/status",
-                    timeout=10.0
-                )
-                return response.json()
-            except httpx.RequestError as e:
-                return {"status": "not_initialized", "hasQR": False, "error": str(e)}
+        client = self.open()
+        response = await client.get(
+            f"/api/clients/{user_id}/status",
+            timeout=10.0
+        )
+        return orjson.loads(response.content)
 
+    @coalesced
+    @bridge_call({"qr": None, "status": "error", "hasQR": False})
     async def get_qr_code(self, user_id: int) -> Dict[str, Any]:
         """Get current QR code for user"""
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(
-                    f"{self.base_url}/api/clients/{user_id}/qr",
-                    timeout=10.0
-                )
-                return response.json()
-            except httpx.RequestError as e:
-                return {"qr": None, "status": "error", "hasQR": False, "error": str(e)}
+        client = self.open()
+        response = await client.get(
+            f"/api/clients/{user_id}/qr",
+            timeout=10.0
+        )
+        return orjson.loads(response.content)
 
+    @cached_listing
+    @coalesced
+    @bridge_call({"success": False, "groups": []}, timeout_error=TIMED_OUT_RETRY)
     async def get_groups(self, user_id: int) -> Dict[str, Any]:
         """Get all WhatsApp groups for user"""
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(
-                    f"{self.base_url}/api/clients/{user_id}/groups",
-                    timeout=120.0  # Increased timeout - groups fetch can take a while with operation queue
-                )
-                return response.json()
-            except httpx.ReadTimeout:
-                return {"success": False, "groups": [], "error": "Request timed out - WhatsApp service is busy. Please try again."}
-            except httpx.RequestError as e:
-                return {"success": False, "groups": [], "error": str(e)}
+        return await self._get_listing(
+            f"/api/clients/{user_id}/groups",
+            timeout=120.0  # Increased timeout - groups fetch can take a while with operation queue
+        )
 
+    @bridge_call({"success": False})
     async def logout_client(self, user_id: int) -> Dict[str, Any]:
         """Logout and destroy WhatsApp client"""
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.post(
-                    f"{self.base_url}/api/clients/{user_id}/logout",
-                    timeout=30.0
-                )
-                return response.json()
-            except httpx.RequestError as e:
-                return {"success": False, "error": str(e)}
+        self.invalidate(user_id)
+        client = self.open()
+        response = await client.post(
+            f"/api/clients/{user_id}/logout",
+            timeout=30.0
+        )
+        return orjson.loads(response.content)
 
+    @cached_listing
+    @coalesced
+    @bridge_call({"success": False, "members": []}, timeout_error=TIMED_OUT_RETRY)
     async def get_group_members(self, user_id: int, group_id: str) -> Dict[str, Any]:
         """Get members of a specific group"""
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(
-                    f"{self.base_url}/api/clients/{user_id}/groups/{group_id}/members",
-                    timeout=120.0  # Increased timeout for operation queue
-                )
-                return response.json()
-            except httpx.ReadTimeout:
-                return {"success": False, "members": [], "error": "Request timed out - WhatsApp service is busy. Please try again."}
-            except httpx.RequestError as e:
-                return {"success": False, "members": [], "error": str(e)}
+        return await self._get_listing(
+            f"/api/clients/{user_id}/groups/{group_id}/members",
+            timeout=120.0  # Increased timeout for operation queue
+        )
 
+    @bridge_call({"success": False}, timeout_error=TIMED_OUT)
     async def send_message(
         self,
         user_id: int,
@@ -96,23 +267,19 @@ class WhatsAppBridge:
         mention_ids: Optional[List[str]] = None
     ) -> Dict[str, Any]:
         """Send a message to a group with optional mentions"""
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.post(
-                    f"{self.base_url}/api/clients/{user_id}/groups/{group_id}/send",
-                    json={
-                        "content": content,
-                        "mentionAll": mention_all,
-                        "mentionIds": mention_ids or []
-                    },
-                    timeout=60.0  # Longer timeout for sending
-                )
-                return response.json()
-            except httpx.ReadTimeout:
-                return {"success": False, "error": "Request timed out - WhatsApp service is busy"}
-            except httpx.RequestError as e:
-                return {"success": False, "error": str(e)}
+        client = self.open()
+        response = await client.post(
+            f"/api/clients/{user_id}/groups/{group_id}/send",
+            json={
+                "content": content,
+                "mentionAll": mention_all,
+                "mentionIds": mention_ids or []
+            },
+            timeout=60.0  # Longer timeout for sending
+        )
+        return orjson.loads(response.content)
 
+    @bridge_call({"success": False})
     async def send_media_message(
         self,
         user_id: int,
@@ -123,28 +290,23 @@ class WhatsAppBridge:
         mention_ids: Optional[List[str]] = None
     ) -> Dict[str, Any]:
         """Send a media message to a group with optional caption and mentions"""
-        async with httpx.AsyncClient() as client:
-            try:
-                # Prepare the file upload
-                filename = os.path.basename(file_path)
-                with open(file_path, 'rb') as f:
-                    files = {'media': (filename, f, 'application/octet-stream')}
-                    data = {
-                        'caption': caption,
-                        'mentionAll': str(mention_all).lower(),
-                        'mentionIds': json.dumps(mention_ids or [])
-                    }
-
-                    response = await client.post(
-                        f"{self.base_url}/api/clients/{user_id}/groups/{group_id}/send-media",
-                        files=files,
-                        data=data,
-                        timeout=120.0  # Longer timeout for media uploads
-                    )
-                    return response.json()
-            except httpx.RequestError as e:
-                return {"success": False, "error": str(e)}
+        client = self.open()
+        # Stream the file upload (read off the event loop)
+        headers, body = multipart_upload(file_path, {
+            'caption': caption,
+            'mentionAll': 'true' if mention_all else 'false',
+            'mentionIds': orjson.dumps(mention_ids or []).decode()
+        })
 
+        response = await client.post(
+            f"/api/clients/{user_id}/groups/{group_id}/send-media",
+            content=body,
+            headers=headers,
+            timeout=120.0  # Longer timeout for media uploads
+        )
+        return orjson.loads(response.content)
+
+    @bridge_call({"success": False}, timeout_error=TIMED_OUT_RETRY)
     async def set_group_admin_only(
         self,
         user_id: int,
@@ -152,19 +314,16 @@ class WhatsAppBridge:
         admin_only: bool
     ) -> Dict[str, Any]:
         """Set whether only admins can send messages in a group"""
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.post(
-                    f"{self.base_url}/api/clients/{user_id}/groups/{group_id}/settings",
-                    json={"messagesAdminOnly": admin_only},
-                    timeout=120.0  # Increased timeout for operation queue
-                )
-                return response.json()
-            except httpx.ReadTimeout:
-                return {"success": False, "error": "Request timed out - WhatsApp service is busy. Please try again."}
-            except httpx.RequestError as e:
-                return {"success": False, "error": str(e)}
+        self.invalidate(user_id)
+        client = self.open()
+        response = await client.post(
+            f"/api/clients/{user_id}/groups/{group_id}/settings",
+            json={"messagesAdminOnly": admin_only},
+            timeout=120.0  # Increased timeout for operation queue
+        )
+        return orjson.loads(response.content)
 
+    @bridge_call({"success": False})
     async def send_welcome_message(
         self,
         user_id: int,
@@ -174,21 +333,19 @@ class WhatsAppBridge:
         extra_mention_phones: Optional[List[str]] = None
     ) -> Dict[str, Any]:
         """Send a welcome message with clickable mentions by phone numbers"""
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.post(
-                    f"{self.base_url}/api/clients/{user_id}/groups/{group_id}/send-welcome",
-                    json={
-                        "content": content,
-                        "joinerPhones": joiner_phones,
-                        "extraMentionPhones": extra_mention_phones or []
-                    },
-                    timeout=60.0
-                )
-                return response.json()
-            except httpx.RequestError as e:
-                return {"success": False, "error": str(e)}
+        client = self.open()
+        response = await client.post(
+            f"/api/clients/{user_id}/groups/{group_id}/send-welcome",
+            json={
+                "content": content,
+                "joinerPhones": joiner_phones,
+                "extraMentionPhones": extra_mention_phones or []
+            },
+            timeout=60.0
+        )
+        return orjson.loads(response.content)
 
+    @bridge_call({"success": False}, timeout_error=TIMED_OUT)
     async def send_poll(
         self,
         user_id: int,
@@ -200,41 +357,34 @@ class WhatsAppBridge:
         mention_ids: Optional[List[str]] = None
     ) -> Dict[str, Any]:
         """Send a poll to a group with optional mentions"""
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.post(
-                    f"{self.base_url}/api/clients/{user_id}/groups/{group_id}/send-poll",
-                    json={
-                        "question": question,
-                        "options": options,
-                        "allowMultipleAnswers": allow_multiple_answers,
-                        "mentionAll": mention_all,
-                        "mentionIds": mention_ids or []
-                    },
-                    timeout=60.0
-                )
-                return response.json()
-            except httpx.ReadTimeout:
-                return {"success": False, "error": "Request timed out - WhatsApp service is busy"}
-            except httpx.RequestError as e:
-                return {"success": False, "error": str(e)}
+        client = self.open()
+        response = await client.post(
+            f"/api/clients/{user_id}/groups/{group_id}/send-poll",
+            json={
+                "question": question,
+                "options": options,
+                "allowMultipleAnswers": allow_multiple_answers,
+                "mentionAll": mention_all,
+                "mentionIds": mention_ids or []
+            },
+            timeout=60.0
+        )
+        return orjson.loads(response.content)
 
+    @bridge_call({"success": False})
     async def upload_media(self, file_path: str) -> Dict[str, Any]:
         """Upload media to WhatsApp service's persistent volume for scheduled broadcasts"""
-        async with httpx.AsyncClient() as client:
-            try:
-                filename = os.path.basename(file_path)
-                with open(file_path, 'rb') as f:
-                    files = {'media': (filename, f, 'application/octet-stream')}
-                    response = await client.post(
-                        f"{self.base_url}/api/clients/upload-media",
-                        files=files,
-                        timeout=120.0
-                    )
-                    return response.json()
-            except httpx.RequestError as e:
-                return {"success": False, "error": str(e)}
+        client = self.open()
+        headers, body = multipart_upload(file_path)
+        response = await client.post(
+            "/api/clients/upload-media",
+            content=body,
+            headers=headers,
+            timeout=120.0
+        )
+        return orjson.loads(response.content)
 
+    @bridge_call({"success": False}, timeout_error=TIMED_OUT)
     async def send_media_from_path(
         self,
         user_id: int,
@@ -245,66 +395,55 @@ class WhatsAppBridge:
         mention_ids: Optional[List[str]] = None
     ) -> Dict[str, Any]:
         """Send media from a stored path on WhatsApp service"""
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.post(
-                    f"{self.base_url}/api/clients/{user_id}/groups/{group_id}/send-media-from-path",
-                    json={
-                        "filePath": file_path,
-                        "caption": caption,
-                        "mentionAll": mention_all,
-                        "mentionIds": mention_ids or []
-                    },
-                    timeout=120.0
-                )
-                return response.json()
-            except httpx.ReadTimeout:
-                return {"success": False, "error": "Request timed out - WhatsApp service is busy"}
-            except httpx.RequestError as e:
-                return {"success": False, "error": str(e)}
+        client = self.open()
+        response = await client.post(
+            f"/api/clients/{user_id}/groups/{group_id}/send-media-from-path",
+            json={
+                "filePath": file_path,
+                "caption": caption,
+                "mentionAll": mention_all,
+                "mentionIds": mention_ids or []
+            },
+            timeout=120.0
+        )
+        return orjson.loads(response.content)
 
+    @bridge_call({"success": False})
     async def delete_media(self, file_path: str) -> Dict[str, Any]:
         """Delete media file from WhatsApp service after broadcast"""
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.request(
-                    "DELETE",
-                    f"{self.base_url}/api/clients/media",
-                    json={"filePath": file_path},
-                    timeout=30.0
-                )
-                return response.json()
-            except httpx.RequestError as e:
-                return {"success": False, "error": str(e)}
+        client = self.open()
+        response = await client.request(
+            "DELETE",
+            "/api/clients/media",
+            json={"filePath": file_path},
+            timeout=30.0
+        )
+        return orjson.loads(response.content)
 
+    @bridge_call({"success": False})
     async def delete_user_session(self, user_id: int) -> Dict[str, Any]:
         """Delete user session files from WhatsApp service (for user deletion)"""
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.delete(
-                    f"{self.base_url}/api/clients/{user_id}/session",
-                    timeout=30.0
-                )
-                return response.json()
-            except httpx.RequestError as e:
-                return {"success": False, "error": str(e)}
+        self.invalidate(user_id)
+        client = self.open()
+        response = await client.delete(
+            f"/api/clients/{user_id}/session",
+            timeout=30.0
+        )
+        return orjson.loads(response.content)
 
     # ==================== CHANNEL METHODS ====================
 
+    @cached_listing
+    @coalesced
+    @bridge_call({"success": False, "channels": []}, timeout_error=TIMED_OUT_RETRY)
     async def get_channels(self, user_id: int) -> Dict[str, Any]:
         """Get all WhatsApp channels for user"""
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(
-                    f"{self.base_url}/api/clients/{user_id}/channels",
-                    timeout=120.0
-                )
-                return response.json()
-            except httpx.ReadTimeout:
-                return {"success": False, "channels": [], "error": "Request timed out - WhatsApp service is busy. Please try again."}
-            except httpx.RequestError as e:
-                return {"success": False, "channels": [], "error": str(e)}
+        return await self._get_listing(
+            f"/api/clients/{user_id}/channels",
+            timeout=120.0
+        )
 
+    @bridge_call({"success": False})
     async def send_channel_message(
         self,
         user_id: int,
@@ -312,17 +451,15 @@ class WhatsAppBridge:
         content: str
     ) -> Dict[str, Any]:
         """Send a message to a channel"""
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.post(
-                    f"{self.base_url}/api/clients/{user_id}/channels/{channel_id}/send",
-                    json={"content": content},
-                    timeout=60.0
-                )
-                return response.json()
-            except httpx.RequestError as e:
-                return {"success": False, "error": str(e)}
+        client = self.open()
+        response = await client.post(
+            f"/api/clients/{user_id}/channels/{channel_id}/send",
+            json={"content": content},
+            timeout=60.0
+        )
+        return orjson.loads(response.content)
 
+    @bridge_call({"success": False})
     async def send_channel_media_from_path(
         self,
         user_id: int,
@@ -331,20 +468,18 @@ class WhatsAppBridge:
         caption: str = ""
     ) -> Dict[str, Any]:
         """Send media from a stored path to a channel"""
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.post(
-                    f"{self.base_url}/api/clients/{user_id}/channels/{channel_id}/send-media-from-path",
-                    json={
-                        "filePath": file_path,
-                        "caption": caption
-                    },
-                    timeout=120.0
-                )
-                return response.json()
-            except httpx.RequestError as e:
-                return {"success": False, "error": str(e)}
+        client = self.open()
+        response = await client.post(
+            f"/api/clients/{user_id}/channels/{channel_id}/send-media-from-path",
+            json={
+                "filePath": file_path,
+                "caption": caption
+            },
+            timeout=120.0
+        )
+        return orjson.loads(response.content)
 
+    @bridge_call({"success": False})
     async def send_channel_poll(
         self,
         user_id: int,
@@ -354,20 +489,17 @@ class WhatsAppBridge:
         allow_multiple_answers: bool = False
     ) -> Dict[str, Any]:
         """Send a poll to a channel"""
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.post(
-                    f"{self.base_url}/api/clients/{user_id}/channels/{channel_id}/send-poll",
-                    json={
-                        "question": question,
-                        "options": options,
-                        "allowMultipleAnswers": allow_multiple_answers
-                    },
-                    timeout=60.0
-                )
-                return response.json()
-            except httpx.RequestError as e:
-                return {"success": False, "error": str(e)}
+        client = self.open()
+        response = await client.post(
+            f"/api/clients/{user_id}/channels/{channel_id}/send-poll",
+            json={
+                "question": question,
+                "options": options,
+                "allowMultipleAnswers": allow_multiple_answers
+            },
+            timeout=60.0
+        )
+        return orjson.loads(response.content)
 
 
 # Singleton instance
@@ -0,0 +1,45 @@
+"""Run database migrations once before the API workers start."""
+import logging
+import os
+import sys
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import inspect
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from app.core.logging_config import LOG_FORMAT  # noqa: E402
+from app.database import engine, Base  # noqa: E402
+import app.models  # noqa: E402,F401  (register models on Base.metadata)
+
+logger = logging.getLogger("prestart")
+
+
+def run_migrations():
+    """
+    Bring the database to the latest Alembic revision. The migrations start from
+    an existing schema, so an empty database is built from the models and
+    stamped at head instead.
+    """
+    alembic_cfg = Config(os.path.join(BASE_DIR, "alembic.ini"))
+    alembic_cfg.set_main_option("script_location", os.path.join(BASE_DIR, "alembic"))
+
+    inspector = inspect(engine)
+    if not inspector.has_table("alembic_version") and not inspector.has_table("users"):
+        Base.metadata.create_all(bind=engine)
+        command.stamp(alembic_cfg, "head")
+        logger.info("Created schema from models and stamped head")
+    else:
+        command.upgrade(alembic_cfg, "head")
+        logger.info("Alembic migrations completed")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format=LOG_FORMAT)
+    try:
+        run_migrations()
+    except Exception:
+        logger.exception("Database migration failed")
+        sys.exit(1)
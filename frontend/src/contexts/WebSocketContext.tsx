@@ -12,6 +12,8 @@ interface WebSocketMessage {
   [key: string]: unknown
 }
 
+const textDecoder = new TextDecoder()
+
 const WebSocketContext = createContext<WebSocketContextType | undefined>(undefined)
 
 // WebSocket URL - uses env var or detects from current location
@@ -54,6 +56,8 @@ export function WebSocketProvider({ children }: { children: ReactNode }) {
     try {
       console.log('[WS] Connecting...')
       const ws = new WebSocket(`${WS_URL}?token=${token}`)
+      // Server sends JSON as binary frames
+      ws.binaryType = 'arraybuffer'
 
       ws.onopen = () => {
         if (!isMountedRef.current) {
@@ -70,7 +74,8 @@ export function WebSocketProvider({ children }: { children: ReactNode }) {
         if (!isMountedRef.current) return
 
         try {
-          const data = JSON.parse(event.data) as WebSocketMessage
+          const raw = typeof event.data === 'string' ? event.data : textDecoder.decode(event.data)
+          const data = JSON.parse(raw) as WebSocketMessage
           console.log('[WS] Message received:', data.type)
           setLastMessage(data)
 
@@ -856,6 +856,7 @@ class ApiClient {
       groups_sent: number
       groups_failed: number
       error_message: string | null
+      errors: Array<{ group_id: number | null; error: string; created_at: string | null }>
       created_at: string
     }>(`/api/broadcast/${messageId}`)
   }
@@ -4,6 +4,7 @@ const cors = require('cors');
 const ClientManager = require('./services/ClientManager');
 const RedisPublisher = require('./services/RedisPublisher');
 const clientRoutes = require('./routes/clients');
+const compressJson = require('./middleware/compressJson');
 
 const app = express();
 const PORT = process.env.PORT || 3001;
@@ -13,6 +14,7 @@ const DATA_DIR = process.env.DATA_DIR || './data';
 // Middleware
 app.use(cors());
 app.use(express.json());
+app.use(compressJson);
 
 // Initialize services
 const redisPublisher = new RedisPublisher(REDIS_URL);
@@ -0,0 +1,44 @@
+const zlib = require('zlib');
+
+// JSON bodies smaller than this are sent as-is; gzip would barely shrink them
+const COMPRESS_THRESHOLD = 1024;
+
+// Gzip JSON responses (group, member and channel lists are large and repetitive)
+// for clients that accept it. Compression runs on the libuv threadpool; the ETag is
+// taken over the compressed body, and unchanged bodies still get a 304.
+function compressJson(req, res, next) {
+    if (!/\bgzip\b/.test(req.headers['accept-encoding'] || '')) {
+        return next();
+    }
+
+    const sendJson = res.json.bind(res);
+    res.vary('Accept-Encoding');
+
+    res.json = (body) => {
+        const payload = Buffer.from(JSON.stringify(body));
+        if (payload.length < COMPRESS_THRESHOLD) {
+            return sendJson(body);
+        }
+
+        zlib.gzip(payload, (err, compressed) => {
+            if (err) {
+                return sendJson(body);
+            }
+            const etag = req.app.get('etag fn');
+            if (etag) {
+                res.set('ETag', etag(compressed));
+            }
+            if (req.fresh) {
+                return res.status(304).end();
+            }
+            res.set('Content-Type', 'application/json; charset=utf-8');
+            res.set('Content-Encoding', 'gzip');
+            res.send(compressed);
+        });
+        return res;
+    };
+
+    next();
+}
+
+module.exports = compressJson;
@@ -1,10 +1,24 @@
 const Redis = require('ioredis');
 
+// Flush queued publishes once this many are pending, or after FLUSH_INTERVAL_MS
+const MAX_BATCH_SIZE = 100;
+const FLUSH_INTERVAL_MS = 5;
+
+// Events go to one of STREAM_SHARDS streams by userId, so a user's events stay in
+// order while the backend reads shards in parallel. Must match EVENT_SHARDS there.
+const STREAM_SHARDS = 16;
+// Approximate cap on entries kept per stream shard
+const STREAM_MAXLEN = 100000;
+
 class RedisPublisher {
     constructor(redisUrl) {
         this.redis = new Redis(redisUrl);
         this.channel = 'whatsapp:events';
 
+        // Pending stream appends, sent together in one pipeline round-trip
+        this.queue = [];
+        this.flushTimer = null;
+
         this.redis.on('connect', () => {
             console.log('Redis connected');
         });
@@ -14,17 +28,53 @@ class RedisPublisher {
         });
     }
 
-    async publish(channel, data) {
+    streamFor(channel, data) {
+        const shard = Math.abs(Number(data.userId)) % STREAM_SHARDS || 0;
+        return `${channel || this.channel}:${shard}`;
+    }
+
+    publish(channel, data) {
+        return new Promise((resolve) => {
+            this.queue.push({ channel: this.streamFor(channel, data), data, resolve });
+
+            if (this.queue.length >= MAX_BATCH_SIZE) {
+                this.flush();
+            } else if (!this.flushTimer) {
+                this.flushTimer = setTimeout(() => this.flush(), FLUSH_INTERVAL_MS);
+            }
+        });
+    }
+
+    async flush() {
+        if (this.flushTimer) {
+            clearTimeout(this.flushTimer);
+            this.flushTimer = null;
+        }
+
+        const batch = this.queue;
+        this.queue = [];
+        if (batch.length === 0) return;
+
         try {
-            const message = JSON.stringify(data);
-            await this.redis.publish(channel || this.channel, message);
-            console.log(`Published to ${channel || this.channel}:`, data.type, data.userId);
+            const pipeline = this.redis.pipeline();
+            for (const item of batch) {
+                pipeline.xadd(item.channel, 'MAXLEN', '~', STREAM_MAXLEN, '*', 'payload', JSON.stringify(item.data));
+            }
+            await pipeline.exec();
+            for (const item of batch) {
+                console.log(`Published to ${item.channel}:`, item.data.type, item.data.userId);
+            }
         } catch (error) {
             console.error('Failed to publish to Redis:', error);
+        } finally {
+            for (const item of batch) {
+                item.resolve();
+            }
         }
     }
 
     async disconnect() {
+        await this.flush();
         await this.redis.quit();
     }
 }